@@ -0,0 +1,32 @@
+# python -m benchmarks.import_time [repeats]
+import subprocess
+import sys
+from statistics import median
+
+
+def cumulative(statement, module):
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True).stderr
+    for line in err.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    raise ValueError(f"module {module !r} not imported")
+
+
+def main(repeats=20):
+    for statement, module in (
+            ("import cwapi", "cwapi"),
+            ("import cwapi.types", "cwapi.types"),
+            ("import pika", "pika"),
+            ("import aio_pika", "aio_pika"),
+    ):
+        try:
+            us = median(cumulative(statement, module) for _ in range(repeats))
+        except subprocess.CalledProcessError:
+            print(f"{statement:<20} not available")
+            continue
+        print(f"{statement:<20} {us / 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
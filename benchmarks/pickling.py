@@ -0,0 +1,38 @@
+# python -m benchmarks.pickling [number]
+# pickle size, dumps/loads and copy/deepcopy time of parsed response fixtures
+import copy
+import pickle
+import sys
+import warnings
+from glob import glob
+from os.path import basename, dirname, join
+from timeit import repeat
+
+from cwapi.responses import parse_response
+
+FIXTURES = join(dirname(dirname(__file__)), "tests", "fixtures", "responses")
+
+
+def best(f, number):
+    return min(repeat(f, number=number, repeat=5)) / number * 1e6
+
+
+def main(number=2000):
+    warnings.simplefilter("ignore")
+    print(f"{'':<26} {'bytes':>7} {'dumps':>9} {'loads':>9} {'copy':>9} {'deepcopy':>9}  (us)")
+    for path in sorted(glob(join(FIXTURES, "*.json"))):
+        with open(path, "rb") as f:
+            o = parse_response(f.read())
+        p = pickle.dumps(o, pickle.HIGHEST_PROTOCOL)
+        n = max(1, number * 1000 // len(p) // 10)
+        print(
+            f"{basename(path)[:-5]:<26} {len(p):7}"
+            f" {best(lambda: pickle.dumps(o, pickle.HIGHEST_PROTOCOL), n):9.2f}"
+            f" {best(lambda: pickle.loads(p), n):9.2f}"
+            f" {best(lambda: copy.copy(o), n):9.2f}"
+            f" {best(lambda: copy.deepcopy(o), n):9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
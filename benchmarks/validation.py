@@ -0,0 +1,36 @@
+# python -m benchmarks.validation [number]
+# strict (user) construction and strict vs trusted parsing of response fixtures
+import sys
+import warnings
+from glob import glob
+from os.path import basename, dirname, join
+from timeit import repeat
+
+from cwapi.responses import parse_response
+from cwapi.types import Condition, Gear, Quality, StockCell
+
+FIXTURES = join(dirname(dirname(__file__)), "tests", "fixtures", "responses")
+
+
+def best(f, number):
+    return min(repeat(f, number=number, repeat=5)) / number * 1e9
+
+
+def main(number=20000):
+    warnings.simplefilter("ignore")
+    for name, f in (
+            ("Gear(...)", lambda: Gear("Hunter bow", 40, 0, Condition.Normal, Quality.Fine, 0)),
+            ("StockCell(...)", lambda: StockCell("01", "Thread", 10)),
+    ):
+        print(f"{name:<32} {best(f, number):10.0f} ns")
+
+    for path in sorted(glob(join(FIXTURES, "*.json"))):
+        with open(path, "rb") as f:
+            body = f.read()
+        strict = best(lambda: parse_response(body, False), number // 10)
+        trusted = best(lambda: parse_response(body, True), number // 10)
+        print(f"{basename(path)[:-5]:<32} {strict:10.0f} ns strict {trusted:10.0f} ns trusted {strict / trusted:6.2f}x")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
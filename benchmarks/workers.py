@@ -0,0 +1,68 @@
+# python -m benchmarks.workers [bodies] [max workers]
+# throughput of FeedWorkerPool for growing number of worker processes (deals feed, bodies are routed by item)
+import asyncio
+import json
+import sys
+from os import cpu_count
+from os.path import dirname, join
+from time import perf_counter
+
+from cwapi.feeds import Feed
+from cwapi.workers import FeedWorkerPool
+
+FIXTURE = join(dirname(dirname(__file__)), "tests", "fixtures", "deals.json")
+
+
+def volume(deal):
+    return deal.price * deal.qty
+
+
+def bodies(number):
+    with open(FIXTURE, "rb") as f:
+        deal = json.loads(f.read())
+    out = []
+    for i in range(number):
+        deal["item"] = f"item {i % 97}"
+        deal["qty"] = i % 10 + 1
+        out.append(json.dumps(deal).encode())
+    return out
+
+
+def ready(handler):
+    return None
+
+
+async def measure(feed, workers):
+    async with FeedWorkerPool(Feed.Deals, volume, workers=workers) as pool:
+        # first call waits for processes to start
+        await pool.gather(ready)
+        start = perf_counter()
+        for body in feed:
+            await pool.submit(body)
+        await pool.flush()
+        n = 0
+        async for _ in pool.results():
+            n += 1
+            if n == len(feed):
+                break
+        return perf_counter() - start
+
+
+def main(number=100000, max_workers=None):
+    feed = bodies(number)
+    if max_workers is None:
+        max_workers = max(1, cpu_count() or 1)
+    print(f"{cpu_count()} CPUs, {number} bodies")
+    print(f"{'workers':>7} {'seconds':>9} {'bodies/s':>10} {'speedup':>8}")
+    base = None
+    workers = 1
+    while workers <= max_workers:
+        t = asyncio.run(measure(feed, workers))
+        if base is None:
+            base = t
+        print(f"{workers:7} {t:9.3f} {number / t:10.0f} {base / t:8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1,18 +1,53 @@
-from asyncio import Lock as aioLock
-from enum import Enum, auto
-from queue import Queue
-from threading import Lock as thrLock, Thread, Condition as thrCondition
-
-import aio_pika
-from pika import URLParameters, BlockingConnection
-from aio_pika import connect_robust
+import re
+from collections import deque
+from enum import Enum
+from json import loads
+from threading import Lock as thrLock
 
 from .requests import request
-from .responses import parse_response
+from .responses import _load_parsed, _parse_pickled, parse_response, response_error
 
 __all__ = ("Server", "ChatWarsApiClient", "AsyncChatWarsApiClient")
 
 
+# sync listen() polls shared connection and sleeps this long without holding it when nothing has come
+_LISTEN_POLL_INTERVAL = 0.05
+
+# action is taken from raw body, so reply is parsed only by request which takes it;
+# server writes action as first key, otherwise body is decoded (nested objects can have "action" key too)
+_ACTION_FIELD = re.compile(rb'\s*\{\s*"action"\s*:\s*"([^"\\]*)"')
+
+
+def _decode_object(body):
+    try:
+        o = loads(body)
+    except ValueError:
+        return None
+    return o if type(o) is dict else None
+
+
+def _reply_action(body):
+    m = _ACTION_FIELD.match(body)
+    if m is not None:
+        return m.group(1)
+    o = _decode_object(body)
+    if o is None:
+        return None
+    action = o.get("action", None)
+    return action.encode() if type(action) is str else None
+
+
+def _reply_owner(body):
+    # (userId, token) from payload of reply, each can be None
+    o = _decode_object(body)
+    payload = None if o is None else o.get("payload", None)
+    if type(payload) is not dict:
+        return None, None
+    userId = payload.get("userId", None)
+    token = payload.get("token", None)
+    return (userId if type(userId) is int else None), (token if type(token) is str else None)
+
+
 class Server(Enum):
     __slots__ = "__port", "__host", "__protocol"
 
@@ -75,7 +110,7 @@ class _sync_async_descriptor:
 
 
 class ChatWarsApiClient:
-    __slots__ = "__connection_link", "__instance_name", "__password", "__server", "__connection", "__channel", "__output_exchange_name", "__input_queue_name", "__routing_key", "__output_exchange", "__input_queue", "__mutex", "__aio_loop"
+    __slots__ = "__connection_link", "__instance_name", "__password", "__server", "__connection", "__channel", "__output_exchange_name", "__input_queue_name", "__routing_key", "__output_exchange", "__input_queue", "__mutex", "__aio_loop", "__running_loop", "__message_class", "__prefetch_count", "__prefetch_size", "__ack_batch_count", "__ack_batch_delay", "__ack_pending", "__ack_last", "__ack_timer", "__ack_task", "__ack_error", "__parse_executor", "__parse_threshold", "__parse_in_process", "__tokens", "__ack_flushed_tag", "__reader", "__waiters", "__sent", "__native_transport", "__trusted_parsing", "__keepalive", "__keepalive_thread", "__keepalive_stop", "__response_cache", "__dropped_replies"
 
     @property
     def instance_name(self):
@@ -101,6 +136,34 @@ class ChatWarsApiClient:
     def routing_key(self):
         return self.__routing_key
 
+    @property
+    def prefetch_count(self):
+        return self.__prefetch_count
+
+    @property
+    def prefetch_size(self):
+        return self.__prefetch_size
+
+    @property
+    def tokens(self):
+        return self.__tokens
+
+    @property
+    def trusted_parsing(self):
+        return self.__trusted_parsing
+
+    @property
+    def response_cache(self):
+        return self.__response_cache
+
+    @property
+    def dropped_replies(self):
+        return self.__dropped_replies
+
+    @property
+    def keepalive(self):
+        return self.__keepalive
+
     loop = _sync_async_descriptor()
 
     @loop._async
@@ -108,19 +171,89 @@ class ChatWarsApiClient:
     def loop(self):
         return self.__aio_loop
 
-    def __new__(cls, server, instance_name, password, *, _loop=None):
+    def __new__(cls, server, instance_name, password, *, prefetch_count=0, prefetch_size=0, tokens=None, trusted_parsing=None, response_cache=None, keepalive=False, _loop=None, _ack_batch_count=None, _ack_batch_delay=None, _parse_executor=None, _parse_threshold=65536, _native_transport=False):
         if type(server) is not Server:
             raise TypeError(f"server must instance of {Server.__qualname__ !r} enum")
         if type(instance_name) is not str:
             raise TypeError("instance name must be str")
         if type(password) is not str:
             raise TypeError("password must be str")
+        if type(prefetch_count) is not int:
+            raise TypeError("prefetch count must be int")
+        if prefetch_count < 0:
+            raise ValueError("prefetch count can't be negative")
+        if type(prefetch_size) is not int:
+            raise TypeError("prefetch size must be int")
+        if prefetch_size < 0:
+            raise ValueError("prefetch size can't be negative")
+        if tokens is not None:
+            from .tokens import TokenRegistry
+
+            if type(tokens) is not TokenRegistry:
+                raise TypeError(f"tokens must be {TokenRegistry.__qualname__ !r}")
+        if trusted_parsing is not None and type(trusted_parsing) is not bool:
+            raise TypeError("trusted parsing flag must be bool or None")
+        if response_cache is not None:
+            from .cache import ResponseCache
+
+            if type(response_cache) is not ResponseCache:
+                raise TypeError(f"response cache must be {ResponseCache.__qualname__ !r}")
+        if type(keepalive) is not bool:
+            raise TypeError("keepalive flag must be bool")
+        if keepalive and issubclass(cls, AsyncChatWarsApiClient):
+            raise TypeError("keepalive is supported only by sync client, asyncio client services heartbeats itself")
+        if _ack_batch_count is not None:
+            if type(_ack_batch_count) is not int:
+                raise TypeError("ack batch count must be int")
+            if _ack_batch_count < 1:
+                raise ValueError("ack batch count must be positive")
+            if 0 < prefetch_count < _ack_batch_count:
+                raise ValueError("ack batch count can't exceed prefetch count, consumer will stall")
+        if _ack_batch_delay is not None:
+            if type(_ack_batch_delay) is not int and type(_ack_batch_delay) is not float:
+                raise TypeError("ack batch delay must be int or float")
+            if _ack_batch_delay <= 0:
+                raise ValueError("ack batch delay must be positive")
+        if _parse_executor is not None:
+            from concurrent.futures import Executor, ProcessPoolExecutor
+
+            if not isinstance(_parse_executor, Executor):
+                raise TypeError(f"parse executor must be instance of {Executor.__qualname__ !r}")
+        if type(_parse_threshold) is not int:
+            raise TypeError("parse threshold must be int")
+        if _parse_threshold < 0:
+            raise ValueError("parse threshold can't be negative")
+        if type(_native_transport) is not bool:
+            raise TypeError("native transport flag must be bool")
 
         self = super().__new__(cls)
         self.__server = server
         self.__instance_name = instance_name
         self.__password = password
         self.__aio_loop = _loop
+        self.__running_loop = None
+        self.__message_class = None
+        self.__prefetch_count = prefetch_count
+        self.__prefetch_size = prefetch_size
+        self.__tokens = tokens
+        self.__trusted_parsing = trusted_parsing
+        self.__response_cache = response_cache
+        self.__keepalive = keepalive
+        self.__keepalive_thread = None
+        self.__keepalive_stop = None
+        self.__ack_batch_count = _ack_batch_count
+        self.__ack_batch_delay = _ack_batch_delay
+        self.__ack_pending = 0
+        self.__ack_last = None
+        self.__ack_timer = None
+        self.__ack_task = None
+        self.__ack_error = None
+        self.__ack_flushed_tag = 0
+        self.__parse_executor = _parse_executor
+        self.__parse_threshold = _parse_threshold
+        self.__parse_in_process = _parse_executor is not None and isinstance(_parse_executor, ProcessPoolExecutor)
+        self.__native_transport = _native_transport
+        self.__dropped_replies = 0
 
         self.__connection_link = server.build_address(instance_name, password)
         self.__output_exchange_name = f"{instance_name}_ex"
@@ -132,8 +265,13 @@ class ChatWarsApiClient:
         self.__output_exchange = None
         self.__input_queue = None
 
+        self.__reader = None
+        self.__waiters = None
+        self.__sent = 0
+
         if issubclass(cls, AsyncChatWarsApiClient):
-            self.__mutex = aioLock()
+            self.__mutex = None
+            self.__waiters = dict()
         else:
             self.__mutex = thrLock()
 
@@ -146,18 +284,58 @@ class ChatWarsApiClient:
 
     @connect._sync
     def connect(self):
+        from pika import URLParameters, BlockingConnection
+
         self.__connection = BlockingConnection(URLParameters(self.__connection_link))
         self.__channel = self.__connection.channel()
+        if self.__prefetch_count or self.__prefetch_size:
+            self.__channel.basic_qos(prefetch_size=self.__prefetch_size, prefetch_count=self.__prefetch_count)
         self.__channel.queue_purge(self.__input_queue_name)
 
+        # heartbeat timeout negotiated with broker, 0 if heartbeats are disabled and nothing has to be serviced
+        heartbeat = self.__connection._impl.params.heartbeat
+        if self.__keepalive and heartbeat:
+            from threading import Event, Thread
+
+            self.__keepalive_stop = Event()
+            self.__keepalive_thread = Thread(target=self.__service, args=(self.__connection, self.__keepalive_stop, heartbeat / 2), name=f"cwapi keepalive {self.__instance_name}", daemon=True)
+            self.__keepalive_thread.start()
+
+    def __service(self, connection, stop, interval):
+        # BlockingConnection does I/O only when called, so heartbeats are answered here while client is idle
+        while not stop.wait(interval):
+            with self.__mutex:
+                if stop.is_set() or not connection.is_open:
+                    return
+                try:
+                    connection.process_data_events(time_limit=0)
+                except Exception:
+                    return
+
     @connect._async
     async def connect(self):
-        self.__connection = await aio_pika.connect_robust(self.__connection_link, loop=self.__aio_loop)
+        from asyncio import get_running_loop
+
+        # resolved once, so requests don't look up loop and message class every time
+        self.__running_loop = get_running_loop()
+        if self.__native_transport:
+            from ._amqp import connect
+
+            self.__message_class = None
+            self.__connection = await connect(self.__connection_link)
+        else:
+            import aio_pika
+
+            self.__message_class = aio_pika.Message
+            self.__connection = await aio_pika.connect_robust(self.__connection_link, loop=self.__aio_loop)
         self.__channel = await self.__connection.channel()
         # await  self.__channel.open()
+        if self.__prefetch_count or self.__prefetch_size:
+            await self.__channel.set_qos(prefetch_count=self.__prefetch_count, prefetch_size=self.__prefetch_size)
         self.__output_exchange = await self.__channel.get_exchange(self.__output_exchange_name)
         self.__input_queue = await self.__channel.get_queue(self.__input_queue_name)
         await self.__input_queue.purge()
+        self.__reader = self.__running_loop.create_task(self.__read())
 
     disconnect = _sync_async_descriptor()
 
@@ -165,15 +343,32 @@ class ChatWarsApiClient:
     def disconnect(self):
         if not self.is_connected():
             raise ConnectionError("client not connected")
-        self.__channel.close()
-        self.__connection.close()
+        if self.__keepalive_thread is not None:
+            self.__keepalive_stop.set()
+            self.__keepalive_thread.join()
+            self.__keepalive_thread = None
+            self.__keepalive_stop = None
+        with self.__mutex:
+            self.__channel.close()
+            self.__connection.close()
 
     @disconnect._async
     async def disconnect(self):
+        from asyncio import wait
+
         if not self.is_connected():
             raise ConnectionError("client not connected")
-        await self.__channel.close()
-        await self.__connection.close()
+        self.__reader.cancel()
+        self.__reader = None
+        self.__fail_waiters(ConnectionError("client disconnected"))
+        try:
+            if self.__ack_task is not None:
+                await wait((self.__ack_task,))
+            await self.__flush_acks()
+        finally:
+            await self.__channel.close()
+            await self.__connection.close()
+        self.__raise_ack_error()
 
     ask = _sync_async_descriptor()
 
@@ -185,10 +380,17 @@ class ChatWarsApiClient:
         if not self.is_connected():
             raise ConnectionError("client not connected")
 
-        with self.__mutex:
-            self.__channel.basic_publish(exchange=self.__output_exchange_name, routing_key=self.__routing_key, body=req.dump())
-            for method, properties, body in self.__channel.consume(self.__input_queue_name, auto_ack=True):
-                return parse_response(body)
+        if self.__tokens is None:
+            return self.__receive(req)
+
+        self.__tokens.check(req)
+        try:
+            res = self.__receive(req)
+        except response_error as e:
+            self.__tokens.learn(req, e)
+            raise
+        self.__tokens.learn(req, res)
+        return res
 
     @ask._async
     async def ask(self, req, /):
@@ -198,13 +400,365 @@ class ChatWarsApiClient:
         if not self.is_connected():
             raise ConnectionError("client not connected")
 
-        await self.__output_exchange.publish(aio_pika.Message(req.dump()), routing_key=self.routing_key)
+        if self.__tokens is None:
+            return await self.__receive(req)
+
+        self.__tokens.check(req)
+        try:
+            res = await self.__receive(req)
+        except response_error as e:
+            self.__tokens.learn(req, e)
+            raise
+        self.__tokens.learn(req, res)
+        return res
+
+    __receive = _sync_async_descriptor()
+
+    @__receive._sync
+    def __receive(self, req):
+        with self.__mutex:
+            self.__channel.basic_publish(exchange=self.__output_exchange_name, routing_key=self.__routing_key, body=req.dump())
+            # replies are acknowledged manually, so prefetch_count applies to sync client too
+            for method, properties, body in self.__channel.consume(self.__input_queue_name):
+                try:
+                    if self.__response_cache is not None:
+                        res = self.__response_cache.parse(body, self.__trusted_parsing)
+                    else:
+                        res = parse_response(body, self.__trusted_parsing)
+                except BaseException:
+                    self.__channel.basic_reject(method.delivery_tag, requeue=False)
+                    raise
+                self.__channel.basic_ack(method.delivery_tag)
+                return res
+
+    @__receive._async
+    async def __receive(self, req):
+        self.__raise_ack_error()
+        body = req.dump()
+        if self.__message_class is not None:
+            body = self.__message_class(body)
+
+        # replies of each action come in order of requests; slot is taken before publishing, because reply can come before publish() returns
+        slots = self.__waiters.get(req._action, None)
+        if slots is None:
+            slots = self.__waiters[req._action] = deque()
+        self.__sent += 1
+        slot = (self.__sent, self.__running_loop.create_future(), req)
+        slots.append(slot)
+
+        try:
+            await self.__output_exchange.publish(body, routing_key=self.__routing_key)
+        except Exception:
+            # request wasn't sent, no reply will come for this slot
+            try:
+                slots.remove(slot)
+            except ValueError:
+                pass
+            slot[1].cancel()
+            raise
+        except BaseException:
+            # cancelled request could be already sent, so slot is kept
+            slot[1].cancel()
+            raise
+
+        try:
+            message = await slot[1]
+        except BaseException:
+            # slot of cancelled request stays in queue, so its reply is dropped instead of being taken by next request
+            slot[1].cancel()
+            raise
+
+        if self.__ack_batch_count is not None or self.__ack_batch_delay is not None:
+            return await self.__process_batched(message)
 
-        async with self.__mutex:
+        async with message.process():
+            return await self.__parse(message.body)
+
+    async def __read(self):
+        try:
             async with self.__input_queue.iterator() as queue_iter:
                 async for message in queue_iter:
-                    async with message.process():
-                        return parse_response(message.body)
+                    fut = self.__take(message.body)
+                    if fut is None:
+                        # reply to cancelled request or without request at all
+                        self.__dropped_replies += 1
+                        await message.reject()
+                        continue
+                    fut.set_result(message)
+        except Exception as e:
+            self.__fail_waiters(e)
+            raise
+
+    def __take(self, body):
+        action = _reply_action(body)
+        if action is not None:
+            # requests which don't declare action are matched with replies of any action
+            slots = self.__waiters.get(action, None) or self.__waiters.get(None, None)
+        else:
+            # reply without action (e.g. to malformed request) is matched to oldest request
+            slots = min((s for s in self.__waiters.values() if s), key=lambda s: s[0][0], default=None)
+        if not slots:
+            return None
+        if len(slots) > 1 and action is not None:
+            i = self.__match(slots, body)
+            fut = slots[i][1]
+            del slots[i]
+        else:
+            fut = slots.popleft()[1]
+        if fut.done():
+            return None
+        return fut
+
+    def __match(self, slots, body):
+        # same action is requested for several users: reply goes to oldest request of its user;
+        # requests which can't be told apart (user of token isn't known) are matched in order
+        userId, token = _reply_owner(body)
+        if userId is None and token is None:
+            return 0
+        unknown = None
+        for i, (_, _, req) in enumerate(slots):
+            m = self.__is_owner(req, userId, token)
+            if m:
+                return i
+            if m is None and unknown is None:
+                unknown = i
+        return 0 if unknown is None else unknown
+
+    def __is_owner(self, req, userId, token):
+        # None if it can't be known
+        t = getattr(req, "token", None)
+        if t is not None:
+            if token is not None:
+                return t == token
+            if userId is None or self.__tokens is None:
+                return None
+            u = self.__tokens._user_of(t)
+            return None if u is None else u == userId
+        u = getattr(req, "userId", None)
+        if u is None or userId is None:
+            return None
+        return u == userId
+
+    def __fail_waiters(self, e):
+        for slots in self.__waiters.values():
+            while slots:
+                fut = slots.popleft()[1]
+                if not fut.done():
+                    fut.set_exception(e)
+
+    async def __parse(self, body):
+        if self.__response_cache is None:
+            return await self.__build(body)
+        # equal body is fingerprinted in loop, so it isn't sent to executor at all
+        digest, res = self.__response_cache._lookup(body)
+        if res is None:
+            res = await self.__build(body)
+            self.__response_cache._store(digest, res)
+        return res
+
+    async def __build(self, body):
+        if self.__parse_executor is None or len(body) < self.__parse_threshold:
+            return parse_response(body, self.__trusted_parsing)
+        if self.__parse_in_process:
+            from ._utils import _enum_decoder, _validation_state
+
+            # whole response is built in worker and sent back pickled, loop only restores objects
+            trusted = _validation_state.parse_trusted if self.__trusted_parsing is None else self.__trusted_parsing
+            data = await self.__running_loop.run_in_executor(self.__parse_executor, _parse_pickled, body, trusted, _enum_decoder.fallback)
+            try:
+                return _load_parsed(data)
+            except ValueError:
+                # placeholders of unknown enum values can't be unpickled, such response is built again in loop
+                return parse_response(body, self.__trusted_parsing)
+        return await self.__running_loop.run_in_executor(self.__parse_executor, parse_response, body, self.__trusted_parsing)
+
+    async def __process_batched(self, message):
+        try:
+            return await self.__parse(message.body)
+        except response_error:
+            raise
+        except BaseException:
+            # replies are handled concurrently, so failed one can be already covered by ack with multiple=True
+            if message.delivery_tag > self.__ack_flushed_tag and (self.__ack_last is None or message.delivery_tag > self.__ack_last.delivery_tag):
+                await self.__flush_acks()
+                await message.reject()
+            raise
+        finally:
+            if not message.processed and message.delivery_tag > self.__ack_flushed_tag:
+                if self.__ack_last is None or message.delivery_tag > self.__ack_last.delivery_tag:
+                    self.__ack_last = message
+                self.__ack_pending += 1
+                if self.__ack_batch_count is not None and self.__ack_pending >= self.__ack_batch_count:
+                    await self.__flush_acks()
+                elif self.__ack_batch_delay is not None and self.__ack_timer is None and self.__ack_task is None:
+                    self.__ack_timer = self.__running_loop.call_later(self.__ack_batch_delay, self.__ack_timeout)
+
+    def __ack_timeout(self):
+        self.__ack_timer = None
+        self.__ack_task = self.__running_loop.create_task(self.__flush_acks())
+        self.__ack_task.add_done_callback(self.__ack_done)
+
+    def __ack_done(self, task):
+        self.__ack_task = None
+        # error of flush by timer is raised by next request (or disconnect)
+        if not task.cancelled() and task.exception() is not None:
+            self.__ack_error = task.exception()
+
+    def __raise_ack_error(self):
+        e, self.__ack_error = self.__ack_error, None
+        if e is not None:
+            raise e
+
+    async def __flush_acks(self):
+        if self.__ack_timer is not None:
+            self.__ack_timer.cancel()
+            self.__ack_timer = None
+        message, self.__ack_last = self.__ack_last, None
+        self.__ack_pending = 0
+        if message is not None:
+            self.__ack_flushed_tag = message.delivery_tag
+            await message.ack(multiple=True)
+
+    def feed_queue_name(self, feed, /):
+        from .feeds import Feed
+
+        if type(feed) is not Feed:
+            raise TypeError(f"feed must be {Feed.__qualname__ !r}")
+        return f"{self.__instance_name}_{feed.value}"
+
+    listen = _sync_async_descriptor()
+
+    @listen._sync
+    def listen(self, feed, /):
+        from time import sleep
+
+        from .feeds import parse_feed
+
+        queue_name = self.feed_queue_name(feed)
+
+        if not self.is_connected():
+            raise ConnectionError("client not connected")
+
+        # connection is shared with ask() and keepalive, so it's only polled under mutex and waited for without it;
+        # deliveries are dispatched by any thread polling connection
+        received = deque()
+        with self.__mutex:
+            channel = self.__connection.channel()
+        try:
+            with self.__mutex:
+                if self.__prefetch_count or self.__prefetch_size:
+                    channel.basic_qos(prefetch_size=self.__prefetch_size, prefetch_count=self.__prefetch_count)
+                channel.basic_consume(queue_name, lambda ch, method, properties, body: received.append((method, body)))
+            while True:
+                if not received:
+                    with self.__mutex:
+                        self.__connection.process_data_events(time_limit=0)
+                    if not received:
+                        sleep(_LISTEN_POLL_INTERVAL)
+                        continue
+                method, body = received.popleft()
+                try:
+                    event = parse_feed(feed, body, self.__trusted_parsing)
+                except BaseException:
+                    with self.__mutex:
+                        channel.basic_reject(method.delivery_tag, requeue=False)
+                    raise
+                yield event
+                with self.__mutex:
+                    channel.basic_ack(method.delivery_tag)
+        finally:
+            with self.__mutex:
+                # closing channel cancels consumer, unacknowledged deliveries are requeued by broker
+                if channel.is_open:
+                    channel.close()
+
+    @listen._async
+    async def listen(self, feed, /, buffer=None):
+        from .feeds import parse_feed
+
+        queue_name = self.feed_queue_name(feed)
+
+        if buffer is not None:
+            from .buffers import BufferPolicy, SubscriptionBuffer
+
+            if type(buffer) is not SubscriptionBuffer:
+                raise TypeError(f"buffer must be {SubscriptionBuffer.__qualname__ !r}")
+            if buffer.policy is BufferPolicy.Block and self.__prefetch_count == 0:
+                raise ValueError("blocking buffer requires prefetch_count, broker doesn't stop delivering without it")
+        if not self.is_connected():
+            raise ConnectionError("client not connected")
+
+        queue = await self.__channel.get_queue(queue_name)
+        # message of event held by user; it's acknowledged when next event is requested and returned to queue if user stops listening
+        held = None
+        async with queue.iterator() as queue_iter:
+            if buffer is not None:
+                from asyncio import wait
+
+                # messages are received in background, so slow user code doesn't hold broker deliveries in unbounded queue
+                buffer._open()
+                pump = self.__running_loop.create_task(buffer._pump(feed, queue_iter, self.__trusted_parsing))
+                try:
+                    while (item := await buffer._get()) is not None:
+                        event, held = item
+                        yield event
+                        if held is not None:
+                            message, held = held, None
+                            await message.ack()
+                finally:
+                    pump.cancel()
+                    await wait((pump,))
+                    if held is not None:
+                        await held.reject(requeue=True)
+                    await buffer._close()
+                return
+
+            try:
+                async for message in queue_iter:
+                    try:
+                        event = parse_feed(feed, message.body, self.__trusted_parsing)
+                    except BaseException:
+                        await message.reject()
+                        raise
+                    held = message
+                    yield event
+                    held = None
+                    await message.ack()
+            finally:
+                if held is not None:
+                    await held.reject(requeue=True)
+
+    async def _listen_raw(self, feed, /):
+        # unparsed bodies for consumers parsing them elsewhere (worker processes), message is acknowledged when next body is requested
+        queue_name = self.feed_queue_name(feed)
+
+        if not self.is_connected():
+            raise ConnectionError("client not connected")
+
+        queue = await self.__channel.get_queue(queue_name)
+        held = None
+        async with queue.iterator() as queue_iter:
+            try:
+                async for message in queue_iter:
+                    held = message
+                    yield message.body
+                    held = None
+                    await message.ack()
+            finally:
+                if held is not None:
+                    await held.reject(requeue=True)
+
+    async def _listen_messages(self, feed, /):
+        # unsettled messages for consumers acknowledging them after handling elsewhere (worker processes)
+        queue_name = self.feed_queue_name(feed)
+
+        if not self.is_connected():
+            raise ConnectionError("client not connected")
+
+        queue = await self.__channel.get_queue(queue_name)
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                yield message
 
     __enter__ = _sync_async_descriptor()
 
@@ -222,8 +776,8 @@ class ChatWarsApiClient:
 
 
 class AsyncChatWarsApiClient(ChatWarsApiClient):
-    def __new__(cls, *args, loop=None, **kwargs):
-        return super().__new__(cls, *args, _loop=loop, **kwargs)
+    def __new__(cls, *args, loop=None, ack_batch_count=None, ack_batch_delay=None, parse_executor=None, parse_threshold=65536, native_transport=False, **kwargs):
+        return super().__new__(cls, *args, _loop=loop, _ack_batch_count=ack_batch_count, _ack_batch_delay=ack_batch_delay, _parse_executor=parse_executor, _parse_threshold=parse_threshold, _native_transport=native_transport, **kwargs)
 
     async def __aenter__(self):
         await self.connect()
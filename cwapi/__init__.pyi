@@ -1,8 +1,13 @@
 from asyncio import AbstractEventLoop
+from concurrent.futures import Executor
 from enum import Enum
-from typing import ClassVar, TypeVar, Generic, Literal, NoReturn, overload
+from typing import AsyncIterator, ClassVar, TypeVar, Generic, Iterator, Literal, NoReturn, Optional, Tuple, Union, overload
 
 from .requests import AuthAdditionalOperationRequest, CreateAuthCodeRequest, GetInfoRequest, GrantAdditionalOperationRequest, GrantTokenRequest, GuildInfoRequest, RequestBasicInfoRequest, RequestGearInfoRequest, RequestProfileRequest, RequestStockRequest, ViewCraftbookRequest, WantToBuyRequest, request
+from .feeds import AuctionLot, Deal, Feed, Offer, SexDigestEntry, Shop
+from .buffers import SubscriptionBuffer
+from .cache import ResponseCache
+from .tokens import TokenRegistry
 from .responses import AuthAdditionalOperationResponse, CreateAuthCodeResponse, GetInfoResponse, GrantAdditionalOperationResponse, GrantTokenResponse, GuildInfoResponse, RequestBasicInfoResponse, RequestGearInfoResponse, RequestProfileResponse, RequestStockResponse, ViewCraftbookResponse, WantToBuyResponse, response
 
 __PROTOCOL = TypeVar("__PROTOCOL", bound=str)
@@ -50,7 +55,26 @@ class ChatWarsApiClient(Generic[__SERVER, __INSTANCE_NAME]):
     @property
     def routing_key(self) -> str: ...
 
-    def __new__(cls, server: __SERVER, instance_name: __INSTANCE_NAME, password: str) -> ChatWarsApiClient[__SERVER, __INSTANCE_NAME]: ...
+    @property
+    def prefetch_count(self) -> int: ...
+
+    @property
+    def prefetch_size(self) -> int: ...
+
+    @property
+    def tokens(self) -> Optional[TokenRegistry]: ...
+
+    @property
+    def trusted_parsing(self) -> Optional[bool]: ...
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]: ...
+
+    # connection (heartbeats) is serviced in background thread while sync client is idle, at half of heartbeat timeout negotiated with broker
+    @property
+    def keepalive(self) -> bool: ...
+
+    def __new__(cls, server: __SERVER, instance_name: __INSTANCE_NAME, password: str, *, prefetch_count: int = 0, prefetch_size: int = 0, tokens: Optional[TokenRegistry] = None, trusted_parsing: Optional[bool] = None, response_cache: Optional[ResponseCache] = None, keepalive: bool = False) -> ChatWarsApiClient[__SERVER, __INSTANCE_NAME]: ...
 
     def connect(self) -> NoReturn: ...
 
@@ -95,6 +119,24 @@ class ChatWarsApiClient(Generic[__SERVER, __INSTANCE_NAME]):
     @overload
     def ask(self, req: request, /) -> response: ...
 
+    def feed_queue_name(self, feed: Feed, /) -> str: ...
+
+    # message is acknowledged when next event requested
+    @overload
+    def listen(self, feed: Literal[Feed.Deals], /) -> Iterator[Deal]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.Offers], /) -> Iterator[Offer]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.SexDigest], /) -> Iterator[Tuple[SexDigestEntry, ...]]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.AuDigest], /) -> Iterator[Tuple[AuctionLot, ...]]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.YellowPages], /) -> Iterator[Tuple[Shop, ...]]: ...
+
     def __enter__(self) -> ChatWarsApiClient: ...
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> Literal[False]: ...
@@ -104,12 +146,32 @@ class AsyncChatWarsApiClient(ChatWarsApiClient):
     @property
     def loop(self) -> AbstractEventLoop: ...
 
-    def __new__(cls, server: __SERVER, instance_name: __INSTANCE_NAME, password: str, *, loop: AbstractEventLoop = None) -> AsyncChatWarsApiClient[__SERVER, __INSTANCE_NAME]: ...
+    # replies to each action are matched with requests in order of sending;
+    # replies to cancelled requests and without request are dropped (rejected)
+    @property
+    def dropped_replies(self) -> int: ...
+
+    def __new__(cls, server: __SERVER, instance_name: __INSTANCE_NAME, password: str, *, loop: AbstractEventLoop = None, prefetch_count: int = 0, prefetch_size: int = 0, tokens: Optional[TokenRegistry] = None, trusted_parsing: Optional[bool] = None, response_cache: Optional[ResponseCache] = None, ack_batch_count: Optional[int] = None, ack_batch_delay: Optional[Union[int, float]] = None, parse_executor: Optional[Executor] = None, parse_threshold: int = 65536, native_transport: bool = False) -> AsyncChatWarsApiClient[__SERVER, __INSTANCE_NAME]: ...
 
     async def connect(self) -> NoReturn: ...
 
     async def disconnect(self) -> NoReturn: ...
 
+    @overload
+    def listen(self, feed: Literal[Feed.Deals], /, buffer: Optional[SubscriptionBuffer] = None) -> AsyncIterator[Deal]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.Offers], /, buffer: Optional[SubscriptionBuffer] = None) -> AsyncIterator[Offer]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.SexDigest], /, buffer: Optional[SubscriptionBuffer] = None) -> AsyncIterator[Tuple[SexDigestEntry, ...]]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.AuDigest], /, buffer: Optional[SubscriptionBuffer] = None) -> AsyncIterator[Tuple[AuctionLot, ...]]: ...
+
+    @overload
+    def listen(self, feed: Literal[Feed.YellowPages], /, buffer: Optional[SubscriptionBuffer] = None) -> AsyncIterator[Tuple[Shop, ...]]: ...
+
     async def __aenter__(self) -> AsyncChatWarsApiClient: ...
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> Literal[False]: ...
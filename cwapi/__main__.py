@@ -0,0 +1,181 @@
+import json
+import sys
+from argparse import ArgumentParser, FileType
+from enum import Enum
+from os import environ
+
+from . import AsyncChatWarsApiClient, Server
+from .requests import AuthAdditionalOperationRequest, CreateAuthCodeRequest, GetInfoRequest, GrantAdditionalOperationRequest, GrantTokenRequest, GuildInfoRequest, RequestBasicInfoRequest, RequestGearInfoRequest, RequestProfileRequest, RequestStockRequest, ViewCraftbookRequest, WantToBuyRequest
+from .responses import response_error
+from .types import _decode_operation, GearSet, GuildRole, GuildRolesSet, QuantityRange, RecipeBook, Stock, StockCell
+
+_REQUESTS = {
+    "createAuthCode": CreateAuthCodeRequest,
+    "grantToken": GrantTokenRequest,
+    "authAdditionalOperation": AuthAdditionalOperationRequest,
+    "grantAdditionalOperation": GrantAdditionalOperationRequest,
+    "getInfo": GetInfoRequest,
+    "viewCraftbook": ViewCraftbookRequest,
+    "requestProfile": RequestProfileRequest,
+    "requestBasicInfo": RequestBasicInfoRequest,
+    "requestGearInfo": RequestGearInfoRequest,
+    "requestStock": RequestStockRequest,
+    "guildInfo": GuildInfoRequest,
+    "wantToBuy": WantToBuyRequest,
+}
+
+
+def _build_request(d):
+    if type(d) is not dict:
+        raise ValueError("request descriptor must be JSON object")
+    kwargs = {k: v for k, v in d.items() if k != "action" and k != "id"}
+    try:
+        cls = _REQUESTS[d["action"]]
+    except KeyError:
+        raise ValueError(f"unknown action {d.get('action', None) !r}") from None
+    if cls is AuthAdditionalOperationRequest and "operation" in kwargs:
+        kwargs["operation"] = _decode_operation(kwargs["operation"])
+    if cls is WantToBuyRequest:
+        kwargs.setdefault("exactPrice", False)
+    return cls(**kwargs)
+
+
+def _jsonable(o):
+    if o is None or type(o) in (bool, int, float, str):
+        return o
+    if isinstance(o, Enum):
+        return o.value
+    if type(o) is QuantityRange:
+        return [o.start, o.end]
+    if type(o) is StockCell:
+        return {"code": o.code, "name": o.name, "quantity": _jsonable(o.quantity)}
+    if type(o) is GuildRolesSet:
+        return [r.value for r in GuildRole if r is not GuildRole.NoRole and r in o]
+    if isinstance(o, (tuple, list)):
+        return [_jsonable(v) for v in o]
+    d = dict()
+    for cls in reversed(type(o).__mro__):
+        slots = cls.__dict__.get("__slots__", ())
+        for n in ((slots,) if type(slots) is str else slots):
+            if not n.startswith("_"):
+                d[n.rstrip("_")] = _jsonable(getattr(o, n, None))
+    if isinstance(o, GearSet):
+        d["gear"] = {s.value: _jsonable(g) for s, g in o.occupied()}
+    elif isinstance(o, (RecipeBook, Stock)):
+        d["items"] = [_jsonable(v) for v in o]
+    return d
+
+
+def _parse_args(argv):
+    parser = ArgumentParser(prog="python -m cwapi", description="Sends requests from JSONL (one {\"action\": ..., <payload fields>} object per line, optional \"id\" is copied to output) and writes responses as JSONL in completion order")
+    parser.add_argument("input", nargs="?", type=FileType("r", encoding="utf-8"), default=sys.stdin, help="JSONL file with requests, stdin by default")
+    parser.add_argument("--server", choices=("CW3", "International"), default="CW3")
+    parser.add_argument("--instance", required=True, help="API instance name")
+    parser.add_argument("--password", default=environ.get("CWAPI_PASSWORD", None), help="API instance password, CWAPI_PASSWORD environment variable by default")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="max requests in flight")
+    parser.add_argument("-r", "--rate", type=float, default=None, help="max requests per second")
+    parser.add_argument("--native-transport", action="store_true", help="use built-in AMQP transport instead of aio_pika")
+    args = parser.parse_args(argv)
+    if args.password is None:
+        parser.error("password is required")
+    if args.concurrency < 1:
+        parser.error("concurrency must be positive")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("rate must be positive")
+    return args
+
+
+def _write(out, line):
+    out.write(json.dumps(line, ensure_ascii=False))
+    out.write("\n")
+    out.flush()
+
+
+async def _run(client, source, out, concurrency, rate):
+    from asyncio import Semaphore, get_running_loop, sleep, wait, FIRST_COMPLETED
+
+    loop = get_running_loop()
+    slots = Semaphore(concurrency)
+    pending = set()
+    next_start = loop.time()
+    failed = 0
+
+    async def one(n, d):
+        nonlocal failed
+        try:
+            rid = d.get("id", n) if type(d) is dict else n
+            try:
+                req = _build_request(d)
+            except (KeyError, TypeError, ValueError) as e:
+                failed += 1
+                _write(out, {"id": rid, "error": "BadRequest", "message": str(e)})
+                return
+            try:
+                res = await client.ask(req)
+            except response_error as e:
+                failed += 1
+                _write(out, {"id": rid, "action": d["action"], "error": type(e).__name__, "message": str(e), "details": _jsonable(e)})
+            except Exception as e:
+                failed += 1
+                _write(out, {"id": rid, "action": d["action"], "error": type(e).__name__, "message": str(e)})
+            else:
+                _write(out, {"id": rid, "action": d["action"], "type": type(res).__name__, "response": _jsonable(res)})
+        finally:
+            slots.release()
+
+    n = 0
+    lines = []
+    while True:
+        if not lines:
+            # input is read by bounded chunks, so memory doesn't depend on its size
+            lines = await loop.run_in_executor(None, source.readlines, 65536)
+            if not lines:
+                break
+            lines.reverse()
+        line = lines.pop()
+        if not line.strip():
+            continue
+        n += 1
+
+        await slots.acquire()
+        if rate is not None:
+            now = loop.time()
+            if next_start > now:
+                await sleep(next_start - now)
+            next_start = max(now, next_start) + 1 / rate
+
+        try:
+            d = json.loads(line)
+        except ValueError as e:
+            failed += 1
+            _write(out, {"id": n, "error": "BadRequest", "message": str(e)})
+            slots.release()
+            continue
+
+        t = loop.create_task(one(n, d))
+        pending.add(t)
+        t.add_done_callback(pending.discard)
+
+    while pending:
+        await wait(set(pending), return_when=FIRST_COMPLETED)
+    return failed
+
+
+async def _main(args):
+    async with AsyncChatWarsApiClient(Server[args.server], args.instance, args.password, native_transport=args.native_transport) as client:
+        return await _run(client, args.input, sys.stdout, args.concurrency, args.rate)
+
+
+def main(argv=None):
+    from asyncio import run
+
+    args = _parse_args(argv)
+    try:
+        failed = run(_main(args))
+    except KeyboardInterrupt:
+        return 130
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,575 @@
+from asyncio import Event, Lock, Queue as aioQueue, TimeoutError as aioTimeoutError, ensure_future, get_running_loop, open_connection, sleep, wait_for
+from struct import Struct, pack, unpack_from
+from time import monotonic
+from urllib.parse import unquote, urlsplit
+
+__all__ = ()
+
+_PROTOCOL_HEADER = b"AMQP\x00\x00\x09\x01"
+_FRAME_END = b"\xce"
+_FRAME_METHOD = 1
+_FRAME_HEADER = 2
+_FRAME_BODY = 3
+_FRAME_HEARTBEAT = 8
+_HEARTBEAT_FRAME = b"\x08\x00\x00\x00\x00\x00\x00\xce"
+
+_frame_header = Struct(">BHI")
+_method_header = Struct(">BHIHH")
+_content_header = Struct(">BHIHHQH")
+_deliver_tail = Struct(">QB")
+
+_CONNECTION_START = (10, 10)
+_CONNECTION_TUNE = (10, 30)
+_CONNECTION_OPEN_OK = (10, 41)
+_CONNECTION_CLOSE = (10, 50)
+_CONNECTION_CLOSE_OK = (10, 51)
+_CHANNEL_OPEN_OK = (20, 11)
+_CHANNEL_FLOW = (20, 20)
+_CHANNEL_FLOW_OK = (20, 21)
+_CHANNEL_CLOSE = (20, 40)
+_CHANNEL_CLOSE_OK = (20, 41)
+_EXCHANGE_DECLARE_OK = (40, 11)
+_QUEUE_DECLARE_OK = (50, 11)
+_QUEUE_BIND_OK = (50, 21)
+_QUEUE_PURGE_OK = (50, 31)
+_BASIC_QOS_OK = (60, 11)
+_BASIC_CONSUME_OK = (60, 21)
+_BASIC_CANCEL_OK = (60, 31)
+_BASIC_CANCEL = (60, 30)
+_BASIC_DELIVER = (60, 60)
+
+
+def _shortstr(s):
+    b = s.encode("utf-8")
+    if len(b) > 255:
+        raise ValueError("short string is too long")
+    return pack(">B", len(b)) + b
+
+
+def _longstr(b):
+    return pack(">I", len(b)) + b
+
+
+def _read_shortstr(mv, pos):
+    n = mv[pos]
+    return str(mv[pos + 1:pos + 1 + n], "utf-8"), pos + 1 + n
+
+
+def _read_longstr(mv, pos):
+    n = unpack_from(">I", mv, pos)[0]
+    return mv[pos + 4:pos + 4 + n], pos + 4 + n
+
+
+def _method_frame(channel, method, args=b""):
+    return _method_header.pack(_FRAME_METHOD, channel, len(args) + 4, method[0], method[1]) + args + _FRAME_END
+
+
+class AMQPError(ConnectionError):
+    pass
+
+
+def _close_error(mv):
+    return AMQPError(f"server closed with code {unpack_from('>H', mv, 4)[0]}: {_read_shortstr(mv, 6)[0]}")
+
+
+class Message:
+    __slots__ = "body", "delivery_tag", "redelivered", "exchange", "routing_key", "__channel", "__processed"
+
+    def __new__(cls, channel, body, delivery_tag, redelivered, exchange, routing_key):
+        self = super().__new__(cls)
+        self.body = body
+        self.delivery_tag = delivery_tag
+        self.redelivered = redelivered
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.__channel = channel
+        self.__processed = False
+        return self
+
+    @property
+    def processed(self):
+        return self.__processed
+
+    async def ack(self, multiple=False):
+        self.__processed = True
+        self.__channel._send(_method_frame(self.__channel.number, (60, 80), pack(">QB", self.delivery_tag, 1 if multiple else 0)))
+        await self.__channel._drain()
+
+    async def reject(self, requeue=False):
+        self.__processed = True
+        self.__channel._send(_method_frame(self.__channel.number, (60, 90), pack(">QB", self.delivery_tag, 1 if requeue else 0)))
+        await self.__channel._drain()
+
+    def process(self):
+        return _message_process(self)
+
+
+class _message_process:
+    __slots__ = "__message",
+
+    def __init__(self, message):
+        self.__message = message
+
+    async def __aenter__(self):
+        return self.__message
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.__message.processed:
+            return False
+        if exc_type is None:
+            await self.__message.ack()
+        else:
+            await self.__message.reject()
+        return False
+
+
+class Exchange:
+    __slots__ = "__channel", "name"
+
+    def __new__(cls, channel, name):
+        self = super().__new__(cls)
+        self.__channel = channel
+        self.name = name
+        return self
+
+    async def publish(self, body, routing_key, *, mandatory=False):
+        await self.__channel._flow()
+        self.__channel._publish(self.name, routing_key, body, mandatory)
+        await self.__channel._drain()
+
+
+class Queue:
+    __slots__ = "__channel", "name"
+
+    def __new__(cls, channel, name):
+        self = super().__new__(cls)
+        self.__channel = channel
+        self.name = name
+        return self
+
+    async def purge(self):
+        mv = await self.__channel._rpc((50, 30), pack(">H", 0) + _shortstr(self.name) + b"\x00", _QUEUE_PURGE_OK)
+        return unpack_from(">I", mv, 0)[0]
+
+    async def bind(self, exchange, routing_key=""):
+        if isinstance(exchange, Exchange):
+            exchange = exchange.name
+        await self.__channel._rpc((50, 20), pack(">H", 0) + _shortstr(self.name) + _shortstr(exchange) + _shortstr(routing_key) + b"\x00" + pack(">I", 0), _QUEUE_BIND_OK)
+
+    def iterator(self):
+        return _queue_iterator(self.__channel, self.name)
+
+
+class _queue_iterator:
+    __slots__ = "__channel", "__queue_name", "__tag", "__messages"
+
+    def __init__(self, channel, queue_name):
+        self.__channel = channel
+        self.__queue_name = queue_name
+        self.__tag = None
+        self.__messages = aioQueue()
+
+    async def __aenter__(self):
+        await self.consume()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    async def consume(self):
+        mv = await self.__channel._rpc((60, 20), pack(">H", 0) + _shortstr(self.__queue_name) + b"\x00\x00" + pack(">I", 0), _BASIC_CONSUME_OK, self.__register)
+        self.__tag = _read_shortstr(mv, 0)[0]
+
+    def __register(self, mv):
+        # deliveries can follow consume-ok in the same read, so consumer must be known before waiter wakes up
+        self.__channel._consumers[_read_shortstr(mv, 0)[0]] = self.__messages
+
+    async def close(self):
+        tag, self.__tag = self.__tag, None
+        if tag is None:
+            return
+        self.__channel._consumers.pop(tag, None)
+        try:
+            await self.__channel._rpc((60, 30), _shortstr(tag) + b"\x00", _BASIC_CANCEL_OK)
+        except AMQPError:
+            if not self.__channel.is_closed:
+                raise
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.__tag is None:
+            await self.consume()
+        message = await self.__messages.get()
+        if isinstance(message, BaseException):
+            self.__messages.put_nowait(message)
+            raise message
+        return message
+
+
+class Channel:
+    __slots__ = "__connection", "number", "_consumers", "__lock", "__waiter", "__expected", "__on_reply", "__closed", "__delivery", "__body", "__body_size", "__active"
+
+    def __new__(cls, connection, number):
+        self = super().__new__(cls)
+        self.__connection = connection
+        self.number = number
+        self._consumers = dict()
+        self.__lock = Lock()
+        self.__waiter = None
+        self.__expected = None
+        self.__on_reply = None
+        self.__closed = None
+        self.__delivery = None
+        self.__body = None
+        self.__body_size = 0
+        # cleared by server with channel.flow, publishing waits while it's cleared
+        self.__active = Event()
+        self.__active.set()
+        return self
+
+    @property
+    def is_closed(self):
+        return self.__closed is not None
+
+    @property
+    def is_active(self):
+        return self.__active.is_set()
+
+    def _send(self, data):
+        if self.__closed is not None:
+            raise self.__closed
+        self.__connection._send(data)
+
+    async def _drain(self):
+        await self.__connection._drain()
+
+    async def _flow(self):
+        if not self.__active.is_set():
+            await self.__active.wait()
+            if self.__closed is not None:
+                raise self.__closed
+
+    async def _rpc(self, method, args, expected, on_reply=None):
+        async with self.__lock:
+            if self.__closed is not None:
+                raise self.__closed
+            self.__waiter = get_running_loop().create_future()
+            self.__expected = expected
+            self.__on_reply = on_reply
+            self.__connection._send(_method_frame(self.number, method, args))
+            try:
+                await self.__connection._drain()
+                return await self.__waiter
+            finally:
+                self.__waiter = None
+                self.__expected = None
+                self.__on_reply = None
+
+    def _publish(self, exchange, routing_key, body, mandatory):
+        if self.__closed is not None:
+            raise self.__closed
+        frame_max = self.__connection.frame_max - 8
+        parts = [
+            _method_frame(self.number, (60, 40), pack(">H", 0) + _shortstr(exchange) + _shortstr(routing_key) + (b"\x01" if mandatory else b"\x00")),
+            _content_header.pack(_FRAME_HEADER, self.number, 14, 60, 0, len(body), 0),
+            _FRAME_END,
+        ]
+        mv = memoryview(body)
+        for i in range(0, len(body), frame_max):
+            chunk = mv[i:i + frame_max]
+            parts.append(_frame_header.pack(_FRAME_BODY, self.number, len(chunk)))
+            parts.append(chunk)
+            parts.append(_FRAME_END)
+        self.__connection._send(b"".join(parts))
+
+    def _fail(self, exc):
+        if self.__closed is not None:
+            return
+        self.__closed = exc
+        # publishers waiting for flow are woken up to get error
+        self.__active.set()
+        if self.__waiter is not None and not self.__waiter.done():
+            self.__waiter.set_exception(exc)
+        for messages in self._consumers.values():
+            messages.put_nowait(exc)
+        self._consumers.clear()
+
+    def _on_method(self, key, mv):
+        if key == _BASIC_DELIVER:
+            tag, pos = _read_shortstr(mv, 4)
+            delivery_tag, redelivered = _deliver_tail.unpack_from(mv, pos)
+            exchange, pos = _read_shortstr(mv, pos + 9)
+            routing_key, pos = _read_shortstr(mv, pos)
+            self.__delivery = (tag, delivery_tag, bool(redelivered & 1), exchange, routing_key)
+        elif key == _BASIC_CANCEL:
+            messages = self._consumers.pop(_read_shortstr(mv, 4)[0], None)
+            if messages is not None:
+                messages.put_nowait(AMQPError("consumer cancelled by server"))
+        elif key == _CHANNEL_FLOW:
+            active = mv[4] & 1
+            if active:
+                self.__active.set()
+            else:
+                self.__active.clear()
+            self.__connection._send(_method_frame(self.number, _CHANNEL_FLOW_OK, pack(">B", active)))
+        elif key == _CHANNEL_CLOSE:
+            self.__connection._send(_method_frame(self.number, _CHANNEL_CLOSE_OK))
+            self.__connection._forget(self.number)
+            self._fail(_close_error(mv))
+        elif key == self.__expected and self.__waiter is not None and not self.__waiter.done():
+            if self.__on_reply is not None:
+                self.__on_reply(mv[4:])
+            self.__waiter.set_result(mv[4:])
+
+    def _on_header(self, mv):
+        self.__body_size = unpack_from(">Q", mv, 4)[0]
+        self.__body = None
+        if self.__body_size == 0:
+            self.__deliver(b"")
+
+    def _on_body(self, payload):
+        if self.__body is None and len(payload) == self.__body_size:
+            self.__deliver(payload)
+            return
+        if self.__body is None:
+            self.__body = bytearray()
+        self.__body += payload
+        if len(self.__body) >= self.__body_size:
+            self.__deliver(bytes(self.__body))
+
+    def __deliver(self, body):
+        tag, delivery_tag, redelivered, exchange, routing_key = self.__delivery
+        self.__delivery = None
+        self.__body = None
+        messages = self._consumers.get(tag, None)
+        if messages is not None:
+            messages.put_nowait(Message(self, body, delivery_tag, redelivered, exchange, routing_key))
+
+    async def set_qos(self, prefetch_count=0, prefetch_size=0):
+        await self._rpc((60, 10), pack(">IHB", prefetch_size, prefetch_count, 0), _BASIC_QOS_OK)
+
+    async def get_exchange(self, name, *, ensure=True):
+        if ensure:
+            await self._rpc((40, 10), pack(">H", 0) + _shortstr(name) + _shortstr("") + b"\x01" + pack(">I", 0), _EXCHANGE_DECLARE_OK)
+        return Exchange(self, name)
+
+    async def get_queue(self, name, *, ensure=True):
+        if ensure:
+            await self._rpc((50, 10), pack(">H", 0) + _shortstr(name) + b"\x01" + pack(">I", 0), _QUEUE_DECLARE_OK)
+        return Queue(self, name)
+
+    async def close(self):
+        if self.__closed is not None:
+            return
+        try:
+            await wait_for(self._rpc((20, 40), pack(">H", 200) + _shortstr("") + pack(">HH", 0, 0), _CHANNEL_CLOSE_OK), self.__connection.close_timeout)
+        except aioTimeoutError:
+            pass
+        finally:
+            self.__connection._forget(self.number)
+            self._fail(AMQPError("channel closed"))
+
+
+class Connection:
+    __slots__ = "__reader", "__writer", "__channels", "__next_channel", "frame_max", "channel_max", "heartbeat", "close_timeout", "__closed", "__closing", "__read_task", "__heartbeat_task", "__last_read", "__handshake", "__drain_lock"
+
+    def __new__(cls, reader, writer):
+        self = super().__new__(cls)
+        self.__reader = reader
+        self.__writer = writer
+        self.__channels = dict()
+        self.__next_channel = 1
+        self.frame_max = 131072
+        self.channel_max = 65535
+        self.heartbeat = 0
+        self.close_timeout = 5.0
+        self.__closed = None
+        self.__closing = None
+        self.__read_task = None
+        self.__heartbeat_task = None
+        self.__last_read = monotonic()
+        self.__handshake = None
+        # StreamWriter.drain() can't be awaited concurrently before python 3.10
+        self.__drain_lock = Lock()
+        return self
+
+    @property
+    def is_closed(self):
+        return self.__closed is not None
+
+    def _send(self, data):
+        if self.__closed is not None:
+            raise self.__closed
+        self.__writer.write(data)
+
+    async def _drain(self):
+        # waits only while transport buffer is above high-water mark (slow broker or socket)
+        async with self.__drain_lock:
+            await self.__writer.drain()
+
+    def _forget(self, number):
+        self.__channels.pop(number, None)
+
+    async def __read_frame(self):
+        frame_type, channel, size = _frame_header.unpack(await self.__reader.readexactly(7))
+        payload = await self.__reader.readexactly(size)
+        if await self.__reader.readexactly(1) != _FRAME_END:
+            raise AMQPError("frame end expected")
+        self.__last_read = monotonic()
+        return frame_type, channel, payload
+
+    async def _open(self, username, password, virtual_host, heartbeat):
+        self.__writer.write(_PROTOCOL_HEADER)
+
+        frame_type, _, payload = await self.__read_frame()
+        mv = memoryview(payload)
+        if frame_type != _FRAME_METHOD or tuple(unpack_from(">HH", mv, 0)) != _CONNECTION_START:
+            raise AMQPError("connection.start expected")
+        pos = 6 + 4 + unpack_from(">I", mv, 6)[0]
+        mechanisms = bytes(_read_longstr(mv, pos)[0]).split()
+        if b"PLAIN" not in mechanisms:
+            raise AMQPError("server doesn't support PLAIN authentication")
+
+        client_properties = b"\x07productS" + _longstr(b"cwapi")
+        self.__writer.write(_method_frame(0, (10, 11), _longstr(client_properties) + _shortstr("PLAIN") + _longstr(b"\x00" + username.encode("utf-8") + b"\x00" + password.encode("utf-8")) + _shortstr("en_US")))
+
+        while True:
+            frame_type, _, payload = await self.__read_frame()
+            mv = memoryview(payload)
+            if frame_type != _FRAME_METHOD:
+                continue
+            key = tuple(unpack_from(">HH", mv, 0))
+            if key == _CONNECTION_CLOSE:
+                raise _close_error(mv)
+            if key == _CONNECTION_TUNE:
+                break
+        channel_max, frame_max, server_heartbeat = unpack_from(">HIH", mv, 4)
+        self.channel_max = channel_max or 65535
+        if frame_max:
+            self.frame_max = min(self.frame_max, frame_max)
+        self.heartbeat = server_heartbeat if heartbeat is None else heartbeat
+        self.__writer.write(_method_frame(0, (10, 31), pack(">HIH", self.channel_max, self.frame_max, self.heartbeat)))
+
+        self.__writer.write(_method_frame(0, (10, 40), _shortstr(virtual_host) + _shortstr("") + b"\x00"))
+        while True:
+            frame_type, _, payload = await self.__read_frame()
+            mv = memoryview(payload)
+            if frame_type != _FRAME_METHOD:
+                continue
+            key = tuple(unpack_from(">HH", mv, 0))
+            if key == _CONNECTION_CLOSE:
+                raise _close_error(mv)
+            if key == _CONNECTION_OPEN_OK:
+                break
+
+        self.__read_task = ensure_future(self.__read())
+        if self.heartbeat:
+            self.__heartbeat_task = ensure_future(self.__beat())
+
+    async def __read(self):
+        try:
+            while True:
+                frame_type, number, payload = await self.__read_frame()
+                if frame_type == _FRAME_HEARTBEAT:
+                    continue
+                if number == 0:
+                    mv = memoryview(payload)
+                    key = tuple(unpack_from(">HH", mv, 0))
+                    if key == _CONNECTION_CLOSE:
+                        self.__writer.write(_method_frame(0, _CONNECTION_CLOSE_OK))
+                        raise _close_error(mv)
+                    if key == _CONNECTION_CLOSE_OK and self.__closing is not None:
+                        self.__closing.set_result(None)
+                        raise AMQPError("connection closed")
+                    continue
+                channel = self.__channels.get(number, None)
+                if channel is None:
+                    continue
+                if frame_type == _FRAME_BODY:
+                    channel._on_body(payload)
+                elif frame_type == _FRAME_HEADER:
+                    channel._on_header(memoryview(payload))
+                elif frame_type == _FRAME_METHOD:
+                    mv = memoryview(payload)
+                    channel._on_method(tuple(unpack_from(">HH", mv, 0)), mv)
+        except Exception as e:
+            self.__fail(e if isinstance(e, AMQPError) else AMQPError(f"connection lost: {e !r}"))
+
+    async def __beat(self):
+        interval = self.heartbeat / 2
+        while self.__closed is None:
+            await sleep(interval)
+            if monotonic() - self.__last_read > self.heartbeat * 2:
+                self.__fail(AMQPError("missed heartbeats from server"))
+                return
+            self.__writer.write(_HEARTBEAT_FRAME)
+            await self._drain()
+
+    def __fail(self, exc):
+        if self.__closed is not None:
+            return
+        self.__closed = exc
+        for channel in list(self.__channels.values()):
+            channel._fail(exc)
+        self.__channels.clear()
+        if self.__closing is not None and not self.__closing.done():
+            self.__closing.set_result(None)
+        if self.__heartbeat_task is not None:
+            self.__heartbeat_task.cancel()
+        self.__writer.close()
+
+    async def channel(self):
+        if self.__closed is not None:
+            raise self.__closed
+        for _ in range(self.channel_max):
+            number = self.__next_channel
+            self.__next_channel = number % self.channel_max + 1
+            if number not in self.__channels:
+                break
+        else:
+            raise AMQPError("no free channels")
+        channel = self.__channels[number] = Channel(self, number)
+        await channel._rpc((20, 10), _shortstr(""), _CHANNEL_OPEN_OK)
+        return channel
+
+    async def close(self):
+        if self.__closed is not None:
+            return
+        self.__closing = get_running_loop().create_future()
+        try:
+            self.__writer.write(_method_frame(0, (10, 50), pack(">H", 200) + _shortstr("") + pack(">HH", 0, 0)))
+            # connection is dropped anyway if broker doesn't answer in time
+            await wait_for(self.__closing, self.close_timeout)
+        except aioTimeoutError:
+            pass
+        finally:
+            self.__fail(AMQPError("connection closed"))
+
+
+async def connect(url, *, heartbeat=None, ssl_context=None, close_timeout=5.0):
+    parts = urlsplit(url)
+    if parts.scheme == "amqps":
+        if ssl_context is None:
+            from ssl import create_default_context
+
+            ssl_context = create_default_context()
+        port = parts.port or 5671
+    elif parts.scheme == "amqp":
+        ssl_context = None
+        port = parts.port or 5672
+    else:
+        raise ValueError(f"unsupported url scheme {parts.scheme !r}")
+
+    virtual_host = unquote(parts.path[1:]) if len(parts.path) > 1 else "/"
+    reader, writer = await open_connection(parts.hostname, port, ssl=ssl_context)
+    connection = Connection(reader, writer)
+    connection.close_timeout = close_timeout
+    try:
+        await connection._open(unquote(parts.username or "guest"), unquote(parts.password or "guest"), virtual_host, heartbeat)
+    except BaseException:
+        writer.close()
+        raise
+    return connection
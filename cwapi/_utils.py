@@ -1,3 +1,8 @@
+from collections import OrderedDict
+from operator import attrgetter
+from threading import Lock, local
+from warnings import warn
+
 __all__ = ()
 
 class _optional_slot_wrapper:
@@ -14,7 +19,7 @@ class _optional_slot_wrapper:
         return self.__slot.__get__(instance, owner)
 
     def __set__(self, instance, value):
-        if type(value) is not self.__type:
+        if type(value) is not self.__type and type(value) is not _frozen_types.get(self.__type, None):
             raise TypeError(f"property {self._name !r} must be {self.__type.__qualname__ !r}, got {type(value).__qualname__ !r}")
         return self.__slot.__set__(instance, value)
 
@@ -27,6 +32,52 @@ class _slot_wrapper(_optional_slot_wrapper):
         raise TypeError(f"property {self._name !r} can't be deleted")
 
 
+class _validation_state(local):
+    trusted = False
+    parse_trusted = False
+    # trusted sections running in all threads; while there are none constructors don't look into thread-local state
+    sections = 0
+
+
+_validation = _validation_state()
+_sections_lock = Lock()
+
+
+def _run_validated(trusted, f, /, *args):
+    if trusted is None:
+        trusted = _validation_state.parse_trusted
+    previous = _validation.trusted
+    if previous is trusted:
+        return f(*args)
+    if not trusted:
+        _validation.trusted = False
+        try:
+            return f(*args)
+        finally:
+            _validation.trusted = True
+    with _sections_lock:
+        _validation_state.sections += 1
+    _validation.trusted = True
+    try:
+        return f(*args)
+    finally:
+        _validation.trusted = False
+        with _sections_lock:
+            _validation_state.sections -= 1
+
+
+def _check_slots(cls):
+    # model objects are created by thousands, __dict__ would make each of them several times bigger
+    if cls.__dictoffset__ != 0:
+        raise TypeError(f"{cls.__qualname__} instances must not have __dict__, all bases must define __slots__")
+    return cls
+
+
+def _restore(cls, kwargs, /):
+    # unpickling goes through constructor, so values are checked like in objects created by user
+    return cls(**kwargs)
+
+
 class _dataclass_creator(type):
     def __new__(mcs, name, bases, dct, /, *, names, types, super_names=()):
         assert type(names) is tuple
@@ -42,6 +93,7 @@ class _dataclass_creator(type):
         assert "__new__" not in dct
 
         final_args_list = super_names + names
+        raw_slots = []
 
         def new(_cls, *args, **kwargs):
             if len(args) > len(final_args_list):
@@ -59,6 +111,11 @@ class _dataclass_creator(type):
 
             self = super(cls, _cls).__new__(_cls, *args[:len(super_names)])
 
+            if _validation_state.sections and _validation.trusted:
+                for s, v in zip(raw_slots, args[len(super_names):]):
+                    s.__set__(self, v)
+                return self
+
             for n, v in zip(names, args[len(super_names):]):
                 if v is None:
                     delattr(self, n)
@@ -69,10 +126,30 @@ class _dataclass_creator(type):
 
         dct["__new__"] = new
 
-        cls = type(name, bases, dct)
+        if len(final_args_list) == 1:
+            getter = attrgetter(final_args_list[0])
+            fields = lambda self: (getter(self),)
+        elif final_args_list:
+            fields = attrgetter(*final_args_list)
+        else:
+            fields = lambda self: ()
+
+        # fields are pickled by name, so pickles survive reordering of fields
+        def reduce(self):
+            return _restore, (type(self), dict(zip(final_args_list, fields(self))))
+
+        # values of copied object were already checked
+        def copy(self):
+            return _run_validated(True, type(self), *fields(self))
+
+        dct.setdefault("__reduce__", reduce)
+        dct.setdefault("__copy__", copy)
+
+        cls = _check_slots(type(name, bases, dct))
 
         for n, t in zip(names, types):
             slot = getattr(cls, n)
+            raw_slots.append(slot)
             if type(t) is _optional:
                 wrapper = _optional_slot_wrapper(slot, t.type, n)
             else:
@@ -82,6 +159,102 @@ class _dataclass_creator(type):
         return cls
 
 
+class _read_only_slot:
+    __slots__ = "__slot", "_name"
+
+    def __new__(cls, slot, name):
+        self = super().__new__(cls)
+        self.__slot = slot
+        self._name = name
+        return self
+
+    def __get__(self, instance, owner):
+        return self.__slot.__get__(instance, owner)
+
+    def __set__(self, instance, value):
+        raise AttributeError(f"shared {type(instance).__qualname__ !r} object is read-only, property {self._name !r} can be changed only in its copy")
+
+    def __delete__(self, instance):
+        raise AttributeError(f"shared {type(instance).__qualname__ !r} object is read-only, property {self._name !r} can be changed only in its copy")
+
+
+_frozen_types = dict()
+
+
+def _frozen_type(cls, /):
+    # read-only subclass with same layout, objects shared by flyweight cache are switched to it;
+    # copies and unpickled objects aren't shared, so they are objects of original class
+    try:
+        return _frozen_types[cls]
+    except KeyError:
+        pass
+
+    def reduce(self):
+        _, (_, kwargs) = cls.__reduce__(self)
+        return _restore, (cls, kwargs)
+
+    def copy(self):
+        _, (_, kwargs) = cls.__reduce__(self)
+        return _run_validated(True, _restore, cls, kwargs)
+
+    dct = {"__slots__": (), "__module__": cls.__module__, "__qualname__": cls.__qualname__, "__reduce__": reduce, "__copy__": copy}
+    for n in cls.__slots__:
+        dct[n] = _read_only_slot(getattr(cls, n), n)
+    # metaclass of models isn't run again, class is already built
+    frozen = _frozen_types[cls] = _check_slots(type.__new__(type(cls), cls.__name__, (cls,), dct))
+    return frozen
+
+
+class _flyweight_cache:
+    # strong references to most recently used objects, so cached classes don't need __weakref__ slot;
+    # responses can be parsed in several threads (parse_executor), so cache is locked
+    __slots__ = "__objects", "__maxsize", "__lock"
+
+    current = None
+
+    def __new__(cls, maxsize, /):
+        self = super().__new__(cls)
+        self.__objects = OrderedDict()
+        self.__maxsize = maxsize
+        self.__lock = Lock()
+        return self
+
+    @property
+    def maxsize(self):
+        return self.__maxsize
+
+    def __len__(self):
+        return len(self.__objects)
+
+    def __call__(self, tp, args, /):
+        key = (tp, args)
+        try:
+            hash(key)
+        except TypeError:
+            return tp(*args)
+        with self.__lock:
+            o = self.__objects.get(key, None)
+            if o is not None:
+                self.__objects.move_to_end(key)
+                return o
+        o = tp(*args)
+        o.__class__ = _frozen_type(tp)
+        with self.__lock:
+            # other thread could store equal object meanwhile
+            o = self.__objects.setdefault(key, o)
+            self.__objects.move_to_end(key)
+            if len(self.__objects) > self.__maxsize:
+                self.__objects.popitem(last=False)
+        return o
+
+
+def _shared(tp, /, *args):
+    cache = _flyweight_cache.current
+    if cache is None:
+        return tp(*args)
+    return cache(tp, args)
+
+
 def encode_string(s):
     return s.encode("unicode-escape").replace(b'"', br'\"')
 
@@ -93,3 +266,51 @@ class _optional:
         self = super().__new__(cls)
         self.type = tp
         return self
+
+
+class _enum_decoder:
+    __slots__ = "__enum", "__members", "__unknown"
+
+    fallback = False
+
+    def __new__(cls, enum, /):
+        self = super().__new__(cls)
+        self.__enum = enum
+        self.__members = {m.value: m for m in enum.__members__.values()}
+        self.__unknown = dict()
+        return self
+
+    @property
+    def enum(self):
+        return self.__enum
+
+    def __call__(self, value, /):
+        try:
+            return self.__members[value]
+        except KeyError:
+            pass
+        except TypeError:
+            raise TypeError(f"{self.__enum.__qualname__ !r} value must be hashable, got {type(value).__qualname__ !r}") from None
+
+        # placeholders built while fallback was enabled aren't returned after it's disabled
+        if not _enum_decoder.fallback:
+            raise ValueError(f"unknown {self.__enum.__qualname__ !r} value {value !r}, probably it isn't supported yet")
+
+        try:
+            return self.__unknown[value]
+        except KeyError:
+            pass
+
+        warn(Warning(f"unknown {self.__enum.__qualname__ !r} value {value !r} decoded as placeholder member"))
+        factory = getattr(self.__enum, "_unknown_member", None)
+        if factory is not None:
+            m = factory(value)
+        else:
+            if self.__enum._member_type_ is object:
+                m = object.__new__(self.__enum)
+            else:
+                m = self.__enum._member_type_.__new__(self.__enum, value)
+            m._value_ = value
+            m._name_ = "Unknown"
+        self.__unknown[value] = m
+        return m
@@ -0,0 +1,168 @@
+from collections import deque
+from enum import Enum
+
+from .feeds import parse_feed
+
+__all__ = ("BufferPolicy", "SubscriptionBuffer")
+
+
+class BufferPolicy(str, Enum):
+    def __str__(self):
+        return self.value
+
+    Block = "block"
+    DropOldest = "drop_oldest"
+    DropNewest = "drop_newest"
+    Coalesce = "coalesce"
+
+
+class SubscriptionBuffer:
+    # entries are [key, event, message]; message is kept only by Block policy, it's acknowledged when event is taken by user
+    __slots__ = "__maxsize", "__policy", "__key", "__entries", "__index", "__received", "__delivered", "__dropped", "__coalesced", "__readable", "__writable", "__error", "__finished"
+
+    def __new__(cls, maxsize, /, policy=BufferPolicy.Block, key=None):
+        if type(maxsize) is not int:
+            raise TypeError("buffer size must be int")
+        if maxsize < 1:
+            raise ValueError("buffer size must be positive")
+        if type(policy) is not BufferPolicy:
+            raise TypeError(f"policy must be {BufferPolicy.__qualname__ !r}")
+        if policy is BufferPolicy.Coalesce:
+            if key is None:
+                raise TypeError("key function required for coalescing")
+            if not callable(key):
+                raise TypeError("key must be callable")
+        elif key is not None:
+            raise TypeError("key function can be used only with coalescing")
+
+        self = super().__new__(cls)
+        self.__maxsize = maxsize
+        self.__policy = policy
+        self.__key = key
+        self.__entries = deque()
+        self.__index = dict()
+        self.__received = 0
+        self.__delivered = 0
+        self.__dropped = 0
+        self.__coalesced = 0
+        self.__readable = None
+        self.__writable = None
+        self.__error = None
+        self.__finished = False
+        return self
+
+    @property
+    def maxsize(self):
+        return self.__maxsize
+
+    @property
+    def policy(self):
+        return self.__policy
+
+    @property
+    def received(self):
+        return self.__received
+
+    @property
+    def delivered(self):
+        return self.__delivered
+
+    @property
+    def dropped(self):
+        return self.__dropped
+
+    @property
+    def coalesced(self):
+        return self.__coalesced
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __pop(self):
+        entry = self.__entries.popleft()
+        if self.__key is not None and self.__index.get(entry[0], None) is entry:
+            del self.__index[entry[0]]
+        return entry
+
+    def _open(self):
+        from asyncio import Event
+
+        self.__readable = Event()
+        self.__writable = Event()
+        self.__error = None
+        self.__finished = False
+
+    async def _pump(self, feed, queue_iter, trusted):
+        # message taken from queue, but not acknowledged or put to buffer yet
+        message = None
+        try:
+            async for message in queue_iter:
+                try:
+                    event = parse_feed(feed, message.body, trusted)
+                except BaseException:
+                    m, message = message, None
+                    await m.reject()
+                    raise
+                self.__received += 1
+
+                if self.__policy is BufferPolicy.Block:
+                    # unacknowledged messages are limited by prefetch_count, so broker stops delivering
+                    while len(self.__entries) >= self.__maxsize:
+                        self.__writable.clear()
+                        await self.__writable.wait()
+                    self.__entries.append([None, event, message])
+                    message = None
+                    self.__readable.set()
+                    continue
+
+                m, message = message, None
+                await m.ack()
+                k = None
+                if self.__policy is BufferPolicy.Coalesce:
+                    k = self.__key(event)
+                    entry = self.__index.get(k, None)
+                    if entry is not None:
+                        # newer event replaces queued one and keeps its place in queue
+                        entry[1] = event
+                        self.__coalesced += 1
+                        continue
+                if len(self.__entries) >= self.__maxsize:
+                    self.__dropped += 1
+                    if self.__policy is BufferPolicy.DropNewest:
+                        continue
+                    self.__pop()
+                entry = [k, event, None]
+                self.__entries.append(entry)
+                if self.__key is not None:
+                    self.__index[k] = entry
+                self.__readable.set()
+        except Exception as e:
+            self.__error = e
+        finally:
+            self.__finished = True
+            self.__readable.set()
+            # pump cancelled while waiting for room in buffer, message is returned to queue
+            if message is not None:
+                await message.reject(requeue=True)
+
+    # None after all events are taken and consumer is stopped by broker
+    async def _get(self):
+        while not self.__entries:
+            if self.__error is not None:
+                raise self.__error
+            if self.__finished:
+                return None
+            self.__readable.clear()
+            await self.__readable.wait()
+        _, event, message = self.__pop()
+        self.__delivered += 1
+        self.__writable.set()
+        return event, message
+
+    async def _close(self):
+        # messages held by Block policy are returned to queue, events of other policies are already acknowledged and lost
+        entries, self.__entries = self.__entries, deque()
+        self.__index.clear()
+        for _, _, message in entries:
+            if message is not None:
+                await message.reject(requeue=True)
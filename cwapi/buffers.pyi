@@ -0,0 +1,39 @@
+from enum import Enum
+from typing import Any, Callable, Hashable, Optional, final
+
+
+class BufferPolicy(str, Enum):
+    # messages are acknowledged when event is taken by user, so with prefetch_count broker stops delivering when buffer is full;
+    # without prefetch_count broker doesn't stop, so listen() rejects this policy (ValueError)
+    Block = "block"
+    # other policies acknowledge messages on receiving, buffered events are lost if subscription is closed
+    DropOldest = "drop_oldest"
+    DropNewest = "drop_newest"
+    # event replaces queued event with same key (keeping its place), new keys drop oldest events when buffer is full
+    Coalesce = "coalesce"
+
+
+@final
+class SubscriptionBuffer:
+    # passed to AsyncChatWarsApiClient.listen, one buffer per subscription at time
+    def __new__(cls, maxsize: int, /, policy: BufferPolicy = BufferPolicy.Block, key: Optional[Callable[[Any], Hashable]] = None) -> SubscriptionBuffer: ...
+
+    @property
+    def maxsize(self) -> int: ...
+
+    @property
+    def policy(self) -> BufferPolicy: ...
+
+    @property
+    def received(self) -> int: ...
+
+    @property
+    def delivered(self) -> int: ...
+
+    @property
+    def dropped(self) -> int: ...
+
+    @property
+    def coalesced(self) -> int: ...
+
+    def __len__(self) -> int: ...
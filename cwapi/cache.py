@@ -0,0 +1,105 @@
+from hashlib import blake2b
+
+from .responses import GuildInfoResponse, RequestBasicInfoResponse, RequestGearInfoResponse, RequestProfileResponse, RequestStockResponse, ViewCraftbookResponse, parse_response
+
+__all__ = ("ResponseCache",)
+
+# replies of polled read-only requests, one-shot replies (auth, wantToBuy, ...) aren't worth keeping
+_ACTIONS = {
+    ViewCraftbookResponse: "viewCraftbook",
+    RequestBasicInfoResponse: "requestBasicInfo",
+    RequestProfileResponse: "requestProfile",
+    RequestGearInfoResponse: "requestGearInfo",
+    RequestStockResponse: "requestStock",
+    GuildInfoResponse: "guildInfo",
+}
+
+
+def _fingerprint(b):
+    return blake2b(b, digest_size=16).digest()
+
+
+class ResponseCache:
+    __slots__ = "__entries", "__digests", "__maxsize", "__hits", "__misses"
+
+    def __new__(cls, *, maxsize=None):
+        if maxsize is not None:
+            if type(maxsize) is not int:
+                raise TypeError("cache size must be int or None")
+            if maxsize < 1:
+                raise ValueError("cache size must be positive")
+
+        self = super().__new__(cls)
+        self.__entries = dict()
+        self.__digests = dict()
+        self.__maxsize = maxsize
+        self.__hits = 0
+        self.__misses = 0
+        return self
+
+    @property
+    def maxsize(self):
+        return self.__maxsize
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def get(self, action, userId, /):
+        e = self.__entries.get((action, userId), None)
+        return None if e is None else e[1]
+
+    def forget(self, action, userId, /):
+        e = self.__entries.pop((action, userId), None)
+        if e is not None:
+            del self.__digests[e[0]]
+
+    def clear(self):
+        self.__entries.clear()
+        self.__digests.clear()
+
+    def _lookup(self, b):
+        digest = _fingerprint(b)
+        key = self.__digests.get(digest, None)
+        if key is None:
+            self.__misses += 1
+            return digest, None
+        self.__hits += 1
+        if self.__maxsize is None:
+            return digest, self.__entries[key][1]
+        e = self.__entries[key] = self.__entries.pop(key)
+        return digest, e[1]
+
+    def _store(self, digest, res):
+        action = _ACTIONS.get(type(res), None)
+        if action is None:
+            return
+        key = (action, res.userId)
+        old = self.__entries.pop(key, None)
+        if old is not None:
+            del self.__digests[old[0]]
+        elif self.__maxsize is not None and len(self.__entries) >= self.__maxsize:
+            del self.__digests[self.__entries.pop(next(iter(self.__entries)))[0]]
+        self.__entries[key] = (digest, res)
+        self.__digests[digest] = key
+
+    def parse_changed(self, b, /, trusted=None):
+        digest, res = self._lookup(b)
+        if res is not None:
+            return res, False
+        res = parse_response(b, trusted)
+        self._store(digest, res)
+        return res, True
+
+    def parse(self, b, /, trusted=None):
+        return self.parse_changed(b, trusted)[0]
@@ -0,0 +1,37 @@
+from typing import Literal, NoReturn, Optional, Tuple, Union, final
+
+from .responses import GuildInfoResponse, RequestBasicInfoResponse, RequestGearInfoResponse, RequestProfileResponse, RequestStockResponse, ViewCraftbookResponse, response
+
+_ACTION = Literal["viewCraftbook", "requestBasicInfo", "requestProfile", "requestGearInfo", "requestStock", "guildInfo"]
+_CACHED_RESPONSE = Union[ViewCraftbookResponse, RequestBasicInfoResponse, RequestProfileResponse, RequestGearInfoResponse, RequestStockResponse, GuildInfoResponse]
+
+
+@final
+class ResponseCache:
+    # keeps last reply of every (action, userId) with fingerprint of its raw body;
+    # byte-identical reply is returned as same object without parsing, so cached objects must not be modified
+    def __new__(cls, *, maxsize: Optional[int] = None) -> ResponseCache: ...
+
+    @property
+    def maxsize(self) -> Optional[int]: ...
+
+    @property
+    def hits(self) -> int: ...
+
+    @property
+    def misses(self) -> int: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, key: Tuple[_ACTION, int]) -> bool: ...
+
+    def get(self, action: _ACTION, userId: int, /) -> Optional[_CACHED_RESPONSE]: ...
+
+    def forget(self, action: _ACTION, userId: int, /) -> NoReturn: ...
+
+    def clear(self) -> NoReturn: ...
+
+    def parse(self, b: bytes, /, trusted: Optional[bool] = None) -> response: ...
+
+    # flag is False if reply is equal to last cached one
+    def parse_changed(self, b: bytes, /, trusted: Optional[bool] = None) -> Tuple[response, bool]: ...
@@ -0,0 +1,219 @@
+import json
+from codecs import getincrementaldecoder
+from enum import Enum
+
+from ._utils import _dataclass_creator, _optional, _run_validated
+from .types import _decode_castle, _decode_condition, _decode_quality, Castle, Condition, Quality
+
+__all__ = ("Feed", "Deal", "Offer", "SexDigestEntry", "AuctionLot", "ShopOffer", "Shop", "parse_feed", "iter_feed")
+
+
+class Feed(str, Enum):
+    def __str__(self):
+        return self.value
+
+    Deals = "deals"
+    Offers = "offers"
+    SexDigest = "sex_digest"
+    AuDigest = "au_digest"
+    YellowPages = "yellow_pages"
+
+
+class Deal(
+    metaclass=_dataclass_creator,
+    names=("sellerId", "sellerCastle", "sellerName", "buyerId", "buyerCastle", "buyerName", "item", "qty", "price"),
+    types=(str, Castle, str, str, Castle, str, str, int, int),
+):
+    pass
+
+
+class Offer(
+    metaclass=_dataclass_creator,
+    names=("sellerId", "sellerName", "sellerCastle", "item", "qty", "price"),
+    types=(str, str, Castle, str, int, int),
+):
+    pass
+
+
+class SexDigestEntry(
+    metaclass=_dataclass_creator,
+    names=("name", "prices"),
+    types=(str, tuple),
+):
+    pass
+
+
+class AuctionLot(
+    metaclass=_dataclass_creator,
+    names=("lotId", "itemName", "sellerName", "sellerTag", "sellerCastle", "quality", "condition", "price", "status", "startedAt", "endAt", "buyerName", "buyerTag", "buyerCastle", "finishedAt"),
+    types=(str, str, str, _optional(str), Castle, _optional(Quality), _optional(Condition), int, str, str, str, _optional(str), _optional(str), _optional(Castle), _optional(str)),
+):
+    pass
+
+
+class ShopOffer(
+    metaclass=_dataclass_creator,
+    names=("item", "price", "mana"),
+    types=(str, int, int),
+):
+    pass
+
+
+class Shop(
+    metaclass=_dataclass_creator,
+    names=("link", "name", "ownerName", "ownerCastle", "kind", "mana", "offers", "maintenanceEnabled", "maintenanceCost", "guildDiscount", "castleDiscount"),
+    types=(str, str, str, Castle, str, int, tuple, bool, int, int, int),
+):
+    pass
+
+
+def _build_deal(o):
+    return Deal(sellerId=o["sellerId"], sellerCastle=_decode_castle(o["sellerCastle"]), sellerName=o["sellerName"], buyerId=o["buyerId"], buyerCastle=_decode_castle(o["buyerCastle"]), buyerName=o["buyerName"], item=o["item"], qty=o["qty"], price=o["price"])
+
+
+def _build_offer(o):
+    return Offer(sellerId=o["sellerId"], sellerName=o["sellerName"], sellerCastle=_decode_castle(o["sellerCastle"]), item=o["item"], qty=o["qty"], price=o["price"])
+
+
+def _build_sex_digest_entry(o):
+    return SexDigestEntry(name=o["name"], prices=tuple(o.get("prices", ())))
+
+
+def _build_auction_lot(o):
+    return AuctionLot(
+        lotId=o["lotId"], itemName=o["itemName"], sellerName=o["sellerName"], sellerTag=o.get("sellerTag", None) or None, sellerCastle=_decode_castle(o["sellerCastle"]),
+        quality=_decode_quality(o["quality"]) if o.get("quality", None) else None, condition=_decode_condition(o["condition"]) if o.get("condition", None) else None,
+        price=o.get("price", 0), status=o["status"], startedAt=o["startedAt"], endAt=o["endAt"],
+        buyerName=o.get("buyerName", None) or None, buyerTag=o.get("buyerTag", None) or None, buyerCastle=_decode_castle(o["buyerCastle"]) if o.get("buyerCastle", None) else None, finishedAt=o.get("finishedAt", None) or None
+    )
+
+
+def _build_shop(o):
+    return Shop(
+        link=o["link"], name=o["name"], ownerName=o["ownerName"], ownerCastle=_decode_castle(o["ownerCastle"]), kind=o["kind"], mana=o.get("mana", 0),
+        offers=tuple(ShopOffer(item=so["item"], price=so["price"], mana=so.get("mana", 0)) for so in o.get("offers", ())),
+        maintenanceEnabled=bool(o.get("maintenanceEnabled", False)), maintenanceCost=o.get("maintenanceCost", 0), guildDiscount=o.get("guildDiscount", 0), castleDiscount=o.get("castleDiscount", 0)
+    )
+
+
+_BUILDERS = {
+    Feed.Deals: _build_deal,
+    Feed.Offers: _build_offer,
+    Feed.SexDigest: _build_sex_digest_entry,
+    Feed.AuDigest: _build_auction_lot,
+    Feed.YellowPages: _build_shop,
+}
+
+_DIGESTS = frozenset((Feed.SexDigest, Feed.AuDigest, Feed.YellowPages))
+
+
+def _build_digest(build, o):
+    return tuple(map(build, o))
+
+
+def parse_feed(feed, b, /, trusted=None):
+    if type(feed) is not Feed:
+        raise TypeError(f"feed must be {Feed.__qualname__ !r}")
+    o = json.loads(b.decode("utf-8"))
+    build = _BUILDERS[feed]
+    if feed in _DIGESTS:
+        return _run_validated(trusted, _build_digest, build, o)
+    return _run_validated(trusted, build, o)
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+# states of array parser: what is expected next
+_OPENING = 0  # "["
+_FIRST = 1  # value or "]"
+_VALUE = 2  # value (after ",")
+_DELIMITER = 3  # "," or "]"
+_END = 4  # only whitespace
+
+
+def _iter_json_array(b, chunk_size):
+    mv = memoryview(b)
+    decoder = getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    offset = 0
+    state = _OPENING
+    need_more = False
+
+    while True:
+        if need_more:
+            if offset >= len(mv):
+                raise ValueError("unexpected end of JSON array")
+            buf = buf[pos:] + decoder.decode(mv[offset:offset + chunk_size], offset + chunk_size >= len(mv))
+            pos = 0
+            offset += chunk_size
+            need_more = False
+
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buf):
+            if state == _END and offset >= len(mv):
+                return
+            need_more = True
+            continue
+
+        c = buf[pos]
+        if state == _OPENING:
+            if c != "[":
+                raise ValueError("JSON array expected")
+            state = _FIRST
+            pos += 1
+            continue
+        if state == _END:
+            raise ValueError("extra data after JSON array")
+        if state == _DELIMITER:
+            if c == ",":
+                state = _VALUE
+            elif c == "]":
+                state = _END
+            else:
+                raise ValueError("',' or ']' expected in JSON array")
+            pos += 1
+            continue
+        if state == _FIRST and c == "]":
+            state = _END
+            pos += 1
+            continue
+
+        try:
+            o, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if offset >= len(mv):
+                raise
+            need_more = True
+            continue
+        # value is accepted only when delimiter follows it, otherwise it can be cut by chunk boundary ("-1." of "-1.5e10")
+        nxt = end
+        while nxt < len(buf) and buf[nxt] in _WHITESPACE:
+            nxt += 1
+        if nxt < len(buf) and buf[nxt] in ",]":
+            pos = end
+            state = _DELIMITER
+            yield o
+            continue
+        if offset >= len(mv):
+            raise ValueError("',' or ']' expected in JSON array")
+        need_more = True
+
+
+def iter_feed(feed, b, /, chunk_size=65536, trusted=None):
+    if type(feed) is not Feed:
+        raise TypeError(f"feed must be {Feed.__qualname__ !r}")
+    if type(chunk_size) is not int:
+        raise TypeError("chunk size must be int")
+    if chunk_size < 1:
+        raise ValueError("chunk size must be positive")
+
+    build = _BUILDERS[feed]
+    if feed not in _DIGESTS:
+        yield _run_validated(trusted, build, json.loads(bytes(b).decode("utf-8")))
+        return
+    for o in _iter_json_array(b, chunk_size):
+        yield _run_validated(trusted, build, o)
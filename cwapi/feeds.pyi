@@ -0,0 +1,223 @@
+from enum import Enum
+from typing import ClassVar, Iterator, Literal, Optional, Tuple, Union, final, overload
+
+from .types import Castle, Condition, Quality
+
+
+@final
+class Feed(str, Enum):
+    def __str__(self) -> str: ...
+
+    Deals: ClassVar[str] = "deals"
+    Offers: ClassVar[str] = "offers"
+    SexDigest: ClassVar[str] = "sex_digest"
+    AuDigest: ClassVar[str] = "au_digest"
+    YellowPages: ClassVar[str] = "yellow_pages"
+
+
+@final
+class Deal:
+    @property
+    def sellerId(self) -> str: ...
+
+    @property
+    def sellerCastle(self) -> Castle: ...
+
+    @property
+    def sellerName(self) -> str: ...
+
+    @property
+    def buyerId(self) -> str: ...
+
+    @property
+    def buyerCastle(self) -> Castle: ...
+
+    @property
+    def buyerName(self) -> str: ...
+
+    @property
+    def item(self) -> str: ...
+
+    @property
+    def qty(self) -> int: ...
+
+    @property
+    def price(self) -> int: ...
+
+    def __new__(cls, sellerId: str, sellerCastle: Castle, sellerName: str, buyerId: str, buyerCastle: Castle, buyerName: str, item: str, qty: int, price: int) -> Deal: ...
+
+
+@final
+class Offer:
+    @property
+    def sellerId(self) -> str: ...
+
+    @property
+    def sellerName(self) -> str: ...
+
+    @property
+    def sellerCastle(self) -> Castle: ...
+
+    @property
+    def item(self) -> str: ...
+
+    @property
+    def qty(self) -> int: ...
+
+    @property
+    def price(self) -> int: ...
+
+    def __new__(cls, sellerId: str, sellerName: str, sellerCastle: Castle, item: str, qty: int, price: int) -> Offer: ...
+
+
+@final
+class SexDigestEntry:
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def prices(self) -> Tuple[int, ...]: ...
+
+    def __new__(cls, name: str, prices: Tuple[int, ...]) -> SexDigestEntry: ...
+
+
+@final
+class AuctionLot:
+    @property
+    def lotId(self) -> str: ...
+
+    @property
+    def itemName(self) -> str: ...
+
+    @property
+    def sellerName(self) -> str: ...
+
+    @property
+    def sellerTag(self) -> Optional[str]: ...
+
+    @property
+    def sellerCastle(self) -> Castle: ...
+
+    @property
+    def quality(self) -> Optional[Quality]: ...
+
+    @property
+    def condition(self) -> Optional[Condition]: ...
+
+    @property
+    def price(self) -> int: ...
+
+    @property
+    def status(self) -> str: ...
+
+    @property
+    def startedAt(self) -> str: ...
+
+    @property
+    def endAt(self) -> str: ...
+
+    @property
+    def buyerName(self) -> Optional[str]: ...
+
+    @property
+    def buyerTag(self) -> Optional[str]: ...
+
+    @property
+    def buyerCastle(self) -> Optional[Castle]: ...
+
+    @property
+    def finishedAt(self) -> Optional[str]: ...
+
+    def __new__(cls, lotId: str, itemName: str, sellerName: str, sellerTag: Optional[str], sellerCastle: Castle, quality: Optional[Quality], condition: Optional[Condition], price: int, status: str, startedAt: str, endAt: str, buyerName: Optional[str], buyerTag: Optional[str], buyerCastle: Optional[Castle], finishedAt: Optional[str]) -> AuctionLot: ...
+
+
+@final
+class ShopOffer:
+    @property
+    def item(self) -> str: ...
+
+    @property
+    def price(self) -> int: ...
+
+    @property
+    def mana(self) -> int: ...
+
+    def __new__(cls, item: str, price: int, mana: int) -> ShopOffer: ...
+
+
+@final
+class Shop:
+    @property
+    def link(self) -> str: ...
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def ownerName(self) -> str: ...
+
+    @property
+    def ownerCastle(self) -> Castle: ...
+
+    @property
+    def kind(self) -> str: ...
+
+    @property
+    def mana(self) -> int: ...
+
+    @property
+    def offers(self) -> Tuple[ShopOffer, ...]: ...
+
+    @property
+    def maintenanceEnabled(self) -> bool: ...
+
+    @property
+    def maintenanceCost(self) -> int: ...
+
+    @property
+    def guildDiscount(self) -> int: ...
+
+    @property
+    def castleDiscount(self) -> int: ...
+
+    def __new__(cls, link: str, name: str, ownerName: str, ownerCastle: Castle, kind: str, mana: int, offers: Tuple[ShopOffer, ...], maintenanceEnabled: bool, maintenanceCost: int, guildDiscount: int, castleDiscount: int) -> Shop: ...
+
+
+@overload
+def parse_feed(feed: Literal[Feed.Deals], b: bytes, /, trusted: Optional[bool] = None) -> Deal: ...
+
+
+@overload
+def parse_feed(feed: Literal[Feed.Offers], b: bytes, /, trusted: Optional[bool] = None) -> Offer: ...
+
+
+@overload
+def parse_feed(feed: Literal[Feed.SexDigest], b: bytes, /, trusted: Optional[bool] = None) -> Tuple[SexDigestEntry, ...]: ...
+
+
+@overload
+def parse_feed(feed: Literal[Feed.AuDigest], b: bytes, /, trusted: Optional[bool] = None) -> Tuple[AuctionLot, ...]: ...
+
+
+@overload
+def parse_feed(feed: Literal[Feed.YellowPages], b: bytes, /, trusted: Optional[bool] = None) -> Tuple[Shop, ...]: ...
+
+
+@overload
+def iter_feed(feed: Literal[Feed.Deals], b: Union[bytes, bytearray, memoryview], /, chunk_size: int = ..., trusted: Optional[bool] = None) -> Iterator[Deal]: ...
+
+
+@overload
+def iter_feed(feed: Literal[Feed.Offers], b: Union[bytes, bytearray, memoryview], /, chunk_size: int = ..., trusted: Optional[bool] = None) -> Iterator[Offer]: ...
+
+
+@overload
+def iter_feed(feed: Literal[Feed.SexDigest], b: Union[bytes, bytearray, memoryview], /, chunk_size: int = ..., trusted: Optional[bool] = None) -> Iterator[SexDigestEntry]: ...
+
+
+@overload
+def iter_feed(feed: Literal[Feed.AuDigest], b: Union[bytes, bytearray, memoryview], /, chunk_size: int = ..., trusted: Optional[bool] = None) -> Iterator[AuctionLot]: ...
+
+
+@overload
+def iter_feed(feed: Literal[Feed.YellowPages], b: Union[bytes, bytearray, memoryview], /, chunk_size: int = ..., trusted: Optional[bool] = None) -> Iterator[Shop]: ...
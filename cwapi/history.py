@@ -0,0 +1,265 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from time import time
+
+from ._utils import _dataclass_creator, _run_validated
+from .responses import RequestProfileResponse
+
+__all__ = ("ProfileHistory", "ProfileSample")
+
+_FIELDS = ("exp", "gold", "hp", "mana", "stamina", "lvl", "pouches")
+_FIELD_INDEXES = {n: i for i, n in enumerate(_FIELDS)}
+_ALL_FIELDS_MASK = (1 << len(_FIELDS)) - 1
+# indexes of changed fields for every mask, so replaying doesn't test bits one by one
+_MASK_FIELDS = tuple(tuple(f for f in range(len(_FIELDS)) if m >> f & 1) for m in range(_ALL_FIELDS_MASK + 1))
+_get_fields = attrgetter(*_FIELDS)
+
+
+class ProfileSample(
+    metaclass=_dataclass_creator,
+    names=("userId", "at") + _FIELDS,
+    types=(int, float) + (int,) * len(_FIELDS),
+):
+    pass
+
+
+class _user_series:
+    # row r stores its timestamp, bitmask of changed fields and deltas of changed fields (in field order);
+    # every keyframe_interval-th row additionally stores full values and position of next row deltas
+    __slots__ = "times", "masks", "deltas", "keyframes", "offsets", "last"
+
+    def __new__(cls):
+        self = super().__new__(cls)
+        self.times = array("d")
+        self.masks = array("B")
+        self.deltas = array("q")
+        self.keyframes = array("q")
+        self.offsets = array("q")
+        self.last = None
+        return self
+
+    def append(self, at, values, keyframe_interval):
+        last = self.last
+        if last is None:
+            mask = _ALL_FIELDS_MASK
+            deltas = values
+        else:
+            if at < self.times[-1]:
+                return
+            mask = 0
+            deltas = []
+            for f, (v, p) in enumerate(zip(values, last)):
+                if v != p:
+                    mask |= 1 << f
+                    deltas.append(v - p)
+            if not mask:
+                return
+
+        n = len(self.times)
+        self.times.append(at)
+        self.masks.append(mask)
+        self.deltas.extend(deltas)
+        if n % keyframe_interval == 0:
+            self.keyframes.extend(values)
+            self.offsets.append(len(self.deltas))
+        self.last = values
+
+    def replay(self, start, stop, keyframe_interval):
+        # yields (row, values) for rows in [start, stop), values list is reused between iterations
+        k = start // keyframe_interval
+        row = k * keyframe_interval
+        values = self.keyframes[k * len(_FIELDS):(k + 1) * len(_FIELDS)].tolist()
+        pos = self.offsets[k]
+        masks = self.masks
+        deltas = self.deltas
+        if row >= start:
+            yield row, values
+        for row in range(row + 1, stop):
+            for f in _MASK_FIELDS[masks[row]]:
+                values[f] += deltas[pos]
+                pos += 1
+            if row >= start:
+                yield row, values
+
+    def truncate(self, before, keyframe_interval):
+        k = (bisect_right(self.times, before) - 1) // keyframe_interval
+        if k <= 0:
+            return
+        row = k * keyframe_interval
+        shift = self.offsets[k] - len(_FIELDS)
+        values = self.keyframes[k * len(_FIELDS):(k + 1) * len(_FIELDS)]
+        del self.times[:row]
+        del self.masks[:row]
+        self.masks[0] = _ALL_FIELDS_MASK
+        del self.deltas[:self.offsets[k]]
+        self.deltas[0:0] = values
+        del self.keyframes[:k * len(_FIELDS)]
+        del self.offsets[:k]
+        for i in range(len(self.offsets)):
+            self.offsets[i] -= shift
+
+
+# values come from store that accepts only ints, so samples are built without checks
+def _build_samples(userId, rows):
+    return [ProfileSample(userId, at, *values) for at, values in rows]
+
+
+def _range(times, start, end):
+    lo = 0 if start is None else bisect_left(times, start)
+    hi = len(times) if end is None else bisect_right(times, end)
+    return lo, hi
+
+
+class ProfileHistory:
+    __slots__ = "__users", "__keyframe_interval"
+
+    fields = _FIELDS
+
+    def __new__(cls, *, keyframe_interval=64):
+        if type(keyframe_interval) is not int:
+            raise TypeError("keyframe interval must be int")
+        if keyframe_interval < 1:
+            raise ValueError("keyframe interval must be positive")
+
+        self = super().__new__(cls)
+        self.__users = dict()
+        self.__keyframe_interval = keyframe_interval
+        return self
+
+    @property
+    def keyframe_interval(self):
+        return self.__keyframe_interval
+
+    def __len__(self):
+        return len(self.__users)
+
+    def __contains__(self, userId):
+        return userId in self.__users
+
+    def __iter__(self):
+        return iter(self.__users.keys())
+
+    def samples_count(self, userId, /):
+        s = self.__users.get(userId, None)
+        return 0 if s is None else len(s.times)
+
+    def update(self, profile, /, at=None):
+        if type(profile) is not RequestProfileResponse:
+            raise TypeError(f"profile must be {RequestProfileResponse.__qualname__ !r}, got {type(profile).__qualname__ !r}")
+        self.add(profile.userId, _get_fields(profile), at)
+
+    def add(self, userId, values, at=None, /):
+        if type(userId) is not int:
+            raise TypeError("user id must be int")
+        values = tuple(values)
+        if len(values) != len(_FIELDS) or any(type(v) is not int for v in values):
+            raise TypeError(f"values must be {len(_FIELDS)} ints ({', '.join(_FIELDS)})")
+        if at is None:
+            at = time()
+
+        s = self.__users.get(userId, None)
+        if s is None:
+            s = self.__users[userId] = _user_series()
+        s.append(float(at), values, self.__keyframe_interval)
+
+    def on_refresh(self, token, request_type, result, /):
+        if type(result) is RequestProfileResponse:
+            self.update(result)
+
+    async def consume(self, scheduler, /):
+        async for token, request_type, result in scheduler:
+            self.on_refresh(token, request_type, result)
+
+    def forget(self, userId, /):
+        self.__users.pop(userId, None)
+
+    def truncate(self, before, /):
+        for s in self.__users.values():
+            s.truncate(before, self.__keyframe_interval)
+
+    def at(self, userId, moment, /):
+        s = self.__users.get(userId, None)
+        if s is None:
+            return None
+        row = bisect_right(s.times, moment) - 1
+        if row < 0:
+            return None
+        for _, values in s.replay(row, row + 1, self.__keyframe_interval):
+            return ProfileSample(userId, s.times[row], *values)
+
+    def last(self, userId, /):
+        s = self.__users.get(userId, None)
+        if s is None or s.last is None:
+            return None
+        return ProfileSample(userId, s.times[-1], *s.last)
+
+    def samples(self, userId, /, start=None, end=None):
+        s = self.__users.get(userId, None)
+        if s is None:
+            return []
+        lo, hi = _range(s.times, start, end)
+        if lo >= hi:
+            return []
+        times = s.times
+        return _run_validated(True, _build_samples, userId, ((times[row], values) for row, values in s.replay(lo, hi, self.__keyframe_interval)))
+
+    def changes(self, userId, field, /, start=None, end=None):
+        try:
+            f = _FIELD_INDEXES[field]
+        except KeyError:
+            raise ValueError(f"unknown field {field !r}") from None
+        times = array("d")
+        values = array("q")
+        s = self.__users.get(userId, None)
+        if s is None:
+            return times, values
+        lo, hi = _range(s.times, start, end)
+        if lo >= hi:
+            return times, values
+
+        bit = 1 << f
+        masks = s.masks
+        for row, v in s.replay(lo, hi, self.__keyframe_interval):
+            if row == lo or masks[row] & bit:
+                times.append(s.times[row])
+                values.append(v[f])
+        return times, values
+
+    def downsample(self, userId, step, /, start=None, end=None):
+        if type(step) is not int and type(step) is not float:
+            raise TypeError("step must be int or float")
+        if step <= 0:
+            raise ValueError("step must be positive")
+        s = self.__users.get(userId, None)
+        if s is None or not s.times:
+            return []
+
+        times = s.times
+        first = int((times[0] if start is None else max(start, times[0])) // step)
+        last = int((times[-1] if end is None else end) // step)
+        if first > last:
+            return []
+
+        lo = bisect_right(times, first * step) - 1
+        if lo < 0:
+            lo = 0
+        hi = bisect_left(times, (last + 1) * step)
+
+        return _run_validated(True, _build_samples, userId, self.__buckets(s, step, first, last, lo, hi))
+
+    def __buckets(self, s, step, first, last, lo, hi):
+        # state at end of every bucket, labeled by bucket start
+        times = s.times
+        bucket = first
+        current = None
+        for row, values in s.replay(lo, hi, self.__keyframe_interval):
+            b = int(times[row] // step)
+            while bucket < b:
+                if current is not None:
+                    yield float(bucket * step), current
+                bucket += 1
+            current = tuple(values)
+        while bucket <= last:
+            yield float(bucket * step), current
+            bucket += 1
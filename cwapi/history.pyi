@@ -0,0 +1,86 @@
+from array import array
+from typing import Iterable, Iterator, List, NoReturn, Optional, Tuple, Type, Union, final
+
+from .requests import request
+from .responses import RequestProfileResponse, response
+from .scheduler import RefreshScheduler
+
+
+@final
+class ProfileSample:
+    @property
+    def userId(self) -> int: ...
+
+    # unix timestamp of sample (for downsampled series - start of bucket)
+    @property
+    def at(self) -> float: ...
+
+    @property
+    def exp(self) -> int: ...
+
+    @property
+    def gold(self) -> int: ...
+
+    @property
+    def hp(self) -> int: ...
+
+    @property
+    def mana(self) -> int: ...
+
+    @property
+    def stamina(self) -> int: ...
+
+    @property
+    def lvl(self) -> int: ...
+
+    @property
+    def pouches(self) -> int: ...
+
+
+@final
+class ProfileHistory:
+    # tracked fields, in order of values passed to add()
+    fields: Tuple[str, ...]
+
+    # only changed fields of every sample are stored (as deltas), full values are stored every keyframe_interval samples;
+    # samples without changes and samples older than last one are skipped
+    def __new__(cls, *, keyframe_interval: int = 64) -> ProfileHistory: ...
+
+    @property
+    def keyframe_interval(self) -> int: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, userId: int) -> bool: ...
+
+    def __iter__(self) -> Iterator[int]: ...
+
+    def samples_count(self, userId: int, /) -> int: ...
+
+    def update(self, profile: RequestProfileResponse, /, at: float = None) -> NoReturn: ...
+
+    def add(self, userId: int, values: Iterable[int], at: float = None, /) -> NoReturn: ...
+
+    # can be passed as callback to RefreshScheduler, other results are ignored
+    def on_refresh(self, token: str, request_type: Type[request], result: Union[response, Exception], /) -> NoReturn: ...
+
+    async def consume(self, scheduler: RefreshScheduler, /) -> NoReturn: ...
+
+    def forget(self, userId: int, /) -> NoReturn: ...
+
+    # drops samples older than given timestamp by whole keyframe blocks, state at that moment is kept
+    def truncate(self, before: float, /) -> NoReturn: ...
+
+    # state at given moment (last sample before or at it)
+    def at(self, userId: int, moment: float, /) -> Optional[ProfileSample]: ...
+
+    def last(self, userId: int, /) -> Optional[ProfileSample]: ...
+
+    # limits are inclusive
+    def samples(self, userId: int, /, start: float = None, end: float = None) -> List[ProfileSample]: ...
+
+    # timestamps and values of field at first sample in range and at samples where it changed
+    def changes(self, userId: int, field: str, /, start: float = None, end: float = None) -> Tuple[array, array]: ...
+
+    # state at end of every step-aligned bucket from first sample (or start) to last sample (or end)
+    def downsample(self, userId: int, step: Union[int, float], /, start: float = None, end: float = None) -> List[ProfileSample]: ...
@@ -0,0 +1,178 @@
+from array import array
+from time import time
+
+from ._utils import _dataclass_creator
+from .feeds import Deal, Feed
+
+__all__ = ("MarketAggregator", "MarketSnapshot")
+
+
+class MarketSnapshot(
+    metaclass=_dataclass_creator,
+    names=("item", "start", "end", "open", "high", "low", "close", "volume", "turnover", "deals"),
+    types=(str, float, float, int, int, int, int, int, int, int),
+):
+    @property
+    def vwap(self):
+        return self.turnover / self.volume if self.volume else None
+
+
+# any bucket id (including negative ones, before unix epoch) is greater
+_EMPTY = -2 ** 63
+
+
+class _item_window:
+    __slots__ = "ids", "open", "high", "low", "close", "volume", "turnover", "deals"
+
+    def __new__(cls, size):
+        self = super().__new__(cls)
+        self.ids = array("q", [_EMPTY]) * size
+        self.open = array("q", [0]) * size
+        self.high = array("q", [0]) * size
+        self.low = array("q", [0]) * size
+        self.close = array("q", [0]) * size
+        self.volume = array("q", [0]) * size
+        self.turnover = array("q", [0]) * size
+        self.deals = array("q", [0]) * size
+        return self
+
+
+class MarketAggregator:
+    __slots__ = "__bucket", "__size", "__items", "__max_items"
+
+    def __new__(cls, *, bucket=60, buckets=60, max_items=None):
+        if type(bucket) is not int and type(bucket) is not float:
+            raise TypeError("bucket duration must be int or float")
+        if bucket <= 0:
+            raise ValueError("bucket duration must be positive")
+        if type(buckets) is not int:
+            raise TypeError("buckets count must be int")
+        if buckets < 1:
+            raise ValueError("buckets count must be positive")
+        if max_items is not None:
+            if type(max_items) is not int:
+                raise TypeError("max items must be int")
+            if max_items < 1:
+                raise ValueError("max items must be positive")
+
+        self = super().__new__(cls)
+        self.__bucket = bucket
+        self.__size = buckets
+        self.__items = dict()
+        self.__max_items = max_items
+        return self
+
+    @property
+    def bucket(self):
+        return self.__bucket
+
+    @property
+    def buckets(self):
+        return self.__size
+
+    @property
+    def window(self):
+        return self.__bucket * self.__size
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __contains__(self, item):
+        return item in self.__items
+
+    def __iter__(self):
+        return iter(self.__items.keys())
+
+    def update(self, deal, /, at=None):
+        if type(deal) is not Deal:
+            raise TypeError(f"deal must be {Deal.__qualname__ !r}, got {type(deal).__qualname__ !r}")
+        self.add(deal.item, deal.qty, deal.price, at)
+
+    def add(self, item, qty, price, at=None, /):
+        if type(item) is not str:
+            raise TypeError("item must be str")
+        if type(qty) is not int:
+            raise TypeError("qty must be int")
+        if type(price) is not int:
+            raise TypeError("price must be int")
+        if at is None:
+            at = time()
+        elif type(at) is not int and type(at) is not float:
+            raise TypeError("timestamp must be int or float")
+        bid = int(at // self.__bucket)
+
+        w = self.__items.get(item, None)
+        if w is None:
+            if self.__max_items is not None and len(self.__items) >= self.__max_items:
+                del self.__items[next(iter(self.__items))]
+            w = self.__items[item] = _item_window(self.__size)
+        elif self.__max_items is not None:
+            self.__items[item] = self.__items.pop(item)
+
+        i = bid % self.__size
+        cur = w.ids[i]
+        if cur > bid:
+            return
+        if cur < bid:
+            w.ids[i] = bid
+            w.open[i] = w.high[i] = w.low[i] = w.close[i] = price
+            w.volume[i] = qty
+            w.turnover[i] = qty * price
+            w.deals[i] = 1
+            return
+        if price > w.high[i]:
+            w.high[i] = price
+        if price < w.low[i]:
+            w.low[i] = price
+        w.close[i] = price
+        w.volume[i] += qty
+        w.turnover[i] += qty * price
+        w.deals[i] += 1
+
+    def snapshot(self, item, /, span=None, at=None):
+        w = self.__items.get(item, None)
+        if w is None:
+            return None
+        if at is None:
+            at = time()
+        if span is None:
+            count = self.__size
+        else:
+            count = min(self.__size, max(1, -int(-span // self.__bucket)))
+        last = int(at // self.__bucket)
+        first = last - count + 1
+
+        o = h = l = c = None
+        volume = turnover = deals = 0
+        for bid in range(first, last + 1):
+            i = bid % self.__size
+            if w.ids[i] != bid:
+                continue
+            if o is None:
+                o, h, l = w.open[i], w.high[i], w.low[i]
+            else:
+                h = max(h, w.high[i])
+                l = min(l, w.low[i])
+            c = w.close[i]
+            volume += w.volume[i]
+            turnover += w.turnover[i]
+            deals += w.deals[i]
+
+        if o is None:
+            return None
+        return MarketSnapshot(item=item, start=float(first * self.__bucket), end=float((last + 1) * self.__bucket), open=o, high=h, low=l, close=c, volume=volume, turnover=turnover, deals=deals)
+
+    def snapshots(self, span=None, at=None):
+        if at is None:
+            at = time()
+        for item in list(self.__items):
+            s = self.snapshot(item, span=span, at=at)
+            if s is not None:
+                yield s
+
+    def forget(self, item, /):
+        self.__items.pop(item, None)
+
+    async def consume(self, client, /):
+        async for deal in client.listen(Feed.Deals):
+            self.update(deal)
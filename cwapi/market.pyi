@@ -0,0 +1,75 @@
+from typing import Iterator, NoReturn, Optional, Union, final
+
+from . import AsyncChatWarsApiClient
+from .feeds import Deal
+
+
+@final
+class MarketSnapshot:
+    @property
+    def item(self) -> str: ...
+
+    # unix timestamps of first bucket start and last bucket end
+    @property
+    def start(self) -> float: ...
+
+    @property
+    def end(self) -> float: ...
+
+    @property
+    def open(self) -> int: ...
+
+    @property
+    def high(self) -> int: ...
+
+    @property
+    def low(self) -> int: ...
+
+    @property
+    def close(self) -> int: ...
+
+    @property
+    def volume(self) -> int: ...
+
+    # sum of qty * price
+    @property
+    def turnover(self) -> int: ...
+
+    @property
+    def deals(self) -> int: ...
+
+    @property
+    def vwap(self) -> Optional[float]: ...
+
+
+@final
+class MarketAggregator:
+    @property
+    def bucket(self) -> Union[int, float]: ...
+
+    @property
+    def buckets(self) -> int: ...
+
+    @property
+    def window(self) -> Union[int, float]: ...
+
+    # memory is bounded by buckets count per item and max_items (least recently traded item is dropped)
+    def __new__(cls, *, bucket: Union[int, float] = 60, buckets: int = 60, max_items: Optional[int] = None) -> MarketAggregator: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, item: str) -> bool: ...
+
+    def __iter__(self) -> Iterator[str]: ...
+
+    def update(self, deal: Deal, /, at: float = None) -> NoReturn: ...
+
+    def add(self, item: str, qty: int, price: int, at: float = None, /) -> NoReturn: ...
+
+    def snapshot(self, item: str, /, span: Union[int, float] = None, at: float = None) -> Optional[MarketSnapshot]: ...
+
+    def snapshots(self, span: Union[int, float] = None, at: float = None) -> Iterator[MarketSnapshot]: ...
+
+    def forget(self, item: str, /) -> NoReturn: ...
+
+    async def consume(self, client: AsyncChatWarsApiClient, /) -> NoReturn: ...
@@ -0,0 +1,183 @@
+from collections import deque
+from time import monotonic
+
+from . import AsyncChatWarsApiClient, Server
+from ._utils import _dataclass_creator
+from .requests import CreateAuthCodeRequest, GrantTokenRequest, request
+from .responses import GrantTokenResponse, InvalidTokenError
+
+__all__ = ("MultiInstanceClient", "InstanceStats")
+
+# instance which created auth code is remembered this long (seconds), codes which weren't granted are dropped
+_AUTH_CODE_TTL = 900
+
+
+class InstanceStats(
+    metaclass=_dataclass_creator,
+    names=("instance_name", "in_flight", "completed", "errors", "throughput", "tokens"),
+    types=(str, int, int, int, float, int),
+):
+    pass
+
+
+class _instance:
+    __slots__ = "client", "in_flight", "completed", "errors", "finished", "tokens"
+
+    def __new__(cls, client):
+        self = super().__new__(cls)
+        self.client = client
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.finished = deque()
+        self.tokens = 0
+        return self
+
+
+class MultiInstanceClient:
+    __slots__ = "__instances", "__tokens", "__pending_auth", "__window"
+
+    def __new__(cls, server, instances, /, *, window=60, **kwargs):
+        if type(server) is not Server:
+            raise TypeError(f"server must instance of {Server.__qualname__ !r} enum")
+        if type(window) is not int and type(window) is not float:
+            raise TypeError("window must be int or float")
+        if window <= 0:
+            raise ValueError("window must be positive")
+        if hasattr(instances, "items"):
+            instances = instances.items()
+
+        self = super().__new__(cls)
+        self.__instances = dict()
+        for instance_name, password in instances:
+            if instance_name in self.__instances:
+                raise ValueError(f"duplication of instance {instance_name !r}")
+            self.__instances[instance_name] = _instance(AsyncChatWarsApiClient(server, instance_name, password, **kwargs))
+        if not self.__instances:
+            raise ValueError("at least one instance required")
+        self.__tokens = dict()
+        self.__pending_auth = dict()
+        self.__window = window
+        return self
+
+    @property
+    def instances(self):
+        return tuple(self.__instances.keys())
+
+    def client(self, instance_name, /):
+        return self.__instances[instance_name].client
+
+    def is_connected(self):
+        return all(i.client.is_connected() for i in self.__instances.values())
+
+    async def connect(self):
+        from asyncio import gather
+
+        await gather(*(i.client.connect() for i in self.__instances.values()))
+
+    async def disconnect(self):
+        from asyncio import gather
+
+        await gather(*(i.client.disconnect() for i in self.__instances.values() if i.client.is_connected()))
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+        return False
+
+    def assign(self, token, instance_name, /):
+        if type(token) is not str:
+            raise TypeError("token must be str")
+        i = self.__instances[instance_name]
+        holders = self.__tokens.setdefault(token, set())
+        if instance_name not in holders:
+            holders.add(instance_name)
+            i.tokens += 1
+
+    def forget(self, token, instance_name=None, /):
+        holders = self.__tokens.get(token, None)
+        if holders is None:
+            return
+        for n in ([instance_name] if instance_name is not None else list(holders)):
+            if n in holders:
+                holders.discard(n)
+                self.__instances[n].tokens -= 1
+        if not holders:
+            del self.__tokens[token]
+
+    def holders(self, token, /):
+        return frozenset(self.__tokens.get(token, ()))
+
+    def route(self, req, /):
+        if not isinstance(req, request):
+            raise TypeError("unsupported type of request")
+
+        if type(req) is GrantTokenRequest:
+            self.__trim_auth(monotonic())
+            p = self.__pending_auth.get(req.userId, None)
+            if p is not None:
+                return p[0]
+        token = getattr(req, "token", None)
+        if token is None:
+            candidates = self.__instances.keys()
+        else:
+            # token is valid only on instance which granted it, other instances would reply with InvalidToken
+            candidates = self.__tokens.get(token, None)
+            if candidates is None:
+                raise LookupError(f"token {token !r} isn't assigned to any instance")
+        return min(candidates, key=lambda n: self.__instances[n].in_flight)
+
+    async def ask(self, req, /, instance_name=None):
+        if instance_name is None:
+            instance_name = self.route(req)
+        i = self.__instances[instance_name]
+
+        i.in_flight += 1
+        try:
+            res = await i.client.ask(req)
+        except InvalidTokenError as e:
+            i.errors += 1
+            self.forget(e.token, instance_name)
+            raise
+        except BaseException:
+            i.errors += 1
+            raise
+        finally:
+            i.in_flight -= 1
+            i.completed += 1
+            now = monotonic()
+            i.finished.append(now)
+            self.__trim(i, now)
+
+        if type(req) is CreateAuthCodeRequest:
+            now = monotonic()
+            self.__trim_auth(now)
+            # reinserted, so entries stay in order of creation
+            self.__pending_auth.pop(req.userId, None)
+            self.__pending_auth[req.userId] = (instance_name, now)
+        elif type(res) is GrantTokenResponse:
+            self.__pending_auth.pop(req.userId, None)
+            self.assign(res.token, instance_name)
+        return res
+
+    def __trim_auth(self, now):
+        while self.__pending_auth:
+            userId, (_, since) = next(iter(self.__pending_auth.items()))
+            if since > now - _AUTH_CODE_TTL:
+                break
+            del self.__pending_auth[userId]
+
+    def __trim(self, i, now):
+        while i.finished and i.finished[0] < now - self.__window:
+            i.finished.popleft()
+
+    def stats(self):
+        now = monotonic()
+        out = dict()
+        for n, i in self.__instances.items():
+            self.__trim(i, now)
+            out[n] = InstanceStats(instance_name=n, in_flight=i.in_flight, completed=i.completed, errors=i.errors, throughput=len(i.finished) / self.__window, tokens=i.tokens)
+        return out
@@ -0,0 +1,102 @@
+from typing import Dict, FrozenSet, Iterable, Literal, Mapping, NoReturn, Optional, Tuple, Union, final, overload
+
+from . import AsyncChatWarsApiClient, Server
+from .requests import AuthAdditionalOperationRequest, CreateAuthCodeRequest, GetInfoRequest, GrantAdditionalOperationRequest, GrantTokenRequest, GuildInfoRequest, RequestBasicInfoRequest, RequestGearInfoRequest, RequestProfileRequest, RequestStockRequest, ViewCraftbookRequest, WantToBuyRequest, request
+from .responses import AuthAdditionalOperationResponse, CreateAuthCodeResponse, GetInfoResponse, GrantAdditionalOperationResponse, GrantTokenResponse, GuildInfoResponse, RequestBasicInfoResponse, RequestGearInfoResponse, RequestProfileResponse, RequestStockResponse, ViewCraftbookResponse, WantToBuyResponse, response
+
+
+@final
+class InstanceStats:
+    @property
+    def instance_name(self) -> str: ...
+
+    @property
+    def in_flight(self) -> int: ...
+
+    @property
+    def completed(self) -> int: ...
+
+    @property
+    def errors(self) -> int: ...
+
+    # completed requests per second over window
+    @property
+    def throughput(self) -> float: ...
+
+    @property
+    def tokens(self) -> int: ...
+
+    def __new__(cls, instance_name: str, in_flight: int, completed: int, errors: int, throughput: float, tokens: int) -> InstanceStats: ...
+
+
+@final
+class MultiInstanceClient:
+    # every instance has own connection (AMQP credentials are per instance), other kwargs are passed to each AsyncChatWarsApiClient
+    def __new__(cls, server: Server, instances: Union[Mapping[str, str], Iterable[Tuple[str, str]]], /, *, window: Union[int, float] = 60, **kwargs) -> MultiInstanceClient: ...
+
+    @property
+    def instances(self) -> Tuple[str, ...]: ...
+
+    def client(self, instance_name: str, /) -> AsyncChatWarsApiClient: ...
+
+    def is_connected(self) -> bool: ...
+
+    async def connect(self) -> NoReturn: ...
+
+    async def disconnect(self) -> NoReturn: ...
+
+    async def __aenter__(self) -> MultiInstanceClient: ...
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> Literal[False]: ...
+
+    # tokens from grantToken replies are assigned automatically
+    def assign(self, token: str, instance_name: str, /) -> NoReturn: ...
+
+    def forget(self, token: str, instance_name: Optional[str] = None, /) -> NoReturn: ...
+
+    def holders(self, token: str, /) -> FrozenSet[str]: ...
+
+    # least loaded instance holding the token (LookupError if token isn't assigned to any instance);
+    # grantToken goes to instance that created auth code (remembered for 15 minutes)
+    def route(self, req: request, /) -> str: ...
+
+    @overload
+    async def ask(self, req: CreateAuthCodeRequest, /, instance_name: Optional[str] = None) -> CreateAuthCodeResponse: ...
+
+    @overload
+    async def ask(self, req: GrantTokenRequest, /, instance_name: Optional[str] = None) -> GrantTokenResponse: ...
+
+    @overload
+    async def ask(self, req: AuthAdditionalOperationRequest, /, instance_name: Optional[str] = None) -> AuthAdditionalOperationResponse: ...
+
+    @overload
+    async def ask(self, req: GrantAdditionalOperationRequest, /, instance_name: Optional[str] = None) -> GrantAdditionalOperationResponse: ...
+
+    @overload
+    async def ask(self, req: GetInfoRequest, /, instance_name: Optional[str] = None) -> GetInfoResponse: ...
+
+    @overload
+    async def ask(self, req: ViewCraftbookRequest, /, instance_name: Optional[str] = None) -> ViewCraftbookResponse: ...
+
+    @overload
+    async def ask(self, req: RequestProfileRequest, /, instance_name: Optional[str] = None) -> RequestProfileResponse: ...
+
+    @overload
+    async def ask(self, req: RequestBasicInfoRequest, /, instance_name: Optional[str] = None) -> RequestBasicInfoResponse: ...
+
+    @overload
+    async def ask(self, req: RequestGearInfoRequest, /, instance_name: Optional[str] = None) -> RequestGearInfoResponse: ...
+
+    @overload
+    async def ask(self, req: RequestStockRequest, /, instance_name: Optional[str] = None) -> RequestStockResponse: ...
+
+    @overload
+    async def ask(self, req: GuildInfoRequest, /, instance_name: Optional[str] = None) -> GuildInfoResponse: ...
+
+    @overload
+    async def ask(self, req: WantToBuyRequest, /, instance_name: Optional[str] = None) -> WantToBuyResponse: ...
+
+    @overload
+    async def ask(self, req: request, /, instance_name: Optional[str] = None) -> response: ...
+
+    def stats(self) -> Dict[str, InstanceStats]: ...
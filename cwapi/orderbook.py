@@ -0,0 +1,246 @@
+from bisect import bisect_left
+from heapq import heapify, heappop, heappush
+from sys import intern
+from time import monotonic
+
+from .feeds import AuctionLot, Feed, Offer
+
+__all__ = ("OrderBook",)
+
+
+class _book_entry:
+    __slots__ = "key", "item", "price", "seller", "record", "expires", "alive"
+
+    def __new__(cls, key, item, price, seller, record, expires):
+        self = super().__new__(cls)
+        self.key = key
+        self.item = item
+        self.price = price
+        self.seller = seller
+        self.record = record
+        self.expires = expires
+        self.alive = True
+        return self
+
+
+class _item_levels:
+    # prices is heap of level prices with lazy deletion (removed levels are popped when they reach top),
+    # so adding and removing level is O(log n); sorted prices are kept only until levels change
+    __slots__ = "prices", "levels", "ordered"
+
+    def __new__(cls):
+        self = super().__new__(cls)
+        self.prices = []
+        self.levels = dict()
+        self.ordered = None
+        return self
+
+    def add(self, price):
+        level = self.levels[price] = dict()
+        heappush(self.prices, price)
+        self.ordered = None
+        return level
+
+    def discard(self, price):
+        del self.levels[price]
+        self.ordered = None
+        if len(self.prices) > 2 * len(self.levels) + 8:
+            # prices of removed levels deep in heap
+            self.prices = list(self.levels)
+            heapify(self.prices)
+
+    def best(self):
+        prices = self.prices
+        while prices[0] not in self.levels:
+            heappop(prices)
+        return self.levels[prices[0]]
+
+    def sorted(self):
+        if self.ordered is None:
+            self.ordered = sorted(self.levels)
+        return self.ordered
+
+
+class OrderBook:
+    __slots__ = "__items", "__sellers", "__entries", "__expiry", "__seq", "__offer_ttl", "__lot_ttl"
+
+    def __new__(cls, *, offer_ttl=300, lot_ttl=None):
+        for n, v in (("offer", offer_ttl), ("lot", lot_ttl)):
+            if v is None:
+                continue
+            if type(v) is not int and type(v) is not float:
+                raise TypeError(f"{n} ttl must be int or float")
+            if v <= 0:
+                raise ValueError(f"{n} ttl must be positive")
+
+        self = super().__new__(cls)
+        self.__items = dict()
+        self.__sellers = dict()
+        self.__entries = dict()
+        self.__expiry = []
+        self.__seq = 0
+        self.__offer_ttl = offer_ttl
+        self.__lot_ttl = lot_ttl
+        return self
+
+    def __len__(self):
+        self.expire()
+        return len(self.__entries)
+
+    def __contains__(self, item):
+        self.expire()
+        return item in self.__items
+
+    def items(self):
+        self.expire()
+        return list(self.__items.keys())
+
+    def __insert(self, key, item, price, seller, record, ttl):
+        old = self.__entries.get(key, None)
+        if old is not None:
+            self.__remove(old)
+
+        item = intern(item)
+        seller = intern(seller)
+        expires = None if ttl is None else monotonic() + ttl
+        e = self.__entries[key] = _book_entry(key, item, price, seller, record, expires)
+
+        il = self.__items.get(item, None)
+        if il is None:
+            il = self.__items[item] = _item_levels()
+        level = il.levels.get(price, None)
+        if level is None:
+            level = il.add(price)
+        level[key] = e
+
+        s = self.__sellers.get(seller, None)
+        if s is None:
+            s = self.__sellers[seller] = dict()
+        s[key] = e
+
+        if expires is not None:
+            self.__seq += 1
+            heappush(self.__expiry, (expires, self.__seq, e))
+
+    def __remove(self, e):
+        e.alive = False
+        del self.__entries[e.key]
+
+        il = self.__items[e.item]
+        level = il.levels[e.price]
+        del level[e.key]
+        if not level:
+            if len(il.levels) == 1:
+                del self.__items[e.item]
+            else:
+                il.discard(e.price)
+
+        s = self.__sellers[e.seller]
+        del s[e.key]
+        if not s:
+            del self.__sellers[e.seller]
+
+    def add_offer(self, offer, /):
+        if type(offer) is not Offer:
+            raise TypeError(f"offer must be {Offer.__qualname__ !r}, got {type(offer).__qualname__ !r}")
+        self.expire()
+        key = ("offer", offer.sellerId, offer.item, offer.price)
+        if offer.qty <= 0:
+            # offer is sold out
+            old = self.__entries.get(key, None)
+            if old is not None:
+                self.__remove(old)
+            return
+        self.__insert(key, offer.item, offer.price, offer.sellerName, offer, self.__offer_ttl)
+
+    def add_lot(self, lot, /):
+        if type(lot) is not AuctionLot:
+            raise TypeError(f"lot must be {AuctionLot.__qualname__ !r}, got {type(lot).__qualname__ !r}")
+        self.expire()
+        key = ("lot", lot.lotId)
+        if lot.status != "Active":
+            old = self.__entries.get(key, None)
+            if old is not None:
+                self.__remove(old)
+            return
+        self.__insert(key, lot.itemName, lot.price, lot.sellerName, lot, self.__lot_ttl)
+
+    def update_digest(self, lots, /, replace=True):
+        seen = set()
+        for lot in lots:
+            self.add_lot(lot)
+            seen.add(("lot", lot.lotId))
+        if replace:
+            for e in [e for k, e in self.__entries.items() if k[0] == "lot" and k not in seen]:
+                self.__remove(e)
+
+    def update(self, event, /):
+        if type(event) is Offer:
+            self.add_offer(event)
+        elif type(event) is AuctionLot:
+            self.add_lot(event)
+        elif type(event) is tuple:
+            self.update_digest(event)
+        else:
+            raise TypeError(f"unsupported event {type(event).__qualname__ !r}")
+
+    def remove(self, record, /):
+        if type(record) is Offer:
+            key = ("offer", record.sellerId, record.item, record.price)
+        elif type(record) is AuctionLot:
+            key = ("lot", record.lotId)
+        else:
+            raise TypeError(f"unsupported record {type(record).__qualname__ !r}")
+        e = self.__entries.get(key, None)
+        if e is not None:
+            self.__remove(e)
+
+    def expire(self, now=None):
+        if not self.__expiry:
+            return
+        if now is None:
+            now = monotonic()
+        while self.__expiry and self.__expiry[0][0] <= now:
+            e = heappop(self.__expiry)[2]
+            if e.alive:
+                self.__remove(e)
+
+    def best(self, item, /):
+        self.expire()
+        il = self.__items.get(item, None)
+        if il is None:
+            return None
+        return next(iter(il.best().values())).record
+
+    def at_price(self, item, price, /):
+        self.expire()
+        il = self.__items.get(item, None)
+        if il is None:
+            return []
+        return [e.record for e in il.levels.get(price, {}).values()]
+
+    def levels(self, item, /, limit=None):
+        self.expire()
+        il = self.__items.get(item, None)
+        if il is None:
+            return []
+        prices = il.sorted() if limit is None else il.sorted()[:limit]
+        return [(p, tuple(e.record for e in il.levels[p].values())) for p in prices]
+
+    def cheaper(self, item, price, /):
+        self.expire()
+        il = self.__items.get(item, None)
+        if il is None:
+            return []
+        prices = il.sorted()
+        return [e.record for p in prices[:bisect_left(prices, price)] for e in il.levels[p].values()]
+
+    def by_seller(self, seller, /):
+        self.expire()
+        return [e.record for e in self.__sellers.get(seller, {}).values()]
+
+    async def consume(self, client, feed, /):
+        if feed is not Feed.Offers and feed is not Feed.AuDigest:
+            raise ValueError("order book can be fed only by offers and auction digests")
+        async for event in client.listen(feed):
+            self.update(event)
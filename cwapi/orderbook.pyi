@@ -0,0 +1,43 @@
+from typing import Iterable, List, NoReturn, Optional, Tuple, Union, final
+
+from . import AsyncChatWarsApiClient
+from .feeds import AuctionLot, Feed, Offer
+
+
+@final
+class OrderBook:
+    # offers and lots are dropped after ttl seconds, lots are also dropped when they aren't active or missing in next digest;
+    # offer with zero quantity drops offer of same seller and price
+    # updates and best() are O(log n) in number of price levels of item, sorted levels are rebuilt on first query after change
+    def __new__(cls, *, offer_ttl: Optional[Union[int, float]] = 300, lot_ttl: Optional[Union[int, float]] = None) -> OrderBook: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, item: str) -> bool: ...
+
+    def items(self) -> List[str]: ...
+
+    def add_offer(self, offer: Offer, /) -> NoReturn: ...
+
+    def add_lot(self, lot: AuctionLot, /) -> NoReturn: ...
+
+    def update_digest(self, lots: Iterable[AuctionLot], /, replace: bool = True) -> NoReturn: ...
+
+    def update(self, event: Union[Offer, AuctionLot, Tuple[AuctionLot, ...]], /) -> NoReturn: ...
+
+    def remove(self, record: Union[Offer, AuctionLot], /) -> NoReturn: ...
+
+    def expire(self, now: float = None) -> NoReturn: ...
+
+    def best(self, item: str, /) -> Optional[Union[Offer, AuctionLot]]: ...
+
+    def at_price(self, item: str, price: int, /) -> List[Union[Offer, AuctionLot]]: ...
+
+    # ascending by price
+    def levels(self, item: str, /, limit: int = None) -> List[Tuple[int, Tuple[Union[Offer, AuctionLot], ...]]]: ...
+
+    def cheaper(self, item: str, price: int, /) -> List[Union[Offer, AuctionLot]]: ...
+
+    def by_seller(self, seller: str, /) -> List[Union[Offer, AuctionLot]]: ...
+
+    async def consume(self, client: AsyncChatWarsApiClient, feed: Feed, /) -> NoReturn: ...
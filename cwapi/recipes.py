@@ -0,0 +1,147 @@
+from bisect import bisect_left, bisect_right, insort
+from sys import intern
+
+from .responses import ViewCraftbookResponse
+from .types import Recipe, RecipeBook
+
+__all__ = ("RecipeCatalog",)
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class RecipeCatalog:
+    __slots__ = "__recipes", "__ordinals", "__free", "__users", "__holders", "__ids", "__names", "__prices"
+
+    def __new__(cls):
+        self = super().__new__(cls)
+        self.__recipes = []
+        self.__ordinals = dict()
+        self.__free = []
+        self.__users = dict()
+        self.__holders = []
+        self.__ids = dict()
+        self.__names = dict()
+        self.__prices = []
+        return self
+
+    def __len__(self):
+        return len(self.__users)
+
+    def __contains__(self, userId):
+        return userId in self.__users
+
+    def __iter__(self):
+        return iter(self.__users.keys())
+
+    def recipes(self):
+        return [r for r in self.__recipes if r is not None]
+
+    def __intern(self, rec):
+        key = (rec.id, rec.name, rec.price)
+        o = self.__ordinals.get(key, None)
+        if o is not None:
+            return o
+
+        rec = Recipe(id=intern(rec.id), name=intern(rec.name), price=rec.price)
+        if self.__free:
+            o = self.__free.pop()
+            self.__recipes[o] = rec
+            self.__holders[o] = set()
+        else:
+            o = len(self.__recipes)
+            self.__recipes.append(rec)
+            self.__holders.append(set())
+        self.__ordinals[key] = o
+        self.__ids.setdefault(rec.id, set()).add(o)
+        self.__names.setdefault(rec.name.casefold(), set()).add(o)
+        insort(self.__prices, (rec.price, o))
+        return o
+
+    def __release(self, o):
+        rec = self.__recipes[o]
+        self.__recipes[o] = None
+        self.__holders[o] = None
+        self.__free.append(o)
+        del self.__ordinals[(rec.id, rec.name, rec.price)]
+        for index, key in ((self.__ids, rec.id), (self.__names, rec.name.casefold())):
+            s = index[key]
+            s.discard(o)
+            if not s:
+                del index[key]
+        del self.__prices[bisect_left(self.__prices, (rec.price, o))]
+
+    def update(self, userId, book, /):
+        if type(userId) is not int:
+            raise TypeError("user id must be int")
+        if type(book) is ViewCraftbookResponse:
+            books = (book.craft, book.alchemy)
+        elif isinstance(book, RecipeBook):
+            books = (book,)
+        else:
+            raise TypeError(f"book must be {RecipeBook.__qualname__ !r} or {ViewCraftbookResponse.__qualname__ !r}, got {type(book).__qualname__ !r}")
+
+        mask = 0
+        for b in books:
+            if b is None:
+                continue
+            for rec in b:
+                mask |= 1 << self.__intern(rec)
+
+        old = self.__users.get(userId, 0)
+        self.__users[userId] = mask
+        for o in _bits(mask & ~old):
+            self.__holders[o].add(userId)
+        for o in _bits(old & ~mask):
+            self.__unhold(o, userId)
+
+    def __unhold(self, o, userId):
+        h = self.__holders[o]
+        h.discard(userId)
+        if not h:
+            self.__release(o)
+
+    def forget(self, userId, /):
+        mask = self.__users.pop(userId, 0)
+        for o in _bits(mask):
+            self.__unhold(o, userId)
+
+    def book(self, userId, /):
+        return RecipeBook(self.__recipes[o] for o in _bits(self.__users[userId]))
+
+    def can_craft(self, userId, id, /):
+        mask = self.__users.get(userId, 0)
+        return any(mask >> o & 1 for o in self.__ids.get(id, ()))
+
+    def recipe(self, id, /):
+        o = self.__ids.get(id, None)
+        if not o:
+            return None
+        return self.__recipes[min(o)]
+
+    def holders(self, id, /):
+        users = set()
+        for o in self.__ids.get(id, ()):
+            users |= self.__holders[o]
+        return users
+
+    def find(self, fragment, /):
+        if type(fragment) is not str:
+            raise TypeError("name fragment must be str")
+        fragment = fragment.casefold()
+        return [self.__recipes[o] for name, oo in self.__names.items() if fragment in name for o in sorted(oo)]
+
+    def by_price(self, low=None, high=None, /):
+        start = 0 if low is None else bisect_left(self.__prices, (low, -1))
+        end = len(self.__prices) if high is None else bisect_right(self.__prices, (high, len(self.__recipes)))
+        return [self.__recipes[o] for _, o in self.__prices[start:end]]
+
+    def who_can_craft(self, fragment, /):
+        users = set()
+        for rec in self.find(fragment):
+            users |= self.__holders[self.__ordinals[(rec.id, rec.name, rec.price)]]
+        return users
@@ -0,0 +1,39 @@
+from typing import Iterator, List, NoReturn, Optional, Set, Union, final
+
+from .responses import ViewCraftbookResponse
+from .types import Recipe, RecipeBook
+
+
+@final
+class RecipeCatalog:
+    # equal recipes of different users are stored once, books of users are kept as bitmasks over catalog
+    def __new__(cls) -> RecipeCatalog: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, userId: int) -> bool: ...
+
+    def __iter__(self) -> Iterator[int]: ...
+
+    def recipes(self) -> List[Recipe]: ...
+
+    # craft and alchemy books of response are merged
+    def update(self, userId: int, book: Union[RecipeBook, ViewCraftbookResponse], /) -> NoReturn: ...
+
+    def forget(self, userId: int, /) -> NoReturn: ...
+
+    def book(self, userId: int, /) -> RecipeBook: ...
+
+    def can_craft(self, userId: int, id: str, /) -> bool: ...
+
+    def recipe(self, id: str, /) -> Optional[Recipe]: ...
+
+    def holders(self, id: str, /) -> Set[int]: ...
+
+    # case-insensitive search by part of name
+    def find(self, fragment: str, /) -> List[Recipe]: ...
+
+    # ascending by price, limits are inclusive
+    def by_price(self, low: Optional[int] = None, high: Optional[int] = None, /) -> List[Recipe]: ...
+
+    def who_can_craft(self, fragment: str, /) -> Set[int]: ...
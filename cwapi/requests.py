@@ -8,6 +8,9 @@ from .types import Operation
 class request:
     __slots__ = ()
 
+    # action of reply, replies are matched to requests by it
+    _action = None
+
     def dump(self):
         raise NotImplementedError
 
@@ -17,6 +20,8 @@ class CreateAuthCodeRequest(
     names=("userId",),
     types=(int,)
 ):
+    _action = b"createAuthCode"
+
     def dump(self):
         return b"""{"action":"createAuthCode","payload":{"userId":%d}}""" % (self.userId,)
 
@@ -26,6 +31,8 @@ class GrantTokenRequest(
     names=("userId", "authCode"),
     types=(int, str)
 ):
+    _action = b"grantToken"
+
     def dump(self):
         return b"""{"action":"grantToken","payload":{"userId":%d,"authCode":"%b"}}""" % (self.userId, encode_string(self.authCode))
 
@@ -35,6 +42,8 @@ class AuthAdditionalOperationRequest(
     names=("token", "operation"),
     types=(str, Operation)
 ):
+    _action = b"authAdditionalOperation"
+
     def dump(self):
         return b"""{"token":"%b","action":"authAdditionalOperation","payload":{"operation":"%b"}}""" % (encode_string(self.token), encode_string(str(self.operation)))
 
@@ -44,6 +53,8 @@ class GrantAdditionalOperationRequest(
     names=("token", "requestId", "authCode"),
     types=(str, str, str)
 ):
+    _action = b"grantAdditionalOperation"
+
     def dump(self):
         return b"""{"token":"%b","action":"grantAdditionalOperation","payload":{"requestId":"%b","authCode":"%b"}}""" % (encode_string(self.token), encode_string(self.requestId), encode_string(self.authCode))
 
@@ -53,6 +64,8 @@ class GetInfoRequest(
     names=(),
     types=()
 ):
+    _action = b"getInfo"
+
     def dump(self):
         return b"""{"action":"getInfo"}"""
 
@@ -62,6 +75,8 @@ class ViewCraftbookRequest(
     names=("token",),
     types=(str,)
 ):
+    _action = b"viewCraftbook"
+
     def dump(self):
         return b"""{"token":"%b","action":"viewCraftbook"}""" % (encode_string(self.token),)
 
@@ -71,6 +86,8 @@ class RequestProfileRequest(
     names=("token",),
     types=(str,)
 ):
+    _action = b"requestProfile"
+
     def dump(self):
         return b"""{"token":"%b","action":"requestProfile"}""" % (encode_string(self.token),)
 
@@ -80,6 +97,8 @@ class RequestBasicInfoRequest(
     names=("token",),
     types=(str,)
 ):
+    _action = b"requestBasicInfo"
+
     def dump(self):
         return b"""{"token":"%b","action":"requestBasicInfo"}""" % (encode_string(self.token),)
 
@@ -89,6 +108,8 @@ class RequestGearInfoRequest(
     names=("token",),
     types=(str,)
 ):
+    _action = b"requestGearInfo"
+
     def dump(self):
         return b"""{"token":"%b","action":"requestGearInfo"}""" % (encode_string(self.token),)
 
@@ -98,6 +119,8 @@ class RequestStockRequest(
     names=("token",),
     types=(str,)
 ):
+    _action = b"requestStock"
+
     def dump(self):
         return b"""{"token":"%b","action":"requestStock"}""" % (encode_string(self.token),)
 
@@ -107,6 +130,8 @@ class GuildInfoRequest(
     names=("token",),
     types=(str,)
 ):
+    _action = b"guildInfo"
+
     def dump(self):
         return b"""{"token":"%b","action":"guildInfo"}""" % (encode_string(self.token),)
 
@@ -116,5 +141,23 @@ class WantToBuyRequest(
     names=("token", "itemCode", "quantity", "price", "exactPrice"),
     types=(str, str, int, int, bool)
 ):
+    _action = b"wantToBuy"
+
     def dump(self):
         return b"""{"token":"%b","action":"wantToBuy","payload":{"itemCode":"%b","quantity":%d,"price":%d,"exactPrice":%b}}""" % (encode_string(self.token), encode_string(self.itemCode), self.quantity, self.price, b"true" if self.exactPrice else b"false")
+
+
+class _prepared_order(request):
+    # wantToBuy with body serialized by TradePipeline
+    __slots__ = "token", "__body"
+
+    _action = b"wantToBuy"
+
+    def __new__(cls, token, body):
+        self = super().__new__(cls)
+        self.token = token
+        self.__body = body
+        return self
+
+    def dump(self):
+        return self.__body
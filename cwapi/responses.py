@@ -1,8 +1,9 @@
 import json
+import pickle
 from warnings import warn
 
-from ._utils import _dataclass_creator, _optional, _slot_wrapper
-from .types import _GuildStock, Action, Condition, Gear, GearSet, Guild, GuildRole, GuildRolesSet, Operation, Class, Castle, Quality, Recipe, RecipeBook, SecondaryClass, Status, Stock
+from ._utils import _check_slots, _dataclass_creator, _enum_decoder, _optional, _restore, _run_validated, _shared, _slot_wrapper
+from .types import _decode_action, _decode_castle, _decode_class, _decode_condition, _decode_guild_role, _decode_operation, _decode_quality, _decode_status, _GuildStock, Action, Condition, Gear, GearSet, Guild, GuildRolesSet, Operation, Class, Castle, Quality, Recipe, RecipeBook, SecondaryClass, Status, Stock
 
 __all__ = ("CreateAuthCodeResponse", "GuildInfoResponse", "ApiException", "InvalidTokenError", "WantToBuyResponse", "RequestProfileResponse", "RequestBasicInfoResponse", "RequestStockResponse", "GetInfoResponse", "RequestGearInfoResponse", "ViewCraftbookResponse", "AuthAdditionalOperationResponse", "GrantAdditionalOperationResponse", "GrantTokenResponse", "BadFormatError", "NotInGuildError", "NoSuchUserError", "LevelIsLowError", "ForbiddenError", "ApiException")
 
@@ -110,11 +111,20 @@ class RequestGearInfoResponse(GearSet):
         self.userId = userId
         return self
 
+    def __reduce__(self):
+        return _restore, (type(self), {"userId": self.userId, **{s.value: g for s, g in self.occupied()}})
+
+    def __copy__(self):
+        c = super().__copy__()
+        c.userId = self.userId
+        return c
+
     def set(self):
-        return GearSet(**{str(s): v for s, v in self if v is not None})
+        return self.view()
 
 
 RequestGearInfoResponse.userId = _slot_wrapper(RequestGearInfoResponse.userId, int, "userId")
+_check_slots(RequestGearInfoResponse)
 
 
 class RequestStockResponse(Stock):
@@ -132,10 +142,21 @@ class RequestStockResponse(Stock):
         self.stockLimit = _stockLimit
         return self
 
+    def __reduce__(self):
+        return type(self), (tuple(self), self.userId, self.stockSize, self.stockLimit)
+
+    def __copy__(self):
+        c = super().__copy__()
+        c.userId = self.userId
+        c.stockSize = self.stockSize
+        c.stockLimit = self.stockLimit
+        return c
+
 
 RequestStockResponse.userId = _slot_wrapper(RequestStockResponse.userId, int, "userId")
 RequestStockResponse.stockSize = _slot_wrapper(RequestStockResponse.stockSize, int, "stockSize")
 RequestStockResponse.stockLimit = _slot_wrapper(RequestStockResponse.stockLimit, int, "stockLimit")
+_check_slots(RequestStockResponse)
 
 
 class GuildInfoResponse(
@@ -181,6 +202,9 @@ class ApiException(response_error):
     def __init__(self, raw):
         super().__init__(raw)
 
+    def __reduce__(self):
+        return type(self), (self.__raw,)
+
     def parse(self):
         return json.loads(self.__raw)
 
@@ -191,6 +215,9 @@ class BadFormatError(response_error):
     def __init__(self):
         super().__init__(f"invalid format in request")
 
+    def __reduce__(self):
+        return type(self), ()
+
 
 class NoSuchUserError(response_error):
     __slots__ = ("userId",)
@@ -203,6 +230,9 @@ class NoSuchUserError(response_error):
     def __init__(self, userId):
         super().__init__(f"user with id {userId} doesn't plays in Chat Wars")
 
+    def __reduce__(self):
+        return type(self), (self.userId,)
+
 
 NoSuchUserError.userId = _slot_wrapper(NoSuchUserError.userId, int, "userId")
 
@@ -218,6 +248,9 @@ class InvalidTokenError(response_error):
     def __init__(self, token):
         super().__init__(f"{token}")
 
+    def __reduce__(self):
+        return type(self), (self.token,)
+
 
 InvalidTokenError.token = _slot_wrapper(InvalidTokenError.token, str, "token")
 
@@ -228,6 +261,9 @@ class InvalidCodeError(response_error):
     def __init__(self):
         super().__init__("passed code is invalid")
 
+    def __reduce__(self):
+        return type(self), ()
+
 
 class ForbiddenError(response_error):
     __slots__ = "userId", "requiredOperation", "action"
@@ -242,6 +278,9 @@ class ForbiddenError(response_error):
     def __init__(self, action, userId, requiredOperation):
         super().__init__(f"request {action !r} for user with id {userId} required permission '{requiredOperation !s}'")
 
+    def __reduce__(self):
+        return type(self), (self.action, self.userId, self.requiredOperation)
+
 
 ForbiddenError.action = _slot_wrapper(ForbiddenError.action, str, "action")  # todo change to class
 ForbiddenError.userId = _slot_wrapper(ForbiddenError.userId, int, "userId")
@@ -254,6 +293,9 @@ class NotInGuildError(response_error):
     def __init__(self):
         super().__init__(f"player not in guild")
 
+    def __reduce__(self):
+        return type(self), ()
+
 
 class LevelIsLowError(response_error):
     __slots__ = ("action", "userId")
@@ -267,13 +309,44 @@ class LevelIsLowError(response_error):
     def __init__(self, action, userId):
         super().__init__(f"user with id {userId} doesn't have required level for request {action !r}")
 
+    def __reduce__(self):
+        return type(self), (self.action, self.userId)
+
 
 LevelIsLowError.action = _slot_wrapper(LevelIsLowError.action, str, "action")
 LevelIsLowError.userId = _slot_wrapper(LevelIsLowError.userId, int, "userId")
 
 
-def parse_response(b, /):
-    o = json.loads(b.decode("utf-8"))
+def decode_response(b, /):
+    return json.loads(b.decode("utf-8"))
+
+
+def parse_response(b, /, trusted=None):
+    return _run_validated(trusted, _build_response, decode_response(b), b)
+
+
+def build_response(o, b, /, trusted=None):
+    return _run_validated(trusted, _build_response, o, b)
+
+
+def _parse_pickled(b, trusted, fallback, /):
+    # runs in worker process, settings of consuming process aren't inherited with "spawn"
+    _enum_decoder.fallback = fallback
+    try:
+        return pickle.dumps(parse_response(b, trusted), pickle.HIGHEST_PROTOCOL)
+    except response_error as e:
+        return pickle.dumps(e, pickle.HIGHEST_PROTOCOL)
+
+
+def _load_parsed(data, /):
+    # values were checked in worker, so objects are restored without checks
+    o = _run_validated(True, pickle.loads, data)
+    if isinstance(o, response_error):
+        raise o
+    return o
+
+
+def _build_response(o, b):
     e = None if o["result"] == "Ok" else o["result"]
 
     if e == "BadFormat":
@@ -285,7 +358,7 @@ def parse_response(b, /):
     elif e == "InvalidCode":
         raise InvalidCodeError()
     elif e == "Forbidden":
-        raise ForbiddenError(action=o["action"], userId=o["payload"]["userId"], requiredOperation=Operation(o["payload"]["requiredOperation"]))
+        raise ForbiddenError(action=o["action"], userId=o["payload"]["userId"], requiredOperation=_decode_operation(o["payload"]["requiredOperation"]))
     elif e == "NotInGuild":
         raise NotInGuildError
     elif e == "LevelIsLow":
@@ -299,38 +372,38 @@ def parse_response(b, /):
         elif a == "grantToken":
             return GrantTokenResponse(userId=o["payload"]["userId"], id=o["payload"]["id"], token=o["payload"]["token"])
         elif a == "authAdditionalOperation":
-            return AuthAdditionalOperationResponse(userId=o["payload"]["userId"], operation=Operation(o["payload"]["operation"]), requestId=o["uuid"])
+            return AuthAdditionalOperationResponse(userId=o["payload"]["userId"], operation=_decode_operation(o["payload"]["operation"]), requestId=o["uuid"])
         elif a == "grantAdditionalOperation":
             return GrantAdditionalOperationResponse(userId=o["payload"]["userId"], requestId=o["payload"]["requestId"])
         elif a == "getInfo":
             return GetInfoResponse(balance=o["payload"]["balance"])
         elif a == "viewCraftbook":
             if o["payload"].get("craft", None) is not None:
-                c = RecipeBook(Recipe(id=r["id"], name=r["name"], price=r.get("price", 0)) for r in o["payload"]["craft"])
+                c = RecipeBook(_shared(Recipe, r["id"], r["name"], r.get("price", 0)) for r in o["payload"]["craft"])
             else:
                 c = None
             if o["payload"].get("alchemy", None) is not None:
-                a = RecipeBook(Recipe(id=r["id"], name=r["name"], price=r.get("price", 0)) for r in o["payload"]["alchemy"])
+                a = RecipeBook(_shared(Recipe, r["id"], r["name"], r.get("price", 0)) for r in o["payload"]["alchemy"])
             else:
                 a = None
             return ViewCraftbookResponse(userId=o["payload"]["userId"], craft=c, alchemy=a)
         elif a == "requestBasicInfo":
-            return RequestBasicInfoResponse(userId=o["payload"]["userId"], class_=Class(o["payload"]["profile"]["class"]), atk=o["payload"]["profile"]["atk"], def_=o["payload"]["profile"]["def"])
+            return RequestBasicInfoResponse(userId=o["payload"]["userId"], class_=_decode_class(o["payload"]["profile"]["class"]), atk=o["payload"]["profile"]["atk"], def_=o["payload"]["profile"]["def"])
         elif a == "requestProfile":
             if "guild" in o["payload"]["profile"]:
-                g = Guild(name=o["payload"]["profile"]["guild"], tag=o["payload"]["profile"].get("guild_tag", None) or None, emoji=o["payload"]["profile"].get("guild_emoji", None) or None)
+                g = _shared(Guild, o["payload"]["profile"]["guild"], o["payload"]["profile"].get("guild_tag", None) or None, o["payload"]["profile"].get("guild_emoji", None) or None)
             else:
                 g = None
 
             if (r := o["payload"]["profile"].get("secondaryClass", None)) is not None:
-                r = SecondaryClass(class_=Class(r["class"]), lvl=r["lvl"])
+                r = _shared(SecondaryClass, _decode_class(r["class"]), r["lvl"])
 
-            return RequestProfileResponse(userId=o["payload"]["userId"], class_=Class(o["payload"]["profile"]["class"]), atk=o["payload"]["profile"].get("atk", 0), def_=o["payload"]["profile"].get("def", 0), castle=Castle(o["payload"]["profile"]["castle"]), secondaryClass=r, hp=o["payload"]["profile"].get("hp", 0), maxHp=o["payload"]["profile"].get("maxHp", 0), exp=o["payload"]["profile"].get("exp", 0), gold=o["payload"]["profile"].get("gold", 0), guild=g, lvl=o["payload"]["profile"]["lvl"], status=Status(o["payload"]["profile"]["status"]), action=Action(o["payload"]["profile"]["action"]), mana=o["payload"]["profile"].get("mana", 0), pouches=o["payload"]["profile"].get("pouches", 0), stamina=o["payload"]["profile"].get("stamina", 0), userName=o["payload"]["profile"]["userName"])
+            return RequestProfileResponse(userId=o["payload"]["userId"], class_=_decode_class(o["payload"]["profile"]["class"]), atk=o["payload"]["profile"].get("atk", 0), def_=o["payload"]["profile"].get("def", 0), castle=_decode_castle(o["payload"]["profile"]["castle"]), secondaryClass=r, hp=o["payload"]["profile"].get("hp", 0), maxHp=o["payload"]["profile"].get("maxHp", 0), exp=o["payload"]["profile"].get("exp", 0), gold=o["payload"]["profile"].get("gold", 0), guild=g, lvl=o["payload"]["profile"]["lvl"], status=_decode_status(o["payload"]["profile"]["status"]), action=_decode_action(o["payload"]["profile"]["action"]), mana=o["payload"]["profile"].get("mana", 0), pouches=o["payload"]["profile"].get("pouches", 0), stamina=o["payload"]["profile"].get("stamina", 0), userName=o["payload"]["profile"]["userName"])
         elif a == "requestGearInfo":
             return RequestGearInfoResponse(
                 userId=o["payload"]["userId"],
                 **{
-                    sn: Gear(name=sv["name"], atk=sv.get("atk", 0), def_=sv.get("def", 0), condition=Condition(sv.get("condition", Condition.Normal)), quality=Quality(sv.get("quality", Quality.Common)), mana=sv.get("mana", 0))
+                    sn: _shared(Gear, sv["name"], sv.get("atk", 0), sv.get("def", 0), _decode_condition(sv["condition"]) if "condition" in sv else Condition.Normal, _decode_quality(sv["quality"]) if "quality" in sv else Quality.Common, sv.get("mana", 0))
                     for sn, sv in o["payload"]["gearInfo"].items()
                 }
             )
@@ -338,7 +411,7 @@ def parse_response(b, /):
             warn(Warning("method 'requestStock' has bag and maybe raise error, refrain from using it"))
             return RequestStockResponse(Stock.compiler(o["payload"]["stock"], o["payload"]["itemCodes"]), userId=o["payload"]["userId"], stockSize=o["payload"]["stockSize"], stockLimit=o["payload"]["stockLimit"])
         elif a == "guildInfo":
-            return GuildInfoResponse(userId=o["payload"]["userId"], tag=o["payload"].get("tag", None) or None, level=o["payload"]["level"], castle=Castle(o["payload"]["castle"]), emoji=o["payload"].get("emoji", None) or None, glory=o["payload"].get("glory", 0), members=o["payload"].get("members", 0), name=o["payload"]["name"], lobby=o["payload"].get("lobby", None) or None, stock=_GuildStock(Stock.compiler(o["payload"]["stock"], o["payload"]["itemCodes"]), size=o["payload"].get("stockSize", 0), limit=o["payload"].get("stockLimit", 0)), repair=o["payload"]["repair"], roles=GuildRolesSet(*map(GuildRole, o["payload"]["roles"])) if "roles" in o["payload"] else GuildRolesSet())
+            return GuildInfoResponse(userId=o["payload"]["userId"], tag=o["payload"].get("tag", None) or None, level=o["payload"]["level"], castle=_decode_castle(o["payload"]["castle"]), emoji=o["payload"].get("emoji", None) or None, glory=o["payload"].get("glory", 0), members=o["payload"].get("members", 0), name=o["payload"]["name"], lobby=o["payload"].get("lobby", None) or None, stock=_GuildStock(Stock.compiler(o["payload"]["stock"], o["payload"]["itemCodes"]), size=o["payload"].get("stockSize", 0), limit=o["payload"].get("stockLimit", 0)), repair=o["payload"]["repair"], roles=GuildRolesSet(*map(_decode_guild_role, o["payload"]["roles"])) if "roles" in o["payload"] else GuildRolesSet())
         elif a == "wantToBuy":
             return WantToBuyResponse(userId=o["payload"]["userId"], itemName=o["payload"]["itemName"], quantity=o["payload"].get("quantity", 0))
 
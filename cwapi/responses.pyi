@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Iterable, final, NoReturn, Optional, Literal, overload, Union
+from typing import Any, Iterable, final, NoReturn, Optional, Literal, overload, Union
 
 from cwapi.types import _GuildStock, Action, Castle, Gear, GearSet, Guild, GuildRolesSet, Operation, Class, RecipeBook, SecondaryClass, Status, Stock, StockCell
 
@@ -520,4 +520,10 @@ class LevelIsLowError(response_error):
     def __new__(cls, action: str, userId: int) -> LevelIsLowError: ...
 
 
-def parse_response(b: bytes, /) -> response: ...
+def parse_response(b: bytes, /, trusted: Optional[bool] = None) -> response: ...
+
+
+def decode_response(b: bytes, /) -> Any: ...
+
+
+def build_response(o: Any, b: bytes, /, trusted: Optional[bool] = None) -> response: ...
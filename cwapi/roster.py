@@ -0,0 +1,262 @@
+from array import array
+from collections import Counter
+from itertools import compress
+
+from .responses import RequestBasicInfoResponse, RequestGearInfoResponse, RequestProfileResponse
+from .types import _GEAR_SLOTS, Castle, Class, Quality
+
+__all__ = ("GuildRoster",)
+
+# code 0 is reserved for missing (not received yet or unknown) value
+_CLASSES = (None,) + tuple(Class)
+_CASTLES = (None,) + tuple(Castle)
+_QUALITIES = (None,) + tuple(Quality)
+_CLASS_CODES = {m: i for i, m in enumerate(_CLASSES) if m is not None}
+_CASTLE_CODES = {m: i for i, m in enumerate(_CASTLES) if m is not None}
+_QUALITY_CODES = {m: i for i, m in enumerate(_QUALITIES) if m is not None}
+
+_PROFILE_COLUMNS = ("hp", "maxHp", "exp", "gold", "lvl", "mana", "pouches", "stamina")
+_QUALITY_COLUMNS = tuple(f"{s.value}_quality" for s in _GEAR_SLOTS)
+
+# bits of "received" column, which responses were received for member; columns of other parts aren't aggregated
+_BASIC_INFO = 1
+_PROFILE = 2
+_GEAR = 4
+
+_COLUMNS = (
+    ("userId", "q"),
+    ("received", "B"),
+    ("class_", "B"),
+    ("atk", "i"),
+    ("def_", "i"),
+    ("castle", "B"),
+    ("hp", "i"),
+    ("maxHp", "i"),
+    ("exp", "q"),
+    ("gold", "q"),
+    ("lvl", "H"),
+    ("mana", "i"),
+    ("pouches", "i"),
+    ("stamina", "i"),
+    ("gear_atk", "i"),
+    ("gear_def", "i"),
+    ("gear_mana", "i"),
+) + tuple((n, "B") for n in _QUALITY_COLUMNS)
+
+_EXPORTED = "roster can't add or remove members while numpy views of its columns exist"
+
+_ENUMS = {"class_": _CLASSES, "castle": _CASTLES, **{n: _QUALITIES for n in _QUALITY_COLUMNS}}
+
+_SOURCES = {
+    "userId": 0,
+    "received": 0,
+    "class_": _BASIC_INFO,
+    "atk": _BASIC_INFO,
+    "def_": _BASIC_INFO,
+    "castle": _PROFILE,
+    **{n: _PROFILE for n in _PROFILE_COLUMNS},
+    "gear_atk": _GEAR,
+    "gear_def": _GEAR,
+    "gear_mana": _GEAR,
+    **{n: _GEAR for n in _QUALITY_COLUMNS},
+}
+
+_numpy = None
+
+
+def _import_numpy():
+    # aggregates are vectorized with numpy if it's installed; False is cached when it isn't
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy
+
+
+class GuildRoster:
+    __slots__ = "__rows", "__columns"
+
+    columns = tuple(n for n, _ in _COLUMNS)
+
+    BASIC_INFO = _BASIC_INFO
+    PROFILE = _PROFILE
+    GEAR = _GEAR
+
+    def __new__(cls):
+        self = super().__new__(cls)
+        self.__rows = dict()
+        self.__columns = {n: array(t) for n, t in _COLUMNS}
+        return self
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def __contains__(self, userId):
+        return userId in self.__rows
+
+    def __iter__(self):
+        return iter(self.__rows.keys())
+
+    def __row(self, userId):
+        row = self.__rows.get(userId, None)
+        if row is not None:
+            return row
+        resized = []
+        try:
+            for a in self.__columns.values():
+                a.append(0)
+                resized.append(a)
+        except BufferError:
+            for a in resized:
+                a.pop()
+            raise BufferError(_EXPORTED) from None
+        row = self.__rows[userId] = len(self.__rows)
+        self.__columns["userId"][row] = userId
+        return row
+
+    def update(self, res, /):
+        c = self.__columns
+        if isinstance(res, RequestBasicInfoResponse):
+            row = self.__row(res.userId)
+            c["class_"][row] = _CLASS_CODES.get(res.class_, 0)
+            c["atk"][row] = res.atk
+            c["def_"][row] = res.def_
+            c["received"][row] |= _BASIC_INFO
+            if type(res) is RequestProfileResponse:
+                c["castle"][row] = _CASTLE_CODES.get(res.castle, 0)
+                for n in _PROFILE_COLUMNS:
+                    c[n][row] = getattr(res, n)
+                c["received"][row] |= _PROFILE
+        elif isinstance(res, RequestGearInfoResponse):
+            row = self.__row(res.userId)
+            atk = def_ = mana = 0
+            for (s, g), n in zip(res, _QUALITY_COLUMNS):
+                if g is None:
+                    c[n][row] = 0
+                    continue
+                c[n][row] = _QUALITY_CODES.get(g.quality, 0)
+                atk += g.atk
+                def_ += g.def_
+                mana += g.mana
+            c["gear_atk"][row] = atk
+            c["gear_def"][row] = def_
+            c["gear_mana"][row] = mana
+            c["received"][row] |= _GEAR
+        else:
+            raise TypeError(f"unsupported response type {type(res).__qualname__ !r}")
+
+    def forget(self, userId, /):
+        row = self.__rows.get(userId, None)
+        if row is None:
+            return
+        resized = []
+        try:
+            for a in self.__columns.values():
+                resized.append((a, a.pop()))
+        except BufferError:
+            for a, v in resized:
+                a.append(v)
+            raise BufferError(_EXPORTED) from None
+        del self.__rows[userId]
+        # last row is moved to freed place, so columns stay dense
+        if row != len(self.__rows):
+            for a, v in resized:
+                a[row] = v
+            self.__rows[self.__columns["userId"][row]] = row
+
+    def __column(self, name):
+        try:
+            return self.__columns[name]
+        except KeyError:
+            raise ValueError(f"unknown column {name !r}") from None
+
+    def column(self, name, /):
+        return self.__column(name)[:]
+
+    def members(self, name, /):
+        self.__column(name)
+        try:
+            return _ENUMS[name]
+        except KeyError:
+            raise ValueError(f"column {name !r} doesn't contain enum codes") from None
+
+    def __received(self, name):
+        # values of rows that have column's data, as numpy array if numpy is installed
+        a = self.__column(name)
+        source = _SOURCES[name]
+        received = self.__columns["received"]
+        numpy = _import_numpy()
+        if numpy:
+            v = numpy.frombuffer(a, dtype=a.typecode)
+            if source:
+                v = v[(numpy.frombuffer(received, dtype=received.typecode) & source) != 0]
+            return v, True
+        if source:
+            return list(compress(a, [m & source for m in received])), False
+        return a, False
+
+    def count(self, name, /):
+        return len(self.__received(name)[0])
+
+    def sum(self, name, /):
+        v, vectorized = self.__received(name)
+        if vectorized:
+            return int(v.sum(dtype="int64"))
+        return sum(v)
+
+    def mean(self, name, /):
+        v, vectorized = self.__received(name)
+        if not len(v):
+            return None
+        if vectorized:
+            return float(v.mean(dtype="float64"))
+        return sum(v) / len(v)
+
+    def min(self, name, /):
+        v, vectorized = self.__received(name)
+        if not len(v):
+            return None
+        return int(v.min()) if vectorized else min(v)
+
+    def max(self, name, /):
+        v, vectorized = self.__received(name)
+        if not len(v):
+            return None
+        return int(v.max()) if vectorized else max(v)
+
+    def histogram(self, name, /):
+        v, vectorized = self.__received(name)
+        if vectorized:
+            values, counts = _numpy.unique(v, return_counts=True)
+            counts = zip(values.tolist(), counts.tolist())
+        else:
+            counts = sorted(Counter(v).items())
+        members = _ENUMS.get(name, None)
+        if members is None:
+            return dict(counts)
+        return {members[code]: n for code, n in counts}
+
+    def quality_counts(self):
+        # empty slots have code 0 and aren't counted
+        numpy = _import_numpy()
+        if numpy:
+            counts = numpy.zeros(len(_QUALITIES), dtype="int64")
+            for n in _QUALITY_COLUMNS:
+                counts += numpy.bincount(self.__received(n)[0], minlength=len(_QUALITIES))
+            return {_QUALITIES[code]: int(counts[code]) for code in range(1, len(_QUALITIES)) if counts[code]}
+        counts = Counter()
+        for n in _QUALITY_COLUMNS:
+            counts.update(self.__columns[n])
+        counts.pop(0, None)
+        return {_QUALITIES[code]: n for code, n in sorted(counts.items())}
+
+    def numpy(self, name=None, /):
+        import numpy
+
+        if name is not None:
+            a = self.__column(name)
+            return numpy.frombuffer(a, dtype=a.typecode)
+        return {n: numpy.frombuffer(a, dtype=a.typecode) for n, a in self.__columns.items()}
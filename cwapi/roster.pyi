@@ -0,0 +1,84 @@
+from array import array
+from typing import Any, ClassVar, Dict, Iterator, Literal, NoReturn, Optional, Tuple, Union, final, overload
+
+from .responses import RequestBasicInfoResponse, RequestGearInfoResponse, RequestProfileResponse
+from .types import Castle, Class, Quality
+
+_QUALITY_COLUMN = Literal["weapon_quality", "offhand_quality", "head_quality", "body_quality", "hands_quality", "feet_quality", "coat_quality", "amulet_quality", "ring_quality"]
+_ENUM_COLUMN = Union[Literal["class_", "castle"], _QUALITY_COLUMN]
+_INT_COLUMN = Literal["userId", "received", "atk", "def_", "hp", "maxHp", "exp", "gold", "lvl", "mana", "pouches", "stamina", "gear_atk", "gear_def", "gear_mana"]
+_COLUMN = Union[_INT_COLUMN, _ENUM_COLUMN]
+
+
+@final
+class GuildRoster:
+    # members are stored as rows of array columns (in same order for all columns);
+    # class, castle and gear qualities are stored as codes, 0 means that value wasn't received yet or unknown
+    columns: Tuple[str, ...]
+
+    # bits of "received" column: which responses were received for member;
+    # columns filled by other responses hold 0 and are skipped by aggregates
+    BASIC_INFO: ClassVar[int]  # class_, atk, def_ (set by basic info and profile)
+    PROFILE: ClassVar[int]  # castle, hp, maxHp, exp, gold, lvl, mana, pouches, stamina
+    GEAR: ClassVar[int]  # gear_atk, gear_def, gear_mana and qualities
+
+    def __new__(cls) -> GuildRoster: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, userId: int) -> bool: ...
+
+    def __iter__(self) -> Iterator[int]: ...
+
+    # gear columns contain sums of atk/def/mana of worn gear
+    def update(self, res: Union[RequestBasicInfoResponse, RequestProfileResponse, RequestGearInfoResponse], /) -> NoReturn: ...
+
+    # order of rows is changed (last row is moved to place of removed one)
+    def forget(self, userId: int, /) -> NoReturn: ...
+
+    # copy of column
+    def column(self, name: _COLUMN, /) -> array: ...
+
+    # members of enum by codes
+    @overload
+    def members(self, name: Literal["class_"], /) -> Tuple[Optional[Class], ...]: ...
+
+    @overload
+    def members(self, name: Literal["castle"], /) -> Tuple[Optional[Castle], ...]: ...
+
+    @overload
+    def members(self, name: _QUALITY_COLUMN, /) -> Tuple[Optional[Quality], ...]: ...
+
+    # aggregates are computed only over members that have column's data (vectorized if numpy is installed)
+    def count(self, name: _COLUMN, /) -> int: ...
+
+    def sum(self, name: _COLUMN, /) -> int: ...
+
+    def mean(self, name: _COLUMN, /) -> Optional[float]: ...
+
+    def min(self, name: _COLUMN, /) -> Optional[int]: ...
+
+    def max(self, name: _COLUMN, /) -> Optional[int]: ...
+
+    # counts of members by value, codes of enum columns are decoded (None for missing values)
+    @overload
+    def histogram(self, name: Literal["class_"], /) -> Dict[Optional[Class], int]: ...
+
+    @overload
+    def histogram(self, name: Literal["castle"], /) -> Dict[Optional[Castle], int]: ...
+
+    @overload
+    def histogram(self, name: _QUALITY_COLUMN, /) -> Dict[Optional[Quality], int]: ...
+
+    @overload
+    def histogram(self, name: _INT_COLUMN, /) -> Dict[int, int]: ...
+
+    # over all slots of all members
+    def quality_counts(self) -> Dict[Quality, int]: ...
+
+    # requires numpy; arrays share memory with roster, members can't be added or removed (BufferError) while they exist
+    @overload
+    def numpy(self, name: _COLUMN, /) -> Any: ...
+
+    @overload
+    def numpy(self) -> Dict[str, Any]: ...
@@ -0,0 +1,245 @@
+from asyncio import Event, Queue, ensure_future, get_running_loop, wait
+from heapq import heappop, heappush
+from random import uniform
+from time import monotonic
+
+from . import AsyncChatWarsApiClient
+from .requests import GuildInfoRequest, RequestBasicInfoRequest, RequestGearInfoRequest, RequestProfileRequest, RequestStockRequest, ViewCraftbookRequest
+from .responses import response_error
+
+__all__ = ("RefreshScheduler",)
+
+_REFRESH_REQUESTS = (ViewCraftbookRequest, RequestProfileRequest, RequestBasicInfoRequest, RequestGearInfoRequest, RequestStockRequest, GuildInfoRequest)
+
+
+class _refresh_entry:
+    __slots__ = "token", "request_type", "interval", "active"
+
+    def __new__(cls, token, request_type, interval):
+        self = super().__new__(cls)
+        self.token = token
+        self.request_type = request_type
+        self.interval = interval
+        self.active = True
+        return self
+
+
+class RefreshScheduler:
+    __slots__ = "__client", "__entries", "__heap", "__seq", "__jitter", "__callback", "__results_limit", "__results", "__max_concurrency", "__concurrency", "__in_flight", "__target_latency", "__latency", "__errors", "__wakeup", "__task", "__refreshes", "__error"
+
+    def __new__(cls, client, *, jitter=0.1, max_concurrency=16, target_latency=1.0, callback=None, results_limit=1024):
+        if not isinstance(client, AsyncChatWarsApiClient):
+            raise TypeError(f"client must be {AsyncChatWarsApiClient.__qualname__ !r}")
+        if type(jitter) is not int and type(jitter) is not float:
+            raise TypeError("jitter must be int or float")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in range [0, 1)")
+        if type(max_concurrency) is not int:
+            raise TypeError("max concurrency must be int")
+        if max_concurrency < 1:
+            raise ValueError("max concurrency must be positive")
+        if type(target_latency) is not int and type(target_latency) is not float:
+            raise TypeError("target latency must be int or float")
+        if target_latency <= 0:
+            raise ValueError("target latency must be positive")
+        if callback is not None and not callable(callback):
+            raise TypeError("callback must be callable")
+        if type(results_limit) is not int:
+            raise TypeError("results limit must be int")
+        if results_limit < 0:
+            raise ValueError("results limit can't be negative")
+
+        self = super().__new__(cls)
+        self.__client = client
+        self.__entries = dict()
+        self.__heap = []
+        self.__seq = 0
+        self.__jitter = jitter
+        self.__callback = callback
+        self.__results_limit = results_limit
+        self.__results = None
+        self.__max_concurrency = max_concurrency
+        self.__concurrency = float(max_concurrency)
+        self.__in_flight = 0
+        self.__target_latency = target_latency
+        self.__latency = None
+        self.__errors = 0
+        self.__wakeup = None
+        self.__task = None
+        self.__refreshes = set()
+        self.__error = None
+        return self
+
+    @property
+    def client(self):
+        return self.__client
+
+    @property
+    def concurrency(self):
+        return int(self.__concurrency)
+
+    @property
+    def latency(self):
+        return self.__latency
+
+    @property
+    def errors(self):
+        return self.__errors
+
+    @property
+    def in_flight(self):
+        return self.__in_flight
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __push(self, due, entry):
+        self.__seq += 1
+        heappush(self.__heap, (due, self.__seq, entry))
+
+    def __wake(self):
+        if self.__wakeup is not None:
+            self.__wakeup.set()
+
+    def add(self, token, request_type, interval, /):
+        if type(token) is not str:
+            raise TypeError("token must be str")
+        if request_type not in _REFRESH_REQUESTS:
+            raise TypeError(f"request type must be one of {', '.join(t.__qualname__ for t in _REFRESH_REQUESTS)}")
+        if type(interval) is not int and type(interval) is not float:
+            raise TypeError("interval must be int or float")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+
+        self.remove(token, request_type)
+        entry = self.__entries[(token, request_type)] = _refresh_entry(token, request_type, interval)
+        self.__push(monotonic() + uniform(0, interval), entry)
+        self.__wake()
+
+    def remove(self, token, request_type, /):
+        entry = self.__entries.pop((token, request_type), None)
+        if entry is not None:
+            entry.active = False
+
+    def start(self):
+        if self.__task is not None and not self.__task.done():
+            raise RuntimeError("scheduler already started")
+        self.__task = ensure_future(self.run())
+        return self.__task
+
+    async def stop(self):
+        task, self.__task = self.__task, None
+        if task is not None:
+            task.cancel()
+            await wait((task,))
+        await self.__cancel_refreshes()
+
+    async def __cancel_refreshes(self):
+        refreshes = tuple(self.__refreshes)
+        for t in refreshes:
+            t.cancel()
+        if refreshes:
+            await wait(refreshes)
+
+    def __queue(self):
+        # created lazily, queue must be bound to running loop
+        if self.__results is None:
+            self.__results = Queue(self.__results_limit)
+        return self.__results
+
+    def __aiter__(self):
+        if self.__callback is not None:
+            raise TypeError("results are delivered to callback")
+        return self
+
+    async def __anext__(self):
+        return await self.__queue().get()
+
+    async def run(self):
+        self.__wakeup = Event()
+        self.__error = None
+        if self.__callback is None:
+            self.__queue()
+
+        try:
+            await self.__run(get_running_loop())
+        finally:
+            await self.__cancel_refreshes()
+
+    async def __run(self, loop):
+        while True:
+            self.__wakeup.clear()
+
+            if self.__error is not None:
+                raise self.__error
+
+            while self.__heap and not self.__heap[0][2].active:
+                heappop(self.__heap)
+
+            if not self.__heap:
+                await self.__wakeup.wait()
+                continue
+
+            due, _, entry = self.__heap[0]
+            now = monotonic()
+            if due > now:
+                # timer instead of wait_for(), which can swallow cancellation coinciding with timeout
+                timer = loop.call_later(due - now, self.__wakeup.set)
+                try:
+                    await self.__wakeup.wait()
+                finally:
+                    timer.cancel()
+                continue
+
+            if self.__in_flight >= int(self.__concurrency):
+                await self.__wakeup.wait()
+                continue
+
+            heappop(self.__heap)
+            nxt = due + entry.interval * (1 + uniform(-self.__jitter, self.__jitter))
+            if nxt < now:
+                nxt = now + uniform(0, entry.interval)
+            self.__push(nxt, entry)
+
+            self.__in_flight += 1
+            task = ensure_future(self.__refresh(entry))
+            self.__refreshes.add(task)
+            task.add_done_callback(self.__refresh_done)
+
+    def __refresh_done(self, task):
+        self.__refreshes.discard(task)
+        # error raised by callback stops scheduler, run() raises it
+        if not task.cancelled() and task.exception() is not None and self.__error is None:
+            self.__error = task.exception()
+            self.__wake()
+
+    async def __refresh(self, entry):
+        # request stays in flight until result is delivered, so full results queue throttles scheduler
+        try:
+            start = monotonic()
+            failed = False
+            try:
+                result = await self.__client.ask(entry.request_type(token=entry.token))
+            except response_error as e:
+                result = e
+            except Exception as e:
+                result = e
+                failed = True
+
+            latency = monotonic() - start
+            self.__latency = latency if self.__latency is None else self.__latency * 0.8 + latency * 0.2
+            if failed:
+                self.__errors += 1
+                self.__concurrency = max(1.0, self.__concurrency / 2)
+            elif self.__latency > self.__target_latency:
+                self.__concurrency = max(1.0, self.__concurrency * 0.9)
+            else:
+                self.__concurrency = min(float(self.__max_concurrency), self.__concurrency + 1 / self.__concurrency)
+
+            if self.__callback is not None:
+                self.__callback(entry.token, entry.request_type, result)
+            else:
+                await self.__results.put((entry.token, entry.request_type, result))
+        finally:
+            self.__in_flight -= 1
+            self.__wake()
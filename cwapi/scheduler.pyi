@@ -0,0 +1,51 @@
+from asyncio import Task
+from typing import AsyncIterator, Callable, NoReturn, Optional, Tuple, Type, Union, final
+
+from . import AsyncChatWarsApiClient
+from .requests import GuildInfoRequest, RequestBasicInfoRequest, RequestGearInfoRequest, RequestProfileRequest, RequestStockRequest, ViewCraftbookRequest
+from .responses import response
+
+_REFRESH_REQUEST = Union[Type[ViewCraftbookRequest], Type[RequestProfileRequest], Type[RequestBasicInfoRequest], Type[RequestGearInfoRequest], Type[RequestStockRequest], Type[GuildInfoRequest]]
+# result is response, raised response_error or any other exception raised by client
+_REFRESH_RESULT = Tuple[str, _REFRESH_REQUEST, Union[response, Exception]]
+
+
+@final
+class RefreshScheduler(AsyncIterator[_REFRESH_RESULT]):
+    @property
+    def client(self) -> AsyncChatWarsApiClient: ...
+
+    # current adaptive limit of requests in flight
+    @property
+    def concurrency(self) -> int: ...
+
+    # exponential moving average of request latency in seconds
+    @property
+    def latency(self) -> Optional[float]: ...
+
+    @property
+    def errors(self) -> int: ...
+
+    @property
+    def in_flight(self) -> int: ...
+
+    # without callback results are queued (up to results_limit, 0 means unlimited), scheduler waits while queue is full
+    def __new__(cls, client: AsyncChatWarsApiClient, *, jitter: float = 0.1, max_concurrency: int = 16, target_latency: float = 1.0, callback: Callable[[str, _REFRESH_REQUEST, Union[response, Exception]], None] = None, results_limit: int = 1024) -> RefreshScheduler: ...
+
+    def __len__(self) -> int: ...
+
+    def add(self, token: str, request_type: _REFRESH_REQUEST, interval: Union[int, float], /) -> NoReturn: ...
+
+    def remove(self, token: str, request_type: _REFRESH_REQUEST, /) -> NoReturn: ...
+
+    def start(self) -> Task: ...
+
+    # cancels refreshes in flight and waits for them
+    async def stop(self) -> NoReturn: ...
+
+    # raises error of callback (scheduler is stopped then)
+    async def run(self) -> NoReturn: ...
+
+    def __aiter__(self) -> RefreshScheduler: ...
+
+    async def __anext__(self) -> _REFRESH_RESULT: ...
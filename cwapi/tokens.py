@@ -0,0 +1,236 @@
+from time import monotonic
+
+from .requests import AuthAdditionalOperationRequest, CreateAuthCodeRequest, GrantAdditionalOperationRequest, GrantTokenRequest, GuildInfoRequest, RequestBasicInfoRequest, RequestGearInfoRequest, RequestProfileRequest, RequestStockRequest, ViewCraftbookRequest, WantToBuyRequest, _prepared_order, request
+from .responses import AuthAdditionalOperationResponse, ForbiddenError, GrantAdditionalOperationResponse, GrantTokenResponse, InvalidTokenError, NoSuchUserError, response, response_error
+from .types import Operation
+
+__all__ = ("TokenRegistry",)
+
+# authorization which wasn't granted in this time (seconds) is dropped, so operation is requested again
+_PENDING_TTL = 900
+
+_REQUIRED_OPERATIONS = {
+    RequestBasicInfoRequest: Operation.GetBasicInfo,
+    RequestProfileRequest: Operation.GetUserProfile,
+    ViewCraftbookRequest: Operation.ViewCraftbook,
+    RequestGearInfoRequest: Operation.GetGearInfo,
+    RequestStockRequest: Operation.GetStock,
+    GuildInfoRequest: Operation.GuildInfo,
+    WantToBuyRequest: Operation.TradeTerminal,
+    _prepared_order: Operation.TradeTerminal,
+}
+
+
+class _token_state:
+    __slots__ = "userId", "granted", "forbidden"
+
+    def __new__(cls):
+        self = super().__new__(cls)
+        self.userId = None
+        self.granted = set()
+        self.forbidden = dict()
+        return self
+
+
+class TokenRegistry:
+    __slots__ = "__tokens", "__invalid_tokens", "__missing_users", "__pending", "__negative_ttl"
+
+    def __new__(cls, *, negative_ttl=None):
+        if negative_ttl is not None:
+            if type(negative_ttl) is not int and type(negative_ttl) is not float:
+                raise TypeError("negative ttl must be int or float")
+            if negative_ttl <= 0:
+                raise ValueError("negative ttl must be positive")
+
+        self = super().__new__(cls)
+        self.__tokens = dict()
+        self.__invalid_tokens = dict()
+        self.__missing_users = dict()
+        self.__pending = dict()
+        self.__negative_ttl = negative_ttl
+        return self
+
+    @property
+    def negative_ttl(self):
+        return self.__negative_ttl
+
+    def __expired(self, since):
+        return self.__negative_ttl is not None and monotonic() - since >= self.__negative_ttl
+
+    def __state(self, token):
+        try:
+            return self.__tokens[token]
+        except KeyError:
+            s = self.__tokens[token] = _token_state()
+            return s
+
+    def granted(self, token, /):
+        if type(token) is not str:
+            raise TypeError("token must be str")
+        s = self.__tokens.get(token, None)
+        return frozenset() if s is None else frozenset(s.granted)
+
+    def forbidden(self, token, /):
+        if type(token) is not str:
+            raise TypeError("token must be str")
+        s = self.__tokens.get(token, None)
+        if s is None:
+            return frozenset()
+        return frozenset(op for op, (since, _, _) in s.forbidden.items() if not self.__expired(since))
+
+    def is_allowed(self, token, operation, /):
+        if type(token) is not str:
+            raise TypeError("token must be str")
+        if type(operation) is not Operation:
+            raise TypeError(f"operation must be {Operation.__qualname__ !r}")
+        if self.is_invalid(token):
+            return False
+        s = self.__tokens.get(token, None)
+        if s is None:
+            return None
+        if operation in s.granted:
+            return True
+        f = s.forbidden.get(operation, None)
+        if f is not None and not self.__expired(f[0]):
+            return False
+        return None
+
+    def is_invalid(self, token, /):
+        since = self.__invalid_tokens.get(token, None)
+        if since is None:
+            return False
+        if self.__expired(since):
+            del self.__invalid_tokens[token]
+            return False
+        return True
+
+    def is_missing_user(self, userId, /):
+        since = self.__missing_users.get(userId, None)
+        if since is None:
+            return False
+        if self.__expired(since):
+            del self.__missing_users[userId]
+            return False
+        return True
+
+    def _user_of(self, token, /):
+        s = self.__tokens.get(token, None)
+        return None if s is None else s.userId
+
+    def forget(self, token, /):
+        self.__tokens.pop(token, None)
+        self.__invalid_tokens.pop(token, None)
+        self.__forget_pending(token)
+
+    def __forget_pending(self, token):
+        for rid in [rid for rid, (t, _, _) in self.__pending.items() if t == token]:
+            del self.__pending[rid]
+
+    def __trim_pending(self, now):
+        # entries are in order of creation
+        while self.__pending:
+            rid, (_, _, since) = next(iter(self.__pending.items()))
+            if since > now - _PENDING_TTL:
+                break
+            del self.__pending[rid]
+
+    def check(self, req, /):
+        if not isinstance(req, request):
+            raise TypeError("unsupported type of request")
+
+        if type(req) is CreateAuthCodeRequest or type(req) is GrantTokenRequest:
+            if self.is_missing_user(req.userId):
+                raise NoSuchUserError(userId=req.userId)
+            return
+
+        token = getattr(req, "token", None)
+        if token is None:
+            return
+        if self.is_invalid(token):
+            raise InvalidTokenError(token=token)
+
+        op = _REQUIRED_OPERATIONS.get(type(req), None)
+        s = self.__tokens.get(token, None)
+        if op is None or s is None:
+            return
+        f = s.forbidden.get(op, None)
+        if f is None:
+            return
+        since, action, userId = f
+        if self.__expired(since):
+            del s.forbidden[op]
+            return
+        raise ForbiddenError(action=action, userId=userId, requiredOperation=op)
+
+    def learn(self, req, result, /):
+        if not isinstance(req, request):
+            raise TypeError("unsupported type of request")
+        if not isinstance(result, response):
+            raise TypeError("unsupported type of response")
+
+        now = monotonic()
+
+        if type(result) is NoSuchUserError:
+            self.__missing_users[result.userId] = now
+            return
+        if type(result) is GrantTokenResponse:
+            self.__missing_users.pop(result.userId, None)
+            self.__invalid_tokens.pop(result.token, None)
+            self.__state(result.token).userId = result.userId
+            return
+
+        token = getattr(req, "token", None)
+        if token is None:
+            return
+
+        if type(req) is GrantAdditionalOperationRequest and isinstance(result, response_error):
+            # rejected grant isn't waited anymore, operation can be requested again
+            self.__pending.pop(req.requestId, None)
+
+        if type(result) is InvalidTokenError:
+            self.__invalid_tokens[token] = now
+            self.__tokens.pop(token, None)
+            self.__forget_pending(token)
+            return
+
+        s = self.__state(token)
+        userId = getattr(result, "userId", None)
+        if userId is not None:
+            s.userId = userId
+
+        if type(result) is ForbiddenError:
+            s.granted.discard(result.requiredOperation)
+            s.forbidden[result.requiredOperation] = (now, result.action, result.userId)
+        elif type(result) is AuthAdditionalOperationResponse:
+            self.__trim_pending(now)
+            self.__pending.pop(result.requestId, None)
+            self.__pending[result.requestId] = (token, result.operation, now)
+        elif type(result) is GrantAdditionalOperationResponse:
+            p = self.__pending.pop(result.requestId, None)
+            if p is not None:
+                s = self.__state(p[0])
+                s.granted.add(p[1])
+                s.forbidden.pop(p[1], None)
+        elif not isinstance(result, response_error):
+            op = _REQUIRED_OPERATIONS.get(type(req), None)
+            if op is not None:
+                s.granted.add(op)
+                s.forbidden.pop(op, None)
+
+    def authorization_requests(self, tokens=None, /):
+        if tokens is not None:
+            tokens = set(tokens)
+        self.__trim_pending(monotonic())
+        requested = {(t, op) for t, op, _ in self.__pending.values()}
+        batch = []
+        for token, s in self.__tokens.items():
+            if tokens is not None and token not in tokens:
+                continue
+            if self.is_invalid(token):
+                continue
+            for op, (since, _, _) in s.forbidden.items():
+                if (token, op) in requested or self.__expired(since):
+                    continue
+                requested.add((token, op))
+                batch.append(AuthAdditionalOperationRequest(token=token, operation=op))
+        return batch
@@ -0,0 +1,35 @@
+from typing import FrozenSet, Iterable, List, Literal, NoReturn, Optional, Union, final
+
+from .requests import AuthAdditionalOperationRequest, request
+from .responses import response
+from .types import Operation
+
+
+@final
+class TokenRegistry:
+    @property
+    def negative_ttl(self) -> Optional[Union[int, float]]: ...
+
+    def __new__(cls, *, negative_ttl: Optional[Union[int, float]] = None) -> TokenRegistry: ...
+
+    def granted(self, token: str, /) -> FrozenSet[Operation]: ...
+
+    def forbidden(self, token: str, /) -> FrozenSet[Operation]: ...
+
+    # None if nothing known about operation for this token
+    def is_allowed(self, token: str, operation: Operation, /) -> Optional[bool]: ...
+
+    def is_invalid(self, token: str, /) -> bool: ...
+
+    def is_missing_user(self, userId: int, /) -> bool: ...
+
+    def forget(self, token: str, /) -> NoReturn: ...
+
+    # raises cached ForbiddenError, InvalidTokenError or NoSuchUserError if request is known to fail
+    def check(self, req: request, /) -> NoReturn: ...
+
+    def learn(self, req: request, result: response, /) -> NoReturn: ...
+
+    # one request per forbidden (token, operation) pair which isn't waiting for grant;
+    # waiting is dropped when grant is rejected or after 15 minutes
+    def authorization_requests(self, tokens: Iterable[str] = None, /) -> List[AuthAdditionalOperationRequest]: ...
@@ -0,0 +1,113 @@
+from array import array
+from time import perf_counter
+
+from . import AsyncChatWarsApiClient
+from ._utils import _dataclass_creator, _optional, encode_string
+from .requests import _prepared_order
+
+__all__ = ("TradePipeline", "TimeToAckStats")
+
+
+class TimeToAckStats(
+    metaclass=_dataclass_creator,
+    names=("count", "errors", "mean", "min", "max", "p50", "p90", "p99"),
+    types=(int, int, _optional(float), _optional(float), _optional(float), _optional(float), _optional(float), _optional(float)),
+):
+    pass
+
+
+class TradePipeline:
+    __slots__ = "__client", "__prefixes", "__samples", "__window", "__next", "__count", "__errors", "__total", "__min", "__max"
+
+    def __new__(cls, client, *, window=1024):
+        if not isinstance(client, AsyncChatWarsApiClient):
+            raise TypeError(f"client must be {AsyncChatWarsApiClient.__qualname__ !r}")
+        if type(window) is not int:
+            raise TypeError("window must be int")
+        if window < 1:
+            raise ValueError("window must be positive")
+
+        self = super().__new__(cls)
+        self.__client = client
+        self.__prefixes = dict()
+        self.__samples = array("d")
+        self.__window = window
+        self.__next = 0
+        self.__count = 0
+        self.__errors = 0
+        self.__total = 0.0
+        self.__min = None
+        self.__max = None
+        return self
+
+    @property
+    def client(self):
+        return self.__client
+
+    def prepare(self, token, itemCode, /):
+        if type(token) is not str:
+            raise TypeError("token must be str")
+        if type(itemCode) is not str:
+            raise TypeError("item code must be str")
+
+        key = (token, itemCode)
+        try:
+            return self.__prefixes[key]
+        except KeyError:
+            p = self.__prefixes[key] = b"""{"token":"%b","action":"wantToBuy","payload":{"itemCode":"%b","quantity":""" % (encode_string(token), encode_string(itemCode))
+            return p
+
+    def forget(self, token, itemCode=None, /):
+        if itemCode is not None:
+            self.__prefixes.pop((token, itemCode), None)
+        else:
+            for key in [key for key in self.__prefixes if key[0] == token]:
+                del self.__prefixes[key]
+
+    async def buy(self, token, itemCode, quantity, price, exactPrice=False, /):
+        if type(quantity) is not int:
+            raise TypeError("quantity must be int")
+        if type(price) is not int:
+            raise TypeError("price must be int")
+        if type(exactPrice) is not bool:
+            raise TypeError("exact price flag must be bool")
+
+        body = self.prepare(token, itemCode) + b"""%d,"price":%d,"exactPrice":%b}}""" % (quantity, price, b"true" if exactPrice else b"false")
+
+        start = perf_counter()
+        try:
+            return await self.__client.ask(_prepared_order(token, body))
+        except BaseException:
+            self.__errors += 1
+            raise
+        finally:
+            self.__record(perf_counter() - start)
+
+    def __record(self, t):
+        if len(self.__samples) < self.__window:
+            self.__samples.append(t)
+        else:
+            self.__samples[self.__next] = t
+            self.__next = (self.__next + 1) % self.__window
+        self.__count += 1
+        self.__total += t
+        if self.__min is None or t < self.__min:
+            self.__min = t
+        if self.__max is None or t > self.__max:
+            self.__max = t
+
+    def stats(self):
+        if self.__count == 0:
+            return TimeToAckStats(count=0, errors=self.__errors, mean=None, min=None, max=None, p50=None, p90=None, p99=None)
+        s = sorted(self.__samples)
+        n = len(s) - 1
+        return TimeToAckStats(count=self.__count, errors=self.__errors, mean=self.__total / self.__count, min=self.__min, max=self.__max, p50=s[round(n * 0.5)], p90=s[round(n * 0.9)], p99=s[round(n * 0.99)])
+
+    def reset_stats(self):
+        self.__samples = array("d")
+        self.__next = 0
+        self.__count = 0
+        self.__errors = 0
+        self.__total = 0.0
+        self.__min = None
+        self.__max = None
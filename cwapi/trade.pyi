@@ -0,0 +1,51 @@
+from typing import NoReturn, Optional, final
+
+from . import AsyncChatWarsApiClient
+from .responses import WantToBuyResponse
+
+
+@final
+class TimeToAckStats:
+    @property
+    def count(self) -> int: ...
+
+    @property
+    def errors(self) -> int: ...
+
+    # all times in seconds, None if there were no orders; percentiles are calculated over last `window` orders
+    @property
+    def mean(self) -> Optional[float]: ...
+
+    @property
+    def min(self) -> Optional[float]: ...
+
+    @property
+    def max(self) -> Optional[float]: ...
+
+    @property
+    def p50(self) -> Optional[float]: ...
+
+    @property
+    def p90(self) -> Optional[float]: ...
+
+    @property
+    def p99(self) -> Optional[float]: ...
+
+
+@final
+class TradePipeline:
+    @property
+    def client(self) -> AsyncChatWarsApiClient: ...
+
+    def __new__(cls, client: AsyncChatWarsApiClient, *, window: int = 1024) -> TradePipeline: ...
+
+    # caches serialized part of order body, called automatically on first order
+    def prepare(self, token: str, itemCode: str, /) -> bytes: ...
+
+    def forget(self, token: str, itemCode: str = None, /) -> NoReturn: ...
+
+    async def buy(self, token: str, itemCode: str, quantity: int, price: int, exactPrice: bool = False, /) -> WantToBuyResponse: ...
+
+    def stats(self) -> TimeToAckStats: ...
+
+    def reset_stats(self) -> NoReturn: ...
@@ -1,6 +1,7 @@
 from enum import Enum, Flag
+from sys import intern
 
-from cwapi._utils import _dataclass_creator, _optional, _slot_wrapper, encode_string
+from cwapi._utils import _check_slots, _dataclass_creator, _enum_decoder, _flyweight_cache, _frozen_types, _optional, _restore, _slot_wrapper, _validation, _validation_state, encode_string
 
 __all__ = ()
 
@@ -30,6 +31,15 @@ class Class(Enum):
         self._value_ = icon
         return self
 
+    @classmethod
+    def _unknown_member(cls, icon):
+        self = object.__new__(cls)
+        self.__icon = icon
+        self.__name = "unknown"
+        self._value_ = icon
+        self._name_ = "Unknown"
+        return self
+
     @property
     def icon(self):
         return self.__icon
@@ -61,6 +71,15 @@ class Castle(Enum):
         self._value_ = icon
         return self
 
+    @classmethod
+    def _unknown_member(cls, icon):
+        self = object.__new__(cls)
+        self.__icon = icon
+        self.__name = "unknown"
+        self._value_ = icon
+        self._name_ = "Unknown"
+        return self
+
     @property
     def icon(self):
         return self.__icon
@@ -188,32 +207,91 @@ class GearSlot(str, Enum):
     Ring = "ring"
 
 
+_GEAR_SLOTS = tuple(GearSlot.__members__.values())
+_GEAR_SLOT_ORDINALS = {s: i for i, s in enumerate(_GEAR_SLOTS)}
+
+
+def _gear_slot_ordinal(s):
+    try:
+        return _GEAR_SLOT_ORDINALS[s]
+    except KeyError:
+        raise ValueError(f"{s !r} is not a valid {GearSlot.__qualname__}") from None
+
+
 class GearSet:
-    __slots__ = "__dct"
+    __slots__ = "__gear"
 
     def __new__(cls, **kwargs):
         self = super().__new__(cls)
-        self.__dct = {s: None for s in GearSlot.__members__.values()}
-        for s, v in kwargs.items():
-            self[GearSlot(s)] = v
+        self.__gear = [None] * len(_GEAR_SLOTS)
+        if _validation_state.sections and _validation.trusted:
+            for s, v in kwargs.items():
+                self.__gear[_gear_slot_ordinal(s)] = v
+        else:
+            for s, v in kwargs.items():
+                self[s] = v
         return self
 
     def __getitem__(self, s):
-        return self.__dct[GearSlot(s)]
+        return self.__gear[_gear_slot_ordinal(s)]
 
     def __setitem__(self, s, v):
-        if type(v) is not Gear:
+        if type(v) is not Gear and type(v) is not _frozen_types.get(Gear, None):
             raise TypeError(f"GearsSet can be filled only by {Gear.__qualname__ !r} objects, got {type(v).__qualname__ !r}")
-        self.__dct[GearSlot(s)] = v
+        self.__gear[_gear_slot_ordinal(s)] = v
 
     def __delitem__(self, s):
-        self.__dct[GearSlot(s)] = None
+        self.__gear[_gear_slot_ordinal(s)] = None
 
     def __iter__(self):
-        return iter(self.__dct.items())
+        return zip(_GEAR_SLOTS, self.__gear)
 
     def __contains__(self, s):
-        return GearSlot(s) in self.__dct
+        return self.__gear[_gear_slot_ordinal(s)] is not None
+
+    def occupied(self):
+        return ((s, g) for s, g in zip(_GEAR_SLOTS, self.__gear) if g is not None)
+
+    def view(self):
+        v = object.__new__(GearSet)
+        v.__gear = self.__gear
+        return v
+
+    def __reduce__(self):
+        return _restore, (type(self), {s.value: g for s, g in self.occupied()})
+
+    def __copy__(self):
+        c = object.__new__(type(self))
+        c.__gear = self.__gear.copy()
+        return c
+
+
+class _gear_slot_property:
+    __slots__ = "__index", "__name"
+
+    def __new__(cls, index, name):
+        self = super().__new__(cls)
+        self.__index = index
+        self.__name = name
+        return self
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._GearSet__gear[self.__index]
+
+    def __set__(self, instance, value):
+        if type(value) is not Gear and type(value) is not _frozen_types.get(Gear, None):
+            raise TypeError(f"property {self.__name !r} must be {Gear.__qualname__ !r}, got {type(value).__qualname__ !r}")
+        instance._GearSet__gear[self.__index] = value
+
+    def __delete__(self, instance):
+        instance._GearSet__gear[self.__index] = None
+
+
+for _i, _s in enumerate(_GEAR_SLOTS):
+    setattr(GearSet, _s.value, _gear_slot_property(_i, _s.value))
+del _i, _s
 
 
 class Recipe(
@@ -232,9 +310,12 @@ class RecipeBook:
     __slots__ = "__dct"
 
     def __new__(cls, *args):
-        if len(args) == 1 and type(args[0]) is not Recipe:
+        if len(args) == 1 and type(args[0]) is not Recipe and type(args[0]) is not _frozen_types.get(Recipe, None):
             args = args[0]
         self = super().__new__(cls)
+        if _validation_state.sections and _validation.trusted:
+            self.__dct = {rec.id: rec for rec in args}
+            return self
         self.__dct = dict()
         for rec in args:
             if rec.id in self:
@@ -253,7 +334,7 @@ class RecipeBook:
     def __setitem__(self, id, rec):
         if type(id) is not str:
             raise TypeError(f"item id must be str, got {type(str).__qualname__ !r}")
-        if type(rec) is not Recipe:
+        if type(rec) is not Recipe and type(rec) is not _frozen_types.get(Recipe, None):
             raise TypeError(f"recipe must be {Recipe.__qualname__ !r}, got {type(rec).__qualname__ !r}")
         self.__dct[id] = rec
 
@@ -270,6 +351,14 @@ class RecipeBook:
     def __len__(self):
         return len(self.__dct)
 
+    def __reduce__(self):
+        return type(self), (tuple(self.__dct.values()),)
+
+    def __copy__(self):
+        c = object.__new__(type(self))
+        c.__dct = self.__dct.copy()
+        return c
+
 
 class QuantityRange:
     __slots__ = "__start", "__end"
@@ -335,6 +424,15 @@ class QuantityRange:
             raise TypeError("check for identity allowed only with other ranges")
         return self.__start == other.__start and self.__end == other.__end
 
+    def __reduce__(self):
+        return QuantityRange, (self.__start, self.__end)
+
+    def __copy__(self):
+        c = object.__new__(QuantityRange)
+        c.__start = self.__start
+        c.__end = self.__end
+        return c
+
 
 class StockCell:
     __slots__ = "code", "name", "__quantity"
@@ -351,14 +449,31 @@ class StockCell:
 
     def __new__(cls, code, name, quantity):
         self = super().__new__(cls)
+        if _validation_state.sections and _validation.trusted:
+            _stock_cell_code.__set__(self, code)
+            _stock_cell_name.__set__(self, name)
+            self.__quantity = quantity
+            return self
         self.code = code
         self.name = name
         self.quantity = quantity
         return self
 
+    def __reduce__(self):
+        return _restore, (type(self), {"code": _stock_cell_code.__get__(self), "name": _stock_cell_name.__get__(self), "quantity": self.__quantity})
 
-StockCell.code = _slot_wrapper(StockCell.code, str, "code")
-StockCell.name = _slot_wrapper(StockCell.name, str, "name")
+    def __copy__(self):
+        c = object.__new__(type(self))
+        _stock_cell_code.__set__(c, _stock_cell_code.__get__(self))
+        _stock_cell_name.__set__(c, _stock_cell_name.__get__(self))
+        c.__quantity = self.__quantity
+        return c
+
+
+_stock_cell_code = StockCell.code
+_stock_cell_name = StockCell.name
+StockCell.code = _slot_wrapper(_stock_cell_code, str, "code")
+StockCell.name = _slot_wrapper(_stock_cell_name, str, "name")
 
 
 class Stock:
@@ -368,6 +483,9 @@ class Stock:
         if len(args) == 1 and type(args[0]) is not StockCell:
             args = args[0]
         self = super().__new__(cls)
+        if _validation_state.sections and _validation.trusted:
+            self.__dct = {cell.code: cell for cell in args}
+            return self
         self.__dct = dict()
         for cell in args:
             if cell.code in self:
@@ -379,11 +497,14 @@ class Stock:
     def compiler(n2q, c2n, /):
         n2c = dict()
         for c, n in c2n.items():
+            c = intern(c)
+            n = intern(n)
             if n in n2c:
                 n2c[n].append(c)
             else:
                 n2c[n] = [c]
         for n, q in n2q.items():
+            n = intern(n)
             cc = n2c[n]
             lcc = len(cc)
             if lcc == 1:
@@ -421,6 +542,14 @@ class Stock:
     def __iter__(self):
         return iter(self.__dct.values())
 
+    def __reduce__(self):
+        return type(self), (tuple(self.__dct.values()),)
+
+    def __copy__(self):
+        c = object.__new__(type(self))
+        c.__dct = self.__dct.copy()
+        return c
+
 
 class _GuildStock(Stock):
     __slots__ = "size", "limit"
@@ -436,6 +565,15 @@ class _GuildStock(Stock):
         self.limit = _limit
         return self
 
+    def __reduce__(self):
+        return type(self), (tuple(self), self.size, self.limit)
+
+    def __copy__(self):
+        c = super().__copy__()
+        c.size = self.size
+        c.limit = self.limit
+        return c
+
 
 _GuildStock.size = _slot_wrapper(_GuildStock.size, int, "size")
 _GuildStock.limit = _slot_wrapper(_GuildStock.limit, int, "limit")
@@ -445,6 +583,10 @@ class GuildRolesSet:
     __slots__ = "__fzs"
 
     def __new__(cls, *args):
+        if _validation_state.sections and _validation.trusted:
+            self = super().__new__(cls)
+            self.__fzs = frozenset(args) - {GuildRole.NoRole}
+            return self
         s = set()
         for a in args:
             if type(a) is GuildRolesSet:
@@ -460,6 +602,16 @@ class GuildRolesSet:
     def __or__(self, other):
         return GuildRolesSet(self, other)
 
+    def __reduce__(self):
+        return GuildRolesSet, tuple(self.__fzs)
+
+    # set is immutable, so copies can be shared
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __and__(self, other):
         return other in self
 
@@ -487,3 +639,41 @@ class GuildRole(Flag):
 
     def __or__(self, other):
         return GuildRolesSet(self, other)
+
+
+for _c in (GearSet, RecipeBook, QuantityRange, StockCell, Stock, _GuildStock, GuildRolesSet):
+    _check_slots(_c)
+del _c
+
+
+def set_unknown_values_fallback(enabled, /):
+    if type(enabled) is not bool:
+        raise TypeError("flag must be bool")
+    _enum_decoder.fallback = enabled
+
+
+def set_flyweight_cache(maxsize, /):
+    if maxsize is None:
+        _flyweight_cache.current = None
+        return
+    if type(maxsize) is not int:
+        raise TypeError("cache size must be int or None")
+    if maxsize < 1:
+        raise ValueError("cache size must be positive")
+    _flyweight_cache.current = _flyweight_cache(maxsize)
+
+
+def set_trusted_parsing(enabled, /):
+    if type(enabled) is not bool:
+        raise TypeError("flag must be bool")
+    _validation_state.parse_trusted = enabled
+
+
+_decode_operation = _enum_decoder(Operation)
+_decode_class = _enum_decoder(Class)
+_decode_castle = _enum_decoder(Castle)
+_decode_status = _enum_decoder(Status)
+_decode_action = _enum_decoder(Action)
+_decode_condition = _enum_decoder(Condition)
+_decode_quality = _enum_decoder(Quality)
+_decode_guild_role = _enum_decoder(GuildRole)
@@ -226,8 +226,27 @@ class GearSet:
 
     def __iter__(self) -> Iterator[Tuple[GearSlot, Optional[Gear]]]: ...
 
+    # slot is occupied
     def __contains__(self, s: Union[GearSlot, str]) -> bool: ...
 
+    def occupied(self) -> Iterator[Tuple[GearSlot, Gear]]: ...
+
+    # shares slots with original set, changes are visible in both
+    def view(self) -> GearSet: ...
+
+    weapon: Optional[Gear]
+    offhand: Optional[Gear]
+
+    head: Optional[Gear]
+    body: Optional[Gear]
+    hands: Optional[Gear]
+    feet: Optional[Gear]
+
+    coat: Optional[Gear]
+
+    amulet: Optional[Gear]
+    ring: Optional[Gear]
+
 
 @final
 class Recipe:
@@ -391,3 +410,14 @@ class GuildRole(Flag):
     Treasurer: ClassVar[GuildRole] = "Treasurer"
 
     def __or__(self, other: Union[GuildRole, GuildRolesSet]) -> GuildRolesSet: ...
+
+
+def set_unknown_values_fallback(enabled: bool, /) -> NoReturn: ...
+
+
+# parser reuses equal Guild, SecondaryClass, Gear and Recipe objects (up to maxsize most recently used);
+# shared objects are read-only (AttributeError on assignment), copy.copy returns modifiable object
+def set_flyweight_cache(maxsize: Optional[int], /) -> NoReturn: ...
+
+
+def set_trusted_parsing(enabled: bool, /) -> NoReturn: ...
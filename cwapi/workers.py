@@ -0,0 +1,468 @@
+import re
+from collections import deque
+from os import cpu_count
+from pickle import dumps, loads
+from struct import Struct
+from warnings import warn
+
+from .feeds import Feed, parse_feed
+
+__all__ = ("FeedWorkerPool",)
+
+# frames sent to worker: tag byte and payload
+_DATA = b"D"
+_CALL = b"C"
+_QUIT = b"Q"
+# messages sent back: (tag, payload)
+_RESULTS = 0
+_ERROR = 1
+_RETURN = 2
+_RAISE = 3
+# positions of failed bodies, sent after every data frame
+_DONE = 4
+_LOST = 5
+
+_LENGTH = Struct(">I")
+
+# item code is taken from raw body, so routing doesn't need parsing in consuming process
+_ITEM_FIELD = re.compile(rb'"item"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _item_key(body):
+    m = _ITEM_FIELD.search(body)
+    return None if m is None else m.group(1)
+
+
+_DEFAULT_KEYS = {
+    Feed.Deals: _item_key,
+    Feed.Offers: _item_key,
+}
+
+
+def _identity(event):
+    return event
+
+
+def _barrier(handler):
+    return None
+
+
+def _send(conn, tag, payload):
+    try:
+        conn.send((tag, payload))
+    except Exception as e:
+        # result or exception of handler can't be pickled; it's replaced by error, so worker keeps running
+        if tag == _RESULTS and len(payload) > 1:
+            for r in payload:
+                _send(conn, _RESULTS, [r])
+            return
+        what = "exception" if tag == _ERROR or tag == _RAISE else "result"
+        conn.send((_RAISE if tag == _RETURN or tag == _RAISE else _ERROR, TypeError(f"{what} of handler can't be sent to consuming process: {e !r}")))
+
+
+def _worker_main(conn, feed, handler, trusted):
+    while True:
+        try:
+            frame = conn.recv_bytes()
+        except EOFError:
+            return
+        tag = frame[:1]
+        if tag == _QUIT:
+            return
+        if tag == _CALL:
+            try:
+                r = loads(frame[1:])(handler)
+            except Exception as e:
+                _send(conn, _RAISE, e)
+            else:
+                _send(conn, _RETURN, r)
+            continue
+
+        results = []
+        failed = []
+        i = 0
+        pos = 1
+        end = len(frame)
+        while pos < end:
+            (size,) = _LENGTH.unpack_from(frame, pos)
+            pos += _LENGTH.size
+            body = frame[pos:pos + size]
+            pos += size
+            i += 1
+            try:
+                r = handler(parse_feed(feed, body, trusted))
+            except Exception as e:
+                # results of previous bodies are sent first, so order of batch is kept
+                if results:
+                    _send(conn, _RESULTS, results)
+                    results = []
+                _send(conn, _ERROR, e)
+                failed.append(i - 1)
+                continue
+            if r is not None:
+                results.append(r)
+        if results:
+            _send(conn, _RESULTS, results)
+        _send(conn, _DONE, failed)
+
+
+class FeedWorkerPool:
+    __slots__ = "__feed", "__handler", "__workers", "__key", "__batch_size", "__batch_delay", "__trusted", "__start_method", "__processes", "__conns", "__batches", "__held", "__frames", "__next", "__sender", "__reader", "__results", "__calls", "__loop", "__closing"
+
+    def __new__(cls, feed, handler=None, /, *, workers=None, key=None, batch_size=64, batch_delay=0.05, trusted=None, start_method=None):
+        if type(feed) is not Feed:
+            raise TypeError(f"feed must be {Feed.__qualname__ !r}")
+        if handler is not None and not callable(handler):
+            raise TypeError("handler must be callable")
+        if workers is None:
+            workers = max(1, (cpu_count() or 2) - 1)
+        if type(workers) is not int:
+            raise TypeError("workers count must be int")
+        if workers < 1:
+            raise ValueError("workers count must be positive")
+        if key is not None and not callable(key):
+            raise TypeError("key must be callable")
+        if type(batch_size) is not int:
+            raise TypeError("batch size must be int")
+        if batch_size < 1:
+            raise ValueError("batch size must be positive")
+        if type(batch_delay) is not int and type(batch_delay) is not float:
+            raise TypeError("batch delay must be int or float")
+        if batch_delay <= 0:
+            raise ValueError("batch delay must be positive")
+        if trusted is not None and type(trusted) is not bool:
+            raise TypeError("trusted parsing flag must be bool or None")
+        if start_method is not None and type(start_method) is not str:
+            raise TypeError("start method must be str")
+
+        self = super().__new__(cls)
+        self.__feed = feed
+        self.__handler = _identity if handler is None else handler
+        self.__workers = workers
+        self.__key = _DEFAULT_KEYS.get(feed, None) if key is None else key
+        self.__batch_size = batch_size
+        self.__batch_delay = batch_delay
+        self.__trusted = trusted
+        self.__start_method = start_method
+        self.__processes = None
+        self.__conns = None
+        self.__batches = None
+        self.__held = None
+        self.__frames = None
+        self.__next = 0
+        self.__sender = None
+        self.__reader = None
+        self.__results = None
+        self.__calls = None
+        self.__loop = None
+        self.__closing = False
+        return self
+
+    @property
+    def feed(self):
+        return self.__feed
+
+    @property
+    def workers(self):
+        return self.__workers
+
+    def is_started(self):
+        return self.__processes is not None
+
+    async def start(self):
+        from asyncio import Queue, get_running_loop
+        from concurrent.futures import ThreadPoolExecutor
+        from multiprocessing import get_context
+        from threading import Thread
+
+        if self.__processes is not None:
+            raise RuntimeError("pool already started")
+
+        context = get_context(self.__start_method)
+        self.__loop = get_running_loop()
+        self.__closing = False
+        self.__results = Queue()
+        self.__calls = [deque() for _ in range(self.__workers)]
+        self.__batches = [[] for _ in range(self.__workers)]
+        # messages of bodies in batch and of frames sent to worker (None for bodies without message), settled by consume
+        self.__held = [[] for _ in range(self.__workers)]
+        self.__frames = [deque() for _ in range(self.__workers)]
+        self.__processes = []
+        self.__conns = []
+        for i in range(self.__workers):
+            parent, child = context.Pipe()
+            p = context.Process(target=_worker_main, args=(child, self.__feed, self.__handler, self.__trusted), name=f"cwapi feed worker {i}", daemon=True)
+            p.start()
+            child.close()
+            self.__processes.append(p)
+            self.__conns.append(parent)
+
+        # writes to pipes block when worker is behind, so they are done by one thread (keeping order of frames)
+        self.__sender = ThreadPoolExecutor(1, thread_name_prefix="cwapi feed sender")
+        self.__reader = Thread(target=self.__read, args=(list(enumerate(self.__conns)),), name="cwapi feed reader", daemon=True)
+        self.__reader.start()
+
+    def __read(self, conns):
+        from multiprocessing.connection import wait
+
+        index = {id(c): i for i, c in conns}
+        conns = [c for _, c in conns]
+        while conns:
+            for c in wait(conns):
+                try:
+                    message = c.recv()
+                except (EOFError, OSError):
+                    conns.remove(c)
+                    self.__loop.call_soon_threadsafe(self.__lost, index[id(c)])
+                    continue
+                self.__loop.call_soon_threadsafe(self.__dispatch, index[id(c)], message)
+
+    def __lost(self, worker):
+        # worker exited not by close(): its calls won't be answered and its bodies won't be handled
+        if self.__closing:
+            return
+        e = ConnectionError(f"feed worker {worker} exited")
+        calls = self.__calls[worker]
+        self.__calls[worker] = None
+        while calls:
+            fut = calls.popleft()
+            if not fut.done():
+                fut.set_exception(e)
+        self.__results.put_nowait((_LOST, e))
+
+    def __dispatch(self, worker, message):
+        tag, payload = message
+        if tag == _RESULTS or tag == _ERROR:
+            self.__results.put_nowait(message)
+            return
+        if tag == _DONE:
+            frame = self.__frames[worker].popleft()
+            if frame is not None:
+                self.__results.put_nowait((_DONE, (frame, payload)))
+            return
+        fut = self.__calls[worker].popleft()
+        if fut.done():
+            return
+        if tag == _RETURN:
+            fut.set_result(payload)
+        else:
+            fut.set_exception(payload)
+
+    def __route(self, body):
+        if self.__key is not None:
+            k = self.__key(body)
+            if k is not None:
+                return hash(k) % self.__workers
+        i = self.__next
+        self.__next = (i + 1) % self.__workers
+        return i
+
+    async def __send(self, worker, frame):
+        await self.__loop.run_in_executor(self.__sender, self.__conns[worker].send_bytes, frame)
+
+    async def __flush(self, worker):
+        batch = self.__batches[worker]
+        if not batch:
+            return
+        if self.__calls[worker] is None:
+            # messages of batch stay held, they are returned to broker by consume
+            raise ConnectionError(f"feed worker {worker} exited")
+        held = self.__held[worker]
+        self.__batches[worker] = []
+        self.__held[worker] = []
+        self.__frames[worker].append(held if any(m is not None for m in held) else None)
+        await self.__send(worker, b"".join([_DATA, *batch]))
+
+    async def __submit(self, body, message):
+        worker = self.__route(body)
+        batch = self.__batches[worker]
+        # length and body
+        batch.append(_LENGTH.pack(len(body)))
+        batch.append(body)
+        self.__held[worker].append(message)
+        if len(batch) >= 2 * self.__batch_size:
+            await self.__flush(worker)
+
+    async def submit(self, body, /):
+        if self.__processes is None:
+            raise RuntimeError("pool not started")
+        await self.__submit(body, None)
+
+    async def flush(self):
+        for worker in range(self.__workers):
+            await self.__flush(worker)
+
+    async def __pump(self, client):
+        # messages are acknowledged when worker has handled them, so prefetch_count throttles broker
+        async for message in client._listen_messages(self.__feed):
+            try:
+                await self.__submit(message.body, message)
+            except OSError:
+                # worker exited, consume raises when reader reports it (after results already sent);
+                # until then feed isn't read, held messages are requeued
+                await self.__loop.create_future()
+
+    async def __ticker(self):
+        from asyncio import sleep
+
+        # partial batches are sent even if feed is quiet
+        while True:
+            await sleep(self.__batch_delay)
+            try:
+                await self.flush()
+            except OSError:
+                # worker exited, it's reported by reader
+                return
+
+    async def results(self):
+        if self.__processes is None:
+            raise RuntimeError("pool not started")
+        while True:
+            tag, payload = await self.__results.get()
+            if tag == _DONE:
+                continue
+            if tag != _RESULTS:
+                raise payload
+            for r in payload:
+                yield r
+
+    async def __settle(self, frame, failed):
+        for i, message in enumerate(frame):
+            if message is None:
+                continue
+            # event which handler failed on would fail again, so it isn't requeued
+            if i in failed:
+                await message.reject()
+            else:
+                await message.ack()
+
+    async def __requeue_lost(self):
+        # bodies sent to exited worker won't be handled, their messages are redelivered by broker
+        for worker, calls in enumerate(self.__calls):
+            if calls is not None:
+                continue
+            frames = self.__frames[worker]
+            frames.append(self.__held[worker])
+            self.__held[worker] = []
+            self.__batches[worker] = []
+            while frames:
+                frame = frames.popleft()
+                for message in frame or ():
+                    if message is not None:
+                        await message.reject(requeue=True)
+
+    async def consume(self, client, /):
+        from asyncio import FIRST_COMPLETED, ensure_future, wait
+
+        if self.__processes is None:
+            raise RuntimeError("pool not started")
+        pump = ensure_future(self.__pump(client))
+        ticker = ensure_future(self.__ticker())
+        drained = False
+        try:
+            while True:
+                if not self.__results.empty():
+                    tag, payload = self.__results.get_nowait()
+                elif drained:
+                    return
+                elif pump is None:
+                    # worker exited while feed was drained, its loss is still to be reported
+                    tag, payload = await self.__results.get()
+                else:
+                    get = ensure_future(self.__results.get())
+                    await wait((get, pump), return_when=FIRST_COMPLETED)
+                    if not get.done():
+                        # feed consumer failed or was stopped by broker; bodies already sent to workers are still processed
+                        get.cancel()
+                        pump, p = None, pump
+                        p.result()
+                        try:
+                            await self.flush()
+                            # replies of each worker are ordered, so all results are dispatched when barrier returns
+                            await self.gather(_barrier)
+                        except ConnectionError:
+                            # worker exited, it's reported in results after what it has sent
+                            pass
+                        else:
+                            drained = True
+                        continue
+                    tag, payload = get.result()
+                if tag == _DONE:
+                    await self.__settle(*payload)
+                    continue
+                if tag == _ERROR:
+                    # message of failed event is rejected, consuming goes on
+                    warn(Warning(f"feed handler failed: {payload !r}"))
+                    continue
+                if tag == _LOST:
+                    raise payload
+                for r in payload:
+                    yield r
+        finally:
+            if pump is not None:
+                pump.cancel()
+            ticker.cancel()
+            if self.__processes is not None:
+                await self.__requeue_lost()
+
+    async def gather(self, func, /):
+        from asyncio import gather
+
+        if self.__processes is None:
+            raise RuntimeError("pool not started")
+        for worker, calls in enumerate(self.__calls):
+            if calls is None:
+                raise ConnectionError(f"feed worker {worker} exited")
+        await self.flush()
+        frame = _CALL + dumps(func)
+        futures = []
+        for worker in range(self.__workers):
+            fut = self.__loop.create_future()
+            futures.append(fut)
+            calls = self.__calls[worker]
+            if calls is None:
+                fut.set_exception(ConnectionError(f"feed worker {worker} exited"))
+                continue
+            calls.append(fut)
+            try:
+                await self.__send(worker, frame)
+            except OSError:
+                # worker exited, call is failed by reader
+                pass
+        return await gather(*futures)
+
+    async def close(self):
+        if self.__processes is None:
+            return
+        self.__closing = True
+        for worker in range(self.__workers):
+            try:
+                await self.__flush(worker)
+                await self.__send(worker, _QUIT)
+            except OSError:
+                # worker already exited
+                pass
+        processes, self.__processes = self.__processes, None
+        for p in processes:
+            await self.__loop.run_in_executor(self.__sender, p.join)
+        await self.__loop.run_in_executor(self.__sender, self.__reader.join)
+        self.__sender.shutdown()
+        for c in self.__conns:
+            c.close()
+        for calls in self.__calls:
+            while calls:
+                fut = calls.popleft()
+                if not fut.done():
+                    fut.set_exception(ConnectionError("pool closed"))
+        self.__conns = None
+        self.__sender = None
+        self.__reader = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
@@ -0,0 +1,55 @@
+from typing import Any, AsyncIterator, Callable, Generic, Hashable, List, Literal, NoReturn, Optional, TypeVar, Union, final, overload
+
+from . import AsyncChatWarsApiClient
+from .feeds import Feed
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+@final
+class FeedWorkerPool(Generic[_R]):
+    # events are parsed and passed to handler in worker processes, handler must be picklable with "spawn"/"forkserver" start methods;
+    # results (except None) and handler errors are returned to consuming process
+    # (results and errors that can't be pickled are replaced by TypeError)
+    #
+    # bodies with same key are handled by same worker in receiving order;
+    # for deals and offers default key is item code, bodies without key are distributed round-robin
+    @overload
+    def __new__(cls, feed: Feed, /, *, workers: Optional[int] = None, key: Optional[Callable[[bytes], Optional[Hashable]]] = None, batch_size: int = 64, batch_delay: Union[int, float] = 0.05, trusted: Optional[bool] = None, start_method: Optional[Literal["fork", "spawn", "forkserver"]] = None) -> FeedWorkerPool[Any]: ...
+
+    @overload
+    def __new__(cls, feed: Feed, handler: Callable[[Any], Optional[_R]], /, *, workers: Optional[int] = None, key: Optional[Callable[[bytes], Optional[Hashable]]] = None, batch_size: int = 64, batch_delay: Union[int, float] = 0.05, trusted: Optional[bool] = None, start_method: Optional[Literal["fork", "spawn", "forkserver"]] = None) -> FeedWorkerPool[_R]: ...
+
+    @property
+    def feed(self) -> Feed: ...
+
+    # by default number of CPUs without one (for consuming process)
+    @property
+    def workers(self) -> int: ...
+
+    def is_started(self) -> bool: ...
+
+    async def start(self) -> NoReturn: ...
+
+    # body is sent when batch of its worker is full (or by flush)
+    async def submit(self, body: bytes, /) -> NoReturn: ...
+
+    async def flush(self) -> NoReturn: ...
+
+    async def results(self) -> AsyncIterator[_R]: ...
+
+    # reads feed of client and yields results; partial batches are sent every batch_delay seconds;
+    # message is acknowledged after worker has handled its event, or rejected (with warning) if handler raised;
+    # if worker process dies, messages sent to it are requeued (and results, consume and gather raise ConnectionError)
+    def consume(self, client: AsyncChatWarsApiClient, /) -> AsyncIterator[_R]: ...
+
+    # calls func(handler) in every worker (after already submitted bodies), e.g. to collect state of stateful handlers
+    async def gather(self, func: Callable[[Callable[[Any], Optional[_R]]], _T], /) -> List[_T]: ...
+
+    # submitted bodies are processed before workers exit
+    async def close(self) -> NoReturn: ...
+
+    async def __aenter__(self) -> FeedWorkerPool[_R]: ...
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> Literal[False]: ...
@@ -13,6 +13,9 @@ setup(
         "pika",
         "aio-pika",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     package_data={
         "cwapi": ["py.typed", "*.pyi"],
     },
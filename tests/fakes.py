@@ -0,0 +1,218 @@
+import asyncio
+import json
+
+
+def reply(action, payload, result="Ok"):
+    return json.dumps({"action": action, "result": result, "payload": payload}).encode()
+
+
+class FakeMessage:
+    __slots__ = "body", "delivery_tag", "state", "queue"
+
+    tag = 0
+
+    def __init__(self, body, queue=None):
+        FakeMessage.tag += 1
+        self.body = body
+        self.delivery_tag = FakeMessage.tag
+        self.state = None
+        self.queue = queue
+
+    @property
+    def processed(self):
+        # like in aio_pika, messages covered by ack with multiple=True of other message aren't marked
+        return self.state is not None
+
+    async def ack(self, multiple=False):
+        self.__settle("ack", multiple)
+
+    async def reject(self, requeue=False):
+        self.__settle("requeue" if requeue else "reject", False)
+
+    def __settle(self, state, multiple):
+        if self.state is not None:
+            raise RuntimeError("message already processed")
+        self.state = state
+        if self.queue is not None:
+            self.queue.settle(self.delivery_tag, state, multiple)
+
+    def process(self):
+        message = self
+
+        class _process:
+            async def __aenter__(self):
+                return message
+
+            async def __aexit__(self, exc_type, exc_val, exc_tb):
+                if exc_type is None:
+                    await message.ack()
+                else:
+                    await message.reject()
+                return False
+
+        return _process()
+
+
+class FakeQueue:
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.delivered = []
+        # state of delivery tags as seen by broker and acks as sent: (delivery tag, multiple)
+        self.settled = {}
+        self.acks = []
+
+    def settle(self, tag, state, multiple):
+        if state == "ack":
+            self.acks.append((tag, multiple))
+        if tag in self.settled:
+            # broker closes channel on unknown delivery tag
+            raise ConnectionError(f"PRECONDITION_FAILED - unknown delivery tag {tag}")
+        if multiple:
+            for m in self.delivered:
+                if m.delivery_tag <= tag:
+                    self.settled.setdefault(m.delivery_tag, state)
+        else:
+            self.settled[tag] = state
+
+    def put(self, body):
+        message = FakeMessage(body, self)
+        self.delivered.append(message)
+        self.queue.put_nowait(message)
+        return message
+
+    def end(self):
+        # consumer cancelled by broker
+        self.queue.put_nowait(None)
+
+    def iterator(self):
+        queue = self.queue
+
+        class _iterator:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, exc_type, exc_val, exc_tb):
+                return False
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                message = await queue.get()
+                if message is None:
+                    raise StopAsyncIteration
+                return message
+
+        return _iterator()
+
+
+class FakeExchange:
+    # responder(body) returns list of (delay, reply body)
+    def __init__(self, queue, responder):
+        self.queue = queue
+        self.responder = responder
+        self.published = []
+
+    async def publish(self, body, routing_key):
+        self.published.append(body)
+        for delay, r in self.responder(body):
+            asyncio.get_running_loop().call_later(delay, self.queue.put, r)
+
+
+class FakeChannel:
+    def __init__(self, queues):
+        self.queues = queues
+        self.closed = False
+
+    async def get_queue(self, name):
+        return self.queues[name]
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def attach(client, responder=lambda body: (), feeds=None):
+    # client is connected to fake broker (native transport mode, bodies are published as bytes)
+    loop = asyncio.get_running_loop()
+    queue = FakeQueue()
+    exchange = FakeExchange(queue, responder)
+    client._ChatWarsApiClient__running_loop = loop
+    client._ChatWarsApiClient__message_class = None
+    client._ChatWarsApiClient__input_queue = queue
+    client._ChatWarsApiClient__output_exchange = exchange
+    client._ChatWarsApiClient__channel = FakeChannel(feeds or {})
+    client._ChatWarsApiClient__connection = FakeConnection()
+    client._ChatWarsApiClient__reader = loop.create_task(client._ChatWarsApiClient__read())
+    return queue, exchange
+
+
+class FakeBlockingChannel:
+    # subset of pika BlockingChannel used by sync client
+    def __init__(self, connection):
+        self.connection = connection
+        self.is_open = True
+        self.consumer = None
+        self.acked = []
+        self.rejected = []
+
+    def basic_qos(self, prefetch_size=0, prefetch_count=0):
+        pass
+
+    def queue_purge(self, queue):
+        pass
+
+    def basic_consume(self, queue, on_message_callback):
+        self.consumer = on_message_callback
+
+    def basic_ack(self, delivery_tag):
+        self.acked.append(delivery_tag)
+
+    def basic_reject(self, delivery_tag, requeue=True):
+        self.rejected.append(delivery_tag)
+
+    def close(self):
+        self.is_open = False
+
+
+class FakeBlockingConnection:
+    # deliveries put by test are dispatched only by process_data_events(), like in pika
+    def __init__(self, heartbeat=0):
+        import types
+        from collections import deque
+
+        self._impl = types.SimpleNamespace(params=types.SimpleNamespace(heartbeat=heartbeat))
+        self.is_open = True
+        self.channels = []
+        self.pending = deque()
+        self.polls = 0
+
+    def channel(self):
+        ch = FakeBlockingChannel(self)
+        self.channels.append(ch)
+        return ch
+
+    def deliver(self, body):
+        self.pending.append(body)
+
+    def process_data_events(self, time_limit=0):
+        assert time_limit == 0, "connection must not be blocked while mutex is held"
+        import types
+
+        self.polls += 1
+        while self.pending:
+            body = self.pending.popleft()
+            FakeMessage.tag += 1
+            for ch in self.channels:
+                if ch.consumer is not None and ch.is_open:
+                    ch.consumer(ch, types.SimpleNamespace(delivery_tag=FakeMessage.tag), None, body)
+
+    def close(self):
+        self.is_open = False
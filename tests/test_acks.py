@@ -0,0 +1,194 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.requests import GetInfoRequest
+from cwapi.responses import ForbiddenError, GetInfoResponse
+
+from .fakes import attach, reply
+
+
+def info(balance):
+    return reply("getInfo", {"balance": balance})
+
+
+# reply which passes matching, but fails in parsing
+BROKEN = reply("getInfo", {})
+FORBIDDEN = reply("getInfo", {"userId": 1, "requiredOperation": "GetUserProfile"}, result="Forbidden")
+
+
+def answers(*replies):
+    # replies are delivered in order of requests
+    it = iter(replies)
+    return lambda body: [(0.0, next(it))]
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def client(**kwargs):
+    return AsyncChatWarsApiClient(Server.CW3, "instance", "password", **kwargs)
+
+
+def tags(queue):
+    return [m.delivery_tag for m in queue.delivered]
+
+
+class BatchedAckTest(unittest.TestCase):
+    def assertSettled(self, queue, states):
+        # every delivered message is settled exactly once (fake broker raises on second settlement)
+        self.assertEqual([queue.settled.get(t) for t in tags(queue)], states)
+
+    def test_flush_on_count(self):
+        async def main():
+            c = client(ack_batch_count=3)
+            queue, _ = attach(c, answers(info(1), info(2), info(3), info(4)))
+            for _ in range(2):
+                await c.ask(GetInfoRequest())
+            before = list(queue.acks)
+            await c.ask(GetInfoRequest())
+            after = list(queue.acks)
+            await c.ask(GetInfoRequest())
+            return queue, before, after
+
+        queue, before, after = run(main())
+        self.assertEqual(before, [])
+        self.assertEqual(after, [(tags(queue)[2], True)])
+        # fourth message waits for next batch
+        self.assertEqual(queue.acks, after)
+        self.assertSettled(queue, ["ack", "ack", "ack", None])
+
+    def test_flush_on_timeout(self):
+        async def main():
+            c = client(ack_batch_delay=0.05)
+            queue, _ = attach(c, answers(info(1), info(2)))
+            await asyncio.gather(c.ask(GetInfoRequest()), c.ask(GetInfoRequest()))
+            before = list(queue.acks)
+            await asyncio.sleep(0.1)
+            return queue, before
+
+        queue, before = run(main())
+        self.assertEqual(before, [])
+        self.assertEqual(queue.acks, [(tags(queue)[1], True)])
+        self.assertSettled(queue, ["ack", "ack"])
+
+    def test_timer_cancelled_by_count(self):
+        async def main():
+            c = client(ack_batch_count=2, ack_batch_delay=0.05)
+            queue, _ = attach(c, answers(info(1), info(2)))
+            await c.ask(GetInfoRequest())
+            await c.ask(GetInfoRequest())
+            await asyncio.sleep(0.1)
+            return queue
+
+        queue = run(main())
+        self.assertEqual(queue.acks, [(tags(queue)[1], True)])
+
+    def test_flush_on_disconnect(self):
+        async def main():
+            c = client(ack_batch_count=10, ack_batch_delay=10)
+            queue, _ = attach(c, answers(info(1), info(2)))
+            await c.ask(GetInfoRequest())
+            await c.ask(GetInfoRequest())
+            before = list(queue.acks)
+            await c.disconnect()
+            return queue, before, c._ChatWarsApiClient__channel, c._ChatWarsApiClient__connection
+
+        queue, before, channel, connection = run(main())
+        self.assertEqual(before, [])
+        self.assertEqual(queue.acks, [(tags(queue)[1], True)])
+        self.assertTrue(channel.closed)
+        self.assertTrue(connection.closed)
+
+    def test_response_error_is_acked(self):
+        async def main():
+            c = client(ack_batch_count=2)
+            queue, _ = attach(c, answers(FORBIDDEN, info(1)))
+            with self.assertRaises(ForbiddenError):
+                await c.ask(GetInfoRequest())
+            await c.ask(GetInfoRequest())
+            return queue
+
+        queue = run(main())
+        self.assertEqual(queue.acks, [(tags(queue)[1], True)])
+        self.assertSettled(queue, ["ack", "ack"])
+
+    def test_failed_message_is_rejected(self):
+        # pending acks are flushed before rejection, so they don't cover rejected message
+        async def main():
+            c = client(ack_batch_count=10)
+            queue, _ = attach(c, answers(info(1), BROKEN, info(2)))
+            await c.ask(GetInfoRequest())
+            with self.assertRaises(KeyError):
+                await c.ask(GetInfoRequest())
+            await c.ask(GetInfoRequest())
+            await c.disconnect()
+            return queue
+
+        queue = run(main())
+        t = tags(queue)
+        self.assertEqual(queue.acks, [(t[0], True), (t[2], True)])
+        self.assertSettled(queue, ["ack", "reject", "ack"])
+
+    def test_multiple_ack_covers_rejected(self):
+        # rejected message is settled before later ack with multiple=True, broker doesn't ack it again
+        async def main():
+            c = client(ack_batch_count=2)
+            queue, _ = attach(c, answers(BROKEN, info(1), info(2)))
+            res = await asyncio.gather(*(c.ask(GetInfoRequest()) for _ in range(3)), return_exceptions=True)
+            return queue, res
+
+        queue, res = run(main())
+        self.assertIs(type(res[0]), KeyError)
+        self.assertIs(type(res[1]), GetInfoResponse)
+        t = tags(queue)
+        self.assertEqual(queue.acks, [(t[2], True)])
+        self.assertSettled(queue, ["reject", "ack", "ack"])
+
+    def test_failed_message_covered_by_pending_ack(self):
+        # broken reply is parsed in executor and fails after later reply was already counted,
+        # it's acked by pending ack with multiple=True instead of being rejected (and acked) twice
+        broken = reply("getInfo", {"padding": "x" * 256})
+
+        async def main():
+            with ThreadPoolExecutor(1) as executor:
+                c = client(ack_batch_count=2, parse_executor=executor, parse_threshold=len(broken))
+                queue, _ = attach(c, answers(broken, info(1)))
+                res = await asyncio.gather(c.ask(GetInfoRequest()), c.ask(GetInfoRequest()), return_exceptions=True)
+                return queue, res
+
+        queue, res = run(main())
+        self.assertIs(type(res[0]), KeyError)
+        self.assertIs(type(res[1]), GetInfoResponse)
+        t = tags(queue)
+        self.assertEqual(queue.acks, [(t[1], True)])
+        self.assertSettled(queue, ["ack", "ack"])
+        self.assertEqual([m.state for m in queue.delivered], [None, "ack"])
+
+    def test_concurrent_mixed_replies(self):
+        replies = [BROKEN if i % 5 == 3 else FORBIDDEN if i % 7 == 2 else info(i) for i in range(40)]
+
+        async def main():
+            c = client(ack_batch_count=4, ack_batch_delay=0.01)
+            queue, _ = attach(c, answers(*replies))
+            res = await asyncio.gather(*(c.ask(GetInfoRequest()) for _ in replies), return_exceptions=True)
+            await c.disconnect()
+            return queue, res
+
+        queue, res = run(main())
+        self.assertEqual(len(queue.delivered), len(replies))
+        self.assertEqual(sum(type(r) is KeyError for r in res), 8)
+        # every message is settled once, broken ones are never acked
+        for m in queue.delivered:
+            self.assertIn(m.delivery_tag, queue.settled)
+            if m.body == BROKEN:
+                self.assertEqual(queue.settled[m.delivery_tag], "reject")
+            else:
+                self.assertEqual(queue.settled[m.delivery_tag], "ack")
+        self.assertTrue(all(multiple for _, multiple in queue.acks))
+
+
+if __name__ == "__main__":
+    unittest.main()
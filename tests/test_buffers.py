@@ -0,0 +1,130 @@
+import asyncio
+import unittest
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.buffers import BufferPolicy, SubscriptionBuffer
+from cwapi.feeds import Feed
+
+from .fakes import FakeQueue, attach
+from .util import fixture
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+async def client_with_feed(prefetch_count=4):
+    c = AsyncChatWarsApiClient(Server.CW3, "instance", "password", prefetch_count=prefetch_count)
+    feed = FakeQueue()
+    attach(c, feeds={c.feed_queue_name(Feed.Deals): feed})
+    return c, feed
+
+
+class ListenTest(unittest.TestCase):
+    def test_acknowledged_when_next_requested(self):
+        async def main():
+            c, feed = await client_with_feed()
+            messages = [feed.put(fixture("deals.json")) for _ in range(2)]
+            feed.end()
+            states = []
+            async for _ in c.listen(Feed.Deals):
+                states.append([m.state for m in messages])
+            return states, [m.state for m in messages]
+
+        states, final = run(main())
+        self.assertEqual(states, [[None, None], ["ack", None]])
+        self.assertEqual(final, ["ack", "ack"])
+
+    def test_held_message_requeued_on_break(self):
+        async def main():
+            c, feed = await client_with_feed()
+            messages = [feed.put(fixture("deals.json")) for _ in range(2)]
+            events = c.listen(Feed.Deals)
+            await events.__anext__()
+            await events.__anext__()
+            await events.aclose()
+            return [m.state for m in messages]
+
+        self.assertEqual(run(main()), ["ack", "requeue"])
+
+    def test_raw_held_message_requeued_on_break(self):
+        async def main():
+            c, feed = await client_with_feed()
+            message = feed.put(fixture("deals.json"))
+            bodies = c._listen_raw(Feed.Deals)
+            await bodies.__anext__()
+            await bodies.aclose()
+            return message.state
+
+        self.assertEqual(run(main()), "requeue")
+
+
+class BufferedListenTest(unittest.TestCase):
+    def test_block_requires_prefetch(self):
+        async def main():
+            c, feed = await client_with_feed(prefetch_count=0)
+            events = c.listen(Feed.Deals, buffer=SubscriptionBuffer(4))
+            await events.__anext__()
+
+        with self.assertRaises(ValueError):
+            run(main())
+
+    def test_dropping_policies_without_prefetch(self):
+        async def main():
+            c, feed = await client_with_feed(prefetch_count=0)
+            feed.put(fixture("deals.json"))
+            feed.end()
+            return [d.item async for d in c.listen(Feed.Deals, buffer=SubscriptionBuffer(4, BufferPolicy.DropOldest))]
+
+        self.assertEqual(run(main()), ["Thread"])
+
+    def test_block_returns_all_unprocessed_messages(self):
+        async def main():
+            c, feed = await client_with_feed()
+            messages = [feed.put(fixture("deals.json")) for _ in range(4)]
+            events = c.listen(Feed.Deals, buffer=SubscriptionBuffer(1))
+            await events.__anext__()
+            await events.__anext__()
+            # second event is held by user, third is in buffer, fourth is taken by pump waiting for room
+            await asyncio.sleep(0.05)
+            await events.aclose()
+            return [m.state for m in messages]
+
+        self.assertEqual(run(main()), ["ack", "requeue", "requeue", "requeue"])
+
+    def test_pump_finished_before_buffer_closed(self):
+        async def main():
+            c, feed = await client_with_feed()
+            messages = [feed.put(fixture("deals.json")) for _ in range(3)]
+            buffer = SubscriptionBuffer(1)
+            events = c.listen(Feed.Deals, buffer=buffer)
+            await events.__anext__()
+            await asyncio.sleep(0.05)
+            tasks = asyncio.all_tasks()
+            await events.aclose()
+            # no pump left running after listen() finished
+            return [m.state for m in messages], len(buffer), [t for t in tasks - asyncio.all_tasks() if not t.done()]
+
+        states, size, running = run(main())
+        self.assertEqual(states, ["requeue", "requeue", "requeue"])
+        self.assertEqual(size, 0)
+        self.assertEqual(running, [])
+
+    def test_dropped_events_are_acknowledged(self):
+        async def main():
+            c, feed = await client_with_feed()
+            messages = [feed.put(fixture("deals.json")) for _ in range(5)]
+            buffer = SubscriptionBuffer(2, BufferPolicy.DropNewest)
+            events = c.listen(Feed.Deals, buffer=buffer)
+            await events.__anext__()
+            await asyncio.sleep(0.05)
+            await events.aclose()
+            return [m.state for m in messages], buffer.dropped
+
+        states, dropped = run(main())
+        self.assertEqual(states, ["ack"] * 5)
+        self.assertEqual(dropped, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import unittest
+import warnings
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.cache import ResponseCache
+from cwapi.requests import RequestProfileRequest
+from cwapi.responses import ForbiddenError, GetInfoResponse, RequestProfileResponse, RequestStockResponse
+
+from .fakes import attach, reply
+from .util import fixture
+
+
+def body(action, userId, **changes):
+    o = json.loads(fixture(f"responses/{action}.json"))
+    o["payload"]["userId"] = userId
+    o["payload"].update(changes)
+    return json.dumps(o).encode()
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_equal_body_not_parsed_again(self):
+        c = ResponseCache()
+        b = body("requestProfile", 1)
+        first, changed = c.parse_changed(b)
+        self.assertIs(type(first), RequestProfileResponse)
+        self.assertTrue(changed)
+        second, changed = c.parse_changed(b)
+        self.assertIs(second, first)
+        self.assertFalse(changed)
+        self.assertEqual((c.hits, c.misses), (1, 1))
+        self.assertIs(c.get("requestProfile", 1), first)
+        self.assertIn(("requestProfile", 1), c)
+
+    def test_changed_body_replaces_entry(self):
+        c = ResponseCache()
+        old = body("requestProfile", 1)
+        c.parse(old)
+        new = c.parse(body("requestProfile", 1, pouches=123))
+        self.assertEqual(len(c), 1)
+        self.assertIs(c.get("requestProfile", 1), new)
+        # fingerprint of replaced reply is dropped
+        res, changed = c.parse_changed(old)
+        self.assertTrue(changed)
+        self.assertIsNot(res, new)
+        self.assertEqual(c.hits, 0)
+
+    def test_entries_per_action_and_user(self):
+        c = ResponseCache()
+        c.parse(body("requestProfile", 1))
+        c.parse(body("requestProfile", 2))
+        c.parse(body("requestStock", 1))
+        self.assertEqual(len(c), 3)
+        self.assertIs(type(c.get("requestStock", 1)), RequestStockResponse)
+        self.assertIsNone(c.get("requestStock", 2))
+
+    def test_one_shot_replies_not_cached(self):
+        c = ResponseCache()
+        b = fixture("responses/getInfo.json")
+        self.assertIs(type(c.parse(b)), GetInfoResponse)
+        self.assertTrue(c.parse_changed(b)[1])
+        self.assertEqual(len(c), 0)
+        with self.assertRaises(ForbiddenError):
+            c.parse(reply("requestProfile", {"userId": 1, "requiredOperation": "GetUserProfile"}, "Forbidden"))
+        self.assertEqual(len(c), 0)
+
+    def test_eviction_of_least_recently_used(self):
+        c = ResponseCache(maxsize=2)
+        b1, b2, b3 = (body("requestProfile", u) for u in (1, 2, 3))
+        c.parse(b1)
+        c.parse(b2)
+        # hit makes entry of user 1 most recently used
+        c.parse(b1)
+        c.parse(b3)
+        self.assertEqual(len(c), 2)
+        self.assertNotIn(("requestProfile", 2), c)
+        self.assertIn(("requestProfile", 1), c)
+        self.assertIn(("requestProfile", 3), c)
+        self.assertTrue(c.parse_changed(b2)[1])
+        self.assertNotIn(("requestProfile", 1), c)
+        # update of existing entry doesn't evict others
+        c.parse(body("requestProfile", 2, pouches=5))
+        self.assertEqual(len(c), 2)
+        self.assertIn(("requestProfile", 3), c)
+
+    def test_unbounded(self):
+        c = ResponseCache()
+        for u in range(50):
+            c.parse(body("requestProfile", u))
+        self.assertEqual(len(c), 50)
+        self.assertIsNone(c.maxsize)
+
+    def test_forget_and_clear(self):
+        c = ResponseCache()
+        b = body("requestProfile", 1)
+        c.parse(b)
+        c.parse(body("requestProfile", 2))
+        c.forget("requestProfile", 1)
+        c.forget("requestProfile", 5)
+        self.assertNotIn(("requestProfile", 1), c)
+        self.assertTrue(c.parse_changed(b)[1])
+        c.clear()
+        self.assertEqual(len(c), 0)
+        self.assertTrue(c.parse_changed(b)[1])
+
+    def test_checks(self):
+        with self.assertRaises(TypeError):
+            ResponseCache(maxsize=1.5)
+        with self.assertRaises(ValueError):
+            ResponseCache(maxsize=0)
+
+    def test_client(self):
+        b = body("requestProfile", 1)
+        cache = ResponseCache()
+
+        async def main():
+            c = AsyncChatWarsApiClient(Server.CW3, "instance", "password", response_cache=cache)
+            attach(c, lambda _: [(0.0, b)])
+            return await c.ask(RequestProfileRequest(token="t")), await c.ask(RequestProfileRequest(token="t"))
+
+        first, second = asyncio.run(asyncio.wait_for(main(), 5))
+        self.assertIs(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.__main__ import _build_request, _parse_args, _run
+from cwapi.requests import AuthAdditionalOperationRequest, GetInfoRequest, WantToBuyRequest
+from cwapi.types import Operation
+
+from .fakes import attach, reply
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def responder(delay=0.0):
+    def respond(body):
+        o = json.loads(body)
+        if o["action"] == "getInfo":
+            return [(delay, reply("getInfo", {"balance": 7}))]
+        return [(delay, reply(o["action"], {"userId": 1, "requiredOperation": "GetUserProfile"}, "Forbidden"))]
+
+    return respond
+
+
+def cli(lines, concurrency=16, rate=None, delay=0.0):
+    async def main():
+        c = AsyncChatWarsApiClient(Server.CW3, "instance", "password")
+        attach(c, responder(delay))
+        out = io.StringIO()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        failed = await _run(c, io.StringIO("".join(line + "\n" for line in lines)), out, concurrency, rate)
+        return failed, [json.loads(line) for line in out.getvalue().splitlines()], loop.time() - start
+
+    return run(main())
+
+
+class ArgumentsTest(unittest.TestCase):
+    def parse(self, argv):
+        with contextlib.redirect_stderr(io.StringIO()):
+            return _parse_args(argv)
+
+    def test_defaults(self):
+        with mock.patch.dict(os.environ, {"CWAPI_PASSWORD": "secret"}):
+            args = self.parse(["--instance", "bot"])
+        self.assertEqual((args.instance, args.password, args.server), ("bot", "secret", "CW3"))
+        self.assertEqual((args.concurrency, args.rate, args.native_transport), (16, None, False))
+
+    def test_options(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "requests.jsonl")
+            with open(path, "w") as f:
+                f.write('{"action": "getInfo"}\n')
+            args = self.parse([path, "--instance", "bot", "--password", "p", "--server", "International", "-c", "2", "-r", "0.5", "--native-transport"])
+            with args.input:
+                self.assertEqual(args.input.read(), '{"action": "getInfo"}\n')
+        self.assertEqual((args.server, args.concurrency, args.rate, args.native_transport), ("International", 2, 0.5, True))
+
+    def test_errors(self):
+        with mock.patch.dict(os.environ, clear=True):
+            for argv in (
+                ["--instance", "bot"],
+                ["--password", "p"],
+                ["--instance", "bot", "--password", "p", "-c", "0"],
+                ["--instance", "bot", "--password", "p", "-r", "0"],
+                ["--instance", "bot", "--password", "p", "--server", "CW2"],
+            ):
+                with self.subTest(argv=argv):
+                    with self.assertRaises(SystemExit):
+                        self.parse(argv)
+
+
+class BuildRequestTest(unittest.TestCase):
+    def test_requests(self):
+        self.assertIs(type(_build_request({"action": "getInfo", "id": 5})), GetInfoRequest)
+        req = _build_request({"action": "wantToBuy", "token": "t", "itemCode": "01", "quantity": 1, "price": 2})
+        self.assertIs(type(req), WantToBuyRequest)
+        self.assertFalse(req.exactPrice)
+        req = _build_request({"action": "authAdditionalOperation", "token": "t", "operation": "GetStock"})
+        self.assertIs(type(req), AuthAdditionalOperationRequest)
+        self.assertIs(req.operation, Operation.GetStock)
+
+    def test_errors(self):
+        for d in ([], {"token": "t"}, {"action": "stealStock"}):
+            with self.subTest(d=d):
+                with self.assertRaises(ValueError):
+                    _build_request(d)
+        with self.assertRaises(TypeError):
+            _build_request({"action": "getInfo", "token": "t"})
+
+
+class RunTest(unittest.TestCase):
+    def test_responses_and_errors(self):
+        failed, out, _ = cli([
+            '{"action": "getInfo", "id": "a"}',
+            '',
+            'not json',
+            '{"action": "stealStock"}',
+            '{"action": "requestProfile", "token": "t"}',
+        ])
+        self.assertEqual(failed, 3)
+        by_id = {o["id"]: o for o in out}
+        self.assertEqual(set(by_id), {"a", 2, 3, 4})
+        self.assertEqual(by_id["a"], {"id": "a", "action": "getInfo", "type": "GetInfoResponse", "response": {"balance": 7}})
+        self.assertEqual(by_id[2]["error"], "BadRequest")
+        self.assertEqual(by_id[3]["error"], "BadRequest")
+        self.assertEqual(by_id[4]["error"], "ForbiddenError")
+        self.assertEqual(by_id[4]["details"]["userId"], 1)
+
+    def test_all_succeeded(self):
+        failed, out, _ = cli(['{"action": "getInfo"}'] * 3)
+        self.assertEqual(failed, 0)
+        self.assertEqual(sorted(o["id"] for o in out), [1, 2, 3])
+
+    def test_concurrency(self):
+        # replies take 0.05 s, two requests are in flight at most
+        _, out, elapsed = cli(['{"action": "getInfo"}'] * 4, concurrency=2, delay=0.05)
+        self.assertEqual(len(out), 4)
+        self.assertGreaterEqual(elapsed, 0.1)
+
+    def test_rate(self):
+        _, out, elapsed = cli(['{"action": "getInfo"}'] * 3, rate=20)
+        self.assertEqual(len(out), 3)
+        self.assertGreaterEqual(elapsed, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+import warnings
+
+from cwapi.responses import parse_response
+from cwapi.types import _decode_action, _decode_castle, _decode_class, _decode_condition, _decode_guild_role, _decode_operation, _decode_quality, _decode_status, Castle, set_unknown_values_fallback
+
+from .util import fixture
+
+DECODERS = (_decode_action, _decode_castle, _decode_class, _decode_condition, _decode_guild_role, _decode_operation, _decode_quality, _decode_status)
+
+
+def guild_info(castle):
+    body = json.loads(fixture("responses/guildInfo.json"))
+    body["payload"]["castle"] = castle
+    return json.dumps(body).encode()
+
+
+class StrictDecodingTest(unittest.TestCase):
+    def test_unknown_value_raises(self):
+        for decode in DECODERS:
+            with self.subTest(decode.enum.__qualname__):
+                with self.assertRaises(ValueError):
+                    decode("no such value")
+
+    def test_known_values(self):
+        for decode in DECODERS:
+            for m in decode.enum.__members__.values():
+                self.assertIs(decode(m.value), m)
+
+    def test_unhashable_value(self):
+        with self.assertRaises(TypeError):
+            _decode_castle([])
+
+    def test_response(self):
+        with self.assertRaises(ValueError):
+            parse_response(guild_info("🐉"))
+
+
+class FallbackDecodingTest(unittest.TestCase):
+    def setUp(self):
+        set_unknown_values_fallback(True)
+        self.addCleanup(set_unknown_values_fallback, False)
+
+    def test_unknown_value_decoded_as_placeholder(self):
+        for decode in DECODERS:
+            with self.subTest(decode.enum.__qualname__):
+                with warnings.catch_warnings(record=True) as w:
+                    warnings.simplefilter("always")
+                    m = decode("placeholder value")
+                    again = decode("placeholder value")
+                self.assertIsInstance(m, decode.enum)
+                self.assertEqual(m.value, "placeholder value")
+                self.assertEqual(m._name_, "Unknown")
+                self.assertNotIn(m, list(decode.enum.__members__.values()))
+                # placeholder is built (and warned about) once
+                self.assertIs(again, m)
+                self.assertEqual(len(w), 1)
+
+    def test_known_values_kept(self):
+        for decode in DECODERS:
+            for m in decode.enum.__members__.values():
+                self.assertIs(decode(m.value), m)
+
+    def test_response(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            guild = parse_response(guild_info("🐲"))
+        self.assertIs(type(guild.castle), Castle)
+        self.assertEqual(guild.castle.value, "🐲")
+
+    def test_strict_after_fallback(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            _decode_quality("Legendary Plus")
+        set_unknown_values_fallback(False)
+        with self.assertRaises(ValueError):
+            _decode_quality("Legendary Plus")
+
+    def test_flag_check(self):
+        with self.assertRaises(TypeError):
+            set_unknown_values_fallback(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
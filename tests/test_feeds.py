@@ -0,0 +1,78 @@
+import json
+import unittest
+
+from cwapi.feeds import Feed, _iter_json_array, iter_feed, parse_feed
+
+from .util import data, fixture
+
+
+# values which can be cut by chunk boundary into other valid values
+ARRAYS = (
+    b'[-1.5e10, 2]',
+    b'[1, -0, 0.25, 1E+3, -12.5e-3, 123456789012345678901234567890]',
+    b'[true, false, null, "", "\\"]\\u0451", {"a": [1, {"b": "]"}]}, []]',
+    b' \n[\t"\xd1\x91\xf0\x9f\x96\xa4" , 7 ]\n ',
+    b'[]',
+    b'[[], [[]], {}]',
+)
+
+INVALID = (
+    b'',
+    b'   ',
+    b'{}',
+    b'1',
+    b'[',
+    b'[1',
+    b'[1,',
+    b'[1 2]',
+    b'[,1,,2]',
+    b'[1,,2]',
+    b'[1,]',
+    b'[,]',
+    b'[1]]',
+    b'[1] x',
+    b'["a" "b"]',
+    b'[1.]',
+    b'[-]',
+    b'[tru]',
+    b'["\xd1"]',
+)
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def test_every_chunk_size(self):
+        for b in ARRAYS:
+            expected = json.loads(b)
+            for chunk_size in range(1, len(b) + 2):
+                with self.subTest(body=b, chunk_size=chunk_size):
+                    self.assertEqual(list(_iter_json_array(b, chunk_size)), expected)
+
+    def test_invalid(self):
+        for b in INVALID:
+            for chunk_size in range(1, len(b) + 2):
+                with self.subTest(body=b, chunk_size=chunk_size):
+                    with self.assertRaises(ValueError):
+                        list(_iter_json_array(b, chunk_size))
+
+
+class IterFeedTest(unittest.TestCase):
+    def test_fixtures_every_chunk_size(self):
+        for feed in Feed:
+            b = fixture(f"{feed.value}.json")
+            expected = parse_feed(feed, b)
+            if type(expected) is not tuple:
+                expected = (expected,)
+            expected = data(expected)
+            # every chunk size up to whole body
+            for chunk_size in range(1, len(b) + 2):
+                with self.subTest(feed=feed, chunk_size=chunk_size):
+                    self.assertEqual(data(tuple(iter_feed(feed, b, chunk_size=chunk_size))), expected)
+
+    def test_stops_early(self):
+        b = fixture("yellow_pages.json")
+        first = next(iter_feed(Feed.YellowPages, b, chunk_size=64))
+        self.assertEqual(data(first), data(parse_feed(Feed.YellowPages, b)[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
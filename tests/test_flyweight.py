@@ -0,0 +1,132 @@
+import copy
+import pickle
+import sys
+import threading
+import unittest
+import warnings
+import weakref
+
+from cwapi.responses import parse_response
+from cwapi._utils import _flyweight_cache, _shared
+from cwapi.types import Condition, Gear, GearSet, Guild, Quality, Recipe, RecipeBook, SecondaryClass, set_flyweight_cache
+
+from .util import fixture
+
+
+class FlyweightTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(set_flyweight_cache, None)
+
+    def test_not_shared_without_cache(self):
+        a = parse_response(fixture("responses/requestProfile.json"))
+        b = parse_response(fixture("responses/requestProfile.json"))
+        self.assertIsNot(a.guild, b.guild)
+        self.assertIsNot(a.secondaryClass, b.secondaryClass)
+
+    def test_shared_objects_are_read_only(self):
+        set_flyweight_cache(16)
+        a = parse_response(fixture("responses/requestGearInfo.json"))
+        b = parse_response(fixture("responses/requestGearInfo.json"))
+        self.assertIs(a.weapon, b.weapon)
+        with self.assertRaises(AttributeError):
+            a.weapon.atk = 41
+        with self.assertRaises(AttributeError):
+            del a.weapon.name
+        self.assertEqual(b.weapon.atk, 40)
+        self.assertIsInstance(a.weapon, Gear)
+        # copy is detached and modifiable
+        a.weapon = copy.copy(a.weapon)
+        self.assertIs(type(a.weapon), Gear)
+        a.weapon.atk = 1
+        self.assertEqual(b.weapon.atk, 40)
+        with self.assertRaises(TypeError):
+            a.weapon.atk = "1"
+
+    def test_copies_of_shared_objects(self):
+        set_flyweight_cache(16)
+        g = parse_response(fixture("responses/requestGearInfo.json")).weapon
+        for c in copy.copy(g), copy.deepcopy(g), pickle.loads(pickle.dumps(g)):
+            with self.subTest(c=c):
+                self.assertIs(type(c), Gear)
+                self.assertEqual((c.name, c.atk, c.quality), (g.name, g.atk, g.quality))
+                c.atk = 2
+
+    def test_shared_objects_accepted_by_containers(self):
+        set_flyweight_cache(16)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            gear = parse_response(fixture("responses/requestGearInfo.json"))
+            book = parse_response(fixture("responses/viewCraftbook.json"), False)
+        s = GearSet(weapon=gear.weapon)
+        s.head = gear.weapon
+        s["body"] = gear.weapon
+        self.assertIs(s.body, gear.weapon)
+        r = book.craft["01"]
+        self.assertIs(RecipeBook(r)["01"], r)
+        self.assertIs(RecipeBook([r])["01"], r)
+
+    def test_concurrent_parsing(self):
+        set_flyweight_cache(2)
+        cache = _flyweight_cache.current
+        errors = []
+
+        def work(k):
+            try:
+                for i in range(20000):
+                    _shared(Recipe, f"{(i * k) % 3:02}", "recipe", 1)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(k,)) for k in (1, 5, 7, 11)]
+        # threads are switched as often as possible, so they interleave inside cache
+        switch = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(switch)
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 2)
+
+    def test_shared_between_response_types(self):
+        set_flyweight_cache(64)
+        a = parse_response(fixture("responses/requestProfile.json"))
+        b = parse_response(fixture("responses/requestProfile.json"))
+        self.assertIs(a.guild, b.guild)
+        self.assertIs(a.secondaryClass, b.secondaryClass)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            c = parse_response(fixture("responses/viewCraftbook.json"))
+            d = parse_response(fixture("responses/viewCraftbook.json"))
+        self.assertIs(c.craft["01"], d.craft["01"])
+
+    def test_least_recently_used_evicted(self):
+        set_flyweight_cache(2)
+        a = parse_response(fixture("responses/requestProfile.json"))
+        b = parse_response(fixture("responses/requestProfile.json"))
+        self.assertIs(a.guild, b.guild)
+        # gear of five items pushes guild and secondary class out
+        parse_response(fixture("responses/requestGearInfo.json"))
+        c = parse_response(fixture("responses/requestProfile.json"))
+        self.assertIsNot(a.guild, c.guild)
+        self.assertIsNot(a.secondaryClass, c.secondaryClass)
+
+    def test_user_objects_not_shared(self):
+        set_flyweight_cache(16)
+        g = Gear("bow", 1, 0, Condition.Normal, Quality.Common, 0)
+        self.assertIsNot(g, Gear("bow", 1, 0, Condition.Normal, Quality.Common, 0))
+
+    def test_no_weakref_slot(self):
+        for tp in Guild, SecondaryClass, Gear, Recipe:
+            with self.subTest(tp.__qualname__):
+                self.assertEqual(tp.__weakrefoffset__, 0)
+                self.assertEqual(tp.__dictoffset__, 0)
+        with self.assertRaises(TypeError):
+            weakref.ref(Recipe("01", "thread", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
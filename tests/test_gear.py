@@ -0,0 +1,86 @@
+import copy
+import pickle
+import unittest
+
+from cwapi.types import Condition, Gear, GearSet, GearSlot, Quality
+
+
+def gear(name):
+    return Gear(name, 1, 0, Condition.Normal, Quality.Common, 0)
+
+
+class GearSetTest(unittest.TestCase):
+    def test_contains_occupied_slots(self):
+        s = GearSet(weapon=gear("Bow"))
+        self.assertIn("weapon", s)
+        self.assertIn(GearSlot.Weapon, s)
+        self.assertNotIn("head", s)
+        del s.weapon
+        self.assertNotIn("weapon", s)
+        with self.assertRaises(ValueError):
+            "tail" in s
+
+    def test_occupied(self):
+        bow, hat = gear("Bow"), gear("Hat")
+        # in order of slots, not of filling
+        s = GearSet(head=hat, weapon=bow)
+        self.assertEqual(list(s.occupied()), [(GearSlot.Weapon, bow), (GearSlot.Head, hat)])
+        self.assertEqual(list(GearSet().occupied()), [])
+
+    def test_iter_all_slots(self):
+        bow = gear("Bow")
+        s = GearSet(weapon=bow)
+        self.assertEqual(list(s), [(slot, bow if slot is GearSlot.Weapon else None) for slot in GearSlot])
+
+    def test_items(self):
+        bow = gear("Bow")
+        s = GearSet()
+        s["weapon"] = bow
+        self.assertIs(s[GearSlot.Weapon], bow)
+        self.assertIsNone(s["ring"])
+        del s[GearSlot.Weapon]
+        self.assertIsNone(s["weapon"])
+        with self.assertRaises(ValueError):
+            s["tail"]
+        with self.assertRaises(ValueError):
+            GearSet(tail=bow)
+        with self.assertRaises(TypeError):
+            s["weapon"] = "Bow"
+
+    def test_slot_properties(self):
+        bow, hat = gear("Bow"), gear("Hat")
+        s = GearSet(weapon=bow)
+        self.assertIs(s.weapon, bow)
+        self.assertIsNone(s.head)
+        s.head = hat
+        self.assertIs(s["head"], hat)
+        del s.weapon
+        self.assertIsNone(s["weapon"])
+        with self.assertRaises(TypeError):
+            s.ring = "Ring"
+        for slot in GearSlot:
+            s[slot] = bow
+            self.assertIs(getattr(s, slot.value), bow)
+
+    def test_view_shares_slots(self):
+        bow, hat = gear("Bow"), gear("Hat")
+        s = GearSet(weapon=bow)
+        v = s.view()
+        self.assertIs(type(v), GearSet)
+        self.assertIs(v.weapon, bow)
+        v.head = hat
+        self.assertIs(s.head, hat)
+        del s.weapon
+        self.assertNotIn("weapon", v)
+
+    def test_copy_and_pickle_dont_share(self):
+        bow = gear("Bow")
+        s = GearSet(weapon=bow)
+        for c in (copy.copy(s), pickle.loads(pickle.dumps(s))):
+            c.head = bow
+            self.assertEqual([slot for slot, _ in c.occupied()], [GearSlot.Weapon, GearSlot.Head])
+        self.assertNotIn("head", s)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import random
+import unittest
+from bisect import bisect_right
+
+from cwapi.history import ProfileHistory
+
+from .util import data
+
+FIELDS = ProfileHistory.fields
+USER = 1001
+
+
+class Reference:
+    # plain list of stored samples, same acceptance rules as ProfileHistory
+    def __init__(self):
+        self.rows = []
+
+    def add(self, at, values):
+        if self.rows:
+            last_at, last = self.rows[-1]
+            if at < last_at or values == last:
+                return
+        self.rows.append((at, values))
+
+    @property
+    def times(self):
+        return [t for t, _ in self.rows]
+
+    def at(self, moment):
+        i = bisect_right(self.times, moment) - 1
+        return None if i < 0 else self.rows[i]
+
+    def samples(self, start=None, end=None):
+        return [(t, v) for t, v in self.rows if (start is None or t >= start) and (end is None or t <= end)]
+
+    def downsample(self, step, start=None, end=None):
+        times = self.times
+        first = int((times[0] if start is None else max(start, times[0])) // step)
+        last = int((times[-1] if end is None else end) // step)
+        out = []
+        i = 0
+        state = None
+        for b in range(first, last + 1):
+            # state after last sample of bucket
+            while i < len(self.rows) and int(self.rows[i][0] // step) <= b:
+                state = self.rows[i][1]
+                i += 1
+            if state is not None:
+                out.append((float(b * step), state))
+        return out
+
+
+def random_series(rnd, n):
+    at = 1000.0
+    values = [rnd.randrange(10 ** 6) for _ in FIELDS]
+    for _ in range(n):
+        # repeated and older timestamps, unchanged samples and big jumps
+        at += rnd.choice((0, 0.5, 1, 10, 60, -5))
+        for f in rnd.sample(range(len(FIELDS)), rnd.randrange(len(FIELDS) + 1)):
+            values[f] += rnd.randrange(-10 ** 9, 10 ** 9)
+        yield at, tuple(values)
+
+
+def filled(keyframe_interval, n=300, seed=0):
+    rnd = random.Random(seed)
+    history = ProfileHistory(keyframe_interval=keyframe_interval)
+    reference = Reference()
+    for at, values in random_series(rnd, n):
+        history.add(USER, values, at)
+        reference.add(at, values)
+    return history, reference
+
+
+def rows(samples):
+    return [(s.at, tuple(getattr(s, f) for f in FIELDS)) for s in samples]
+
+
+class HistoryTest(unittest.TestCase):
+    INTERVALS = (1, 2, 3, 7, 64, 1000)
+
+    def test_replay_across_keyframes(self):
+        for interval in self.INTERVALS:
+            with self.subTest(keyframe_interval=interval):
+                history, reference = filled(interval)
+                self.assertEqual(history.samples_count(USER), len(reference.rows))
+                self.assertEqual(rows(history.samples(USER)), reference.rows)
+                times = reference.times
+                # every range starting and ending around keyframe boundaries
+                for lo in range(0, len(times), 5):
+                    for hi in (lo, lo + 1, lo + interval - 1, lo + interval, lo + interval + 1):
+                        if hi < len(times):
+                            self.assertEqual(rows(history.samples(USER, times[lo], times[hi])), reference.samples(times[lo], times[hi]))
+
+    def test_at_and_last(self):
+        for interval in self.INTERVALS:
+            with self.subTest(keyframe_interval=interval):
+                history, reference = filled(interval)
+                self.assertIsNone(history.at(USER, reference.rows[0][0] - 1))
+                for t, _ in reference.rows:
+                    for moment in (t - 0.25, t, t + 0.25):
+                        expected = reference.at(moment)
+                        s = history.at(USER, moment)
+                        self.assertEqual(None if s is None else rows([s])[0], expected)
+                self.assertEqual(rows([history.last(USER)])[0], reference.rows[-1])
+
+    def test_changes(self):
+        history, reference = filled(5)
+        start, end = reference.rows[10][0], reference.rows[-10][0]
+        for i, field in enumerate(FIELDS):
+            with self.subTest(field):
+                expected = []
+                for t, v in reference.samples(start, end):
+                    if not expected or expected[-1][1] != v[i]:
+                        expected.append((t, v[i]))
+                times, values = history.changes(USER, field, start, end)
+                self.assertEqual(list(zip(times, values)), expected)
+
+    def test_truncate(self):
+        for interval in self.INTERVALS:
+            for cut in (0, 1, interval - 1, interval, interval + 1, 2 * interval, 150, 299):
+                with self.subTest(keyframe_interval=interval, cut=cut):
+                    history, reference = filled(interval)
+                    if cut >= len(reference.rows):
+                        continue
+                    before = reference.rows[cut][0]
+                    history.truncate(before)
+                    kept = rows(history.samples(USER))
+                    # dropped by whole keyframe blocks before one holding state at cut moment
+                    dropped = (bisect_right(reference.times, before) - 1) // interval * interval
+                    self.assertEqual(len(reference.rows) - len(kept), dropped)
+                    self.assertEqual(kept, reference.rows[dropped:])
+                    self.assertEqual(rows([history.at(USER, before)])[0], reference.at(before))
+                    # appending after truncation keeps keyframes aligned
+                    for at, values in random_series(random.Random(cut), 100):
+                        at += reference.rows[-1][0]
+                        history.add(USER, values, at)
+                        reference.add(at, values)
+                    self.assertEqual(rows(history.samples(USER)), reference.rows[len(reference.rows) - history.samples_count(USER):])
+
+    def test_downsample(self):
+        for interval in (1, 3, 64):
+            history, reference = filled(interval)
+            first, last = reference.rows[0][0], reference.rows[-1][0]
+            for step in (0.5, 1, 7, 10, 60, 3600):
+                for start, end in ((None, None), (first - 100, None), (first + 10, last - 10), (first + 60, first + 60), (None, last + 1000)):
+                    with self.subTest(keyframe_interval=interval, step=step, start=start, end=end):
+                        self.assertEqual(rows(history.downsample(USER, step, start, end)), reference.downsample(step, start, end))
+
+    def test_downsample_bucket_edges(self):
+        history = ProfileHistory(keyframe_interval=2)
+        for at, exp in ((10.0, 1), (19.999, 2), (20.0, 3), (45.0, 4)):
+            history.add(USER, (exp, 0, 0, 0, 0, 0, 0), at)
+        self.assertEqual(
+            [(s.at, s.exp) for s in history.downsample(USER, 10)],
+            # sample at bucket start belongs to it, empty buckets repeat previous state
+            [(10.0, 2), (20.0, 3), (30.0, 3), (40.0, 4)]
+        )
+        self.assertEqual([(s.at, s.exp) for s in history.downsample(USER, 10, 20, 20)], [(20.0, 3)])
+        self.assertEqual([(s.at, s.exp) for s in history.downsample(USER, 10, 25, 35)], [(20.0, 3), (30.0, 3)])
+        self.assertEqual(history.downsample(USER, 10, 50, 40), [])
+        self.assertEqual(history.downsample(USER + 1, 10), [])
+
+    def test_samples_are_model_objects(self):
+        history, reference = filled(3, n=20)
+        samples = history.samples(USER)
+        self.assertEqual(data(samples[0]), data(history.at(USER, samples[0].at)))
+        with self.assertRaises(TypeError):
+            samples[0].gold = "1"
+
+    def test_rejects_bad_values(self):
+        history = ProfileHistory()
+        with self.assertRaises(TypeError):
+            history.add(USER, (1, 2, 3))
+        with self.assertRaises(TypeError):
+            history.add(USER, (1, 2, 3, 4, 5, 6, 7.0))
+        with self.assertRaises(TypeError):
+            history.add("1", (1, 2, 3, 4, 5, 6, 7))
+        with self.assertRaises(ValueError):
+            history.changes(USER, "atk")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+import unittest
+from os.path import dirname
+
+ROOT = dirname(dirname(__file__))
+
+# transports and optional submodules must be loaded only by code which uses them
+HEAVY = ("asyncio", "concurrent.futures", "hashlib", "multiprocessing", "pika", "aio_pika", "numpy")
+OPTIONAL = ("cwapi._amqp", "cwapi.buffers", "cwapi.cache", "cwapi.feeds", "cwapi.history", "cwapi.market", "cwapi.multi", "cwapi.orderbook", "cwapi.recipes", "cwapi.roster", "cwapi.scheduler", "cwapi.tokens", "cwapi.trade", "cwapi.workers")
+
+
+def loaded_by(statement):
+    out = subprocess.run(
+        [sys.executable, "-c", f"import sys\nbefore = set(sys.modules)\n{statement}\nprint('\\n'.join(set(sys.modules) - before))"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return set(out.split())
+
+
+class ImportTest(unittest.TestCase):
+    def assertNotLoaded(self, modules, names):
+        for name in names:
+            self.assertFalse(any(m == name or m.startswith(name + ".") for m in modules), f"{name} loaded")
+
+    def test_package(self):
+        modules = loaded_by("import cwapi")
+        self.assertNotLoaded(modules, HEAVY)
+        self.assertNotLoaded(modules, OPTIONAL)
+
+    def test_types_and_requests(self):
+        modules = loaded_by("import cwapi.types, cwapi.requests")
+        self.assertNotLoaded(modules, HEAVY)
+        self.assertNotLoaded(modules, OPTIONAL)
+
+    def test_sync_client(self):
+        modules = loaded_by("from cwapi import ChatWarsApiClient, Server\nChatWarsApiClient(Server.CW3, 'instance', 'password')")
+        self.assertNotLoaded(modules, ("asyncio", "aio_pika"))
+
+    def test_async_client(self):
+        modules = loaded_by("from cwapi import AsyncChatWarsApiClient, Server\nAsyncChatWarsApiClient(Server.CW3, 'instance', 'password')")
+        self.assertNotLoaded(modules, ("pika",))
+
+
+if __name__ == "__main__":
+    unittest.main()
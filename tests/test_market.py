@@ -0,0 +1,112 @@
+import unittest
+
+from cwapi.market import MarketAggregator
+
+from .util import data
+
+
+def ohlc(s):
+    return s.open, s.high, s.low, s.close, s.volume, s.turnover, s.deals
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_single_bucket(self):
+        m = MarketAggregator(bucket=60, buckets=5)
+        for qty, price in ((2, 10), (1, 12), (3, 8), (1, 9)):
+            m.add("01", qty, price, 1000)
+        s = m.snapshot("01", at=1000)
+        self.assertEqual(ohlc(s), (10, 12, 8, 9, 7, 65, 4))
+        self.assertEqual(s.vwap, 65 / 7)
+        self.assertEqual((s.start, s.end), (960.0 - 4 * 60, 1020.0))
+
+    def test_empty_slots_near_epoch(self):
+        # bucket ids of looked-back slots are negative, they must not match never written slots
+        m = MarketAggregator(bucket=60, buckets=5)
+        m.add("01", 1, 10, 0)
+        m.add("01", 1, 8, 30)
+        m.add("01", 1, 12, 70)
+        self.assertEqual(ohlc(m.snapshot("01", at=100)), (10, 12, 8, 12, 3, 30, 3))
+
+    def test_before_epoch(self):
+        m = MarketAggregator(bucket=60, buckets=5)
+        m.add("01", 1, 10, -30)
+        self.assertEqual(ohlc(m.snapshot("01", at=-1)), (10, 10, 10, 10, 1, 10, 1))
+        self.assertEqual(ohlc(m.snapshot("01", at=100)), (10, 10, 10, 10, 1, 10, 1))
+
+    def test_rollover(self):
+        m = MarketAggregator(bucket=10, buckets=3)
+        for t in range(0, 100, 10):
+            m.add("01", 1, t, t)
+        # only last 3 buckets are kept, older slots are overwritten
+        self.assertEqual(ohlc(m.snapshot("01", at=95)), (70, 90, 70, 90, 3, 240, 3))
+        self.assertIsNone(m.snapshot("01", at=200))
+
+    def test_late_deal_of_overwritten_bucket_is_ignored(self):
+        m = MarketAggregator(bucket=10, buckets=3)
+        m.add("01", 1, 5, 35)
+        m.add("01", 1, 100, 5)  # same slot, older bucket
+        self.assertEqual(ohlc(m.snapshot("01", at=35)), (5, 5, 5, 5, 1, 5, 1))
+
+    def test_window_edges(self):
+        m = MarketAggregator(bucket=10, buckets=6)
+        m.add("01", 1, 1, 9.999)
+        m.add("01", 1, 2, 10)
+        m.add("01", 1, 3, 29.5)
+        s = m.snapshot("01", span=10, at=29.5)
+        self.assertEqual(ohlc(s), (3, 3, 3, 3, 1, 3, 1))
+        self.assertEqual((s.start, s.end), (20.0, 30.0))
+        # span is rounded up to whole buckets
+        self.assertEqual(ohlc(m.snapshot("01", span=11, at=29.5)), (2, 3, 2, 3, 2, 5, 2))
+        self.assertEqual(ohlc(m.snapshot("01", span=20.5, at=29.5)), (1, 3, 1, 3, 3, 6, 3))
+        # span longer than window is clamped
+        self.assertEqual(ohlc(m.snapshot("01", span=1000, at=29.5)), (1, 3, 1, 3, 3, 6, 3))
+        self.assertIsNone(m.snapshot("01", span=10, at=45))
+
+    def test_snapshots_and_max_items(self):
+        m = MarketAggregator(bucket=10, buckets=2, max_items=2)
+        m.add("01", 1, 1, 0)
+        m.add("02", 1, 2, 0)
+        m.add("01", 1, 1, 1)  # "02" becomes least recently traded
+        m.add("03", 1, 3, 2)
+        self.assertEqual(sorted(m), ["01", "03"])
+        self.assertEqual(len(m), 2)
+        self.assertNotIn("02", m)
+        self.assertEqual(sorted(s.item for s in m.snapshots(at=5)), ["01", "03"])
+        m.forget("01")
+        self.assertEqual(data(list(m.snapshots(at=5))), data([m.snapshot("03", at=5)]))
+
+    def test_unknown_item(self):
+        self.assertIsNone(MarketAggregator().snapshot("01"))
+
+
+class CheckTest(unittest.TestCase):
+    def test_constructor(self):
+        for kwargs, error in (
+                ({"bucket": "60"}, TypeError), ({"bucket": 0}, ValueError),
+                ({"buckets": 1.0}, TypeError), ({"buckets": 0}, ValueError),
+                ({"max_items": 1.0}, TypeError), ({"max_items": 0}, ValueError),
+        ):
+            with self.subTest(kwargs=kwargs), self.assertRaises(error):
+                MarketAggregator(**kwargs)
+
+    def test_add(self):
+        m = MarketAggregator()
+        for args in (
+                (1, 1, 1, 0),
+                ("01", 1.0, 1, 0),
+                ("01", "1", 1, 0),
+                ("01", 1, 1.5, 0),
+                ("01", 1, None, 0),
+                ("01", 1, 1, "0"),
+        ):
+            with self.subTest(args=args), self.assertRaises(TypeError):
+                m.add(*args)
+        self.assertEqual(len(m), 0)
+
+    def test_update(self):
+        with self.assertRaises(TypeError):
+            MarketAggregator().update(("01", 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
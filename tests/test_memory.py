@@ -0,0 +1,129 @@
+import gc
+import tracemalloc
+import unittest
+import warnings
+from enum import Enum
+from os.path import join
+
+from cwapi import responses, types
+from cwapi._utils import _check_slots, _dataclass_creator
+from cwapi.responses import parse_response
+from cwapi.types import Class, Condition, Gear, GearSet, GearSlot, Guild, GuildRole, GuildRolesSet, QuantityRange, Quality, Recipe, RecipeBook, SecondaryClass, Stock, StockCell
+
+from .util import fixture
+
+N = 500
+
+# bytes per parsed response, including all nested objects and strings (measured on CPython 3.8-3.10 + ~15%)
+RESPONSE_BUDGETS = {
+    "authAdditionalOperation": 168,
+    "createAuthCode": 80,
+    "getInfo": 56,
+    "grantAdditionalOperation": 152,
+    "grantToken": 240,
+    "guildInfo": 7600,
+    "requestBasicInfo": 112,
+    "requestGearInfo": 1056,
+    "requestProfile": 808,
+    "requestStock": 6840,
+    "viewCraftbook": 11440,
+    "wantToBuy": 160,
+}
+
+
+def slots(n):
+    # plain object with n slots, size of it depends on interpreter
+    return type(f"Slots{n}", (), {"__slots__": tuple(f"s{i}" for i in range(n))})
+
+
+def reference(n, *containers):
+    cls = slots(n)
+
+    def f():
+        o = cls()
+        for i, c in enumerate(containers):
+            setattr(o, f"s{i}", c())
+        return o
+
+    return f
+
+
+# objects and references with expected layout (slots count and owned containers) measured on running interpreter;
+# fields are shared between objects, one more slot (8 bytes) exceeds reference
+OBJECT_BUDGETS = {
+    "Gear": (lambda: Gear("bow", 1, 2, Condition.Normal, Quality.Fine, 3), reference(6)),
+    "Guild": (lambda: Guild("Fellowship", "FS", None), reference(3)),
+    "SecondaryClass": (lambda: SecondaryClass(Class.Alchemist, 12), reference(2)),
+    "Recipe": (lambda: Recipe("01", "Thread", 3), reference(3)),
+    "StockCell": (lambda: StockCell("01", "Thread", 3), reference(3)),
+    "QuantityRange": (lambda: QuantityRange(1, 3), reference(2)),
+    "GearSet": (lambda: GearSet(), reference(1, lambda: [None] * len(GearSlot))),
+    "Stock": (lambda: Stock(), reference(1, dict)),
+    "RecipeBook": (lambda: RecipeBook(), reference(1, dict)),
+    "GuildRolesSet": (lambda: GuildRolesSet(GuildRole.Squire), reference(1, lambda: frozenset({GuildRole.Squire} - {GuildRole.NoRole}))),
+}
+
+
+def footprint(f, n=N):
+    # first object is kept, so strings interned by parser aren't reinserted to interpreter's table (and it isn't resized) while measuring
+    warm = f()
+    # list holding objects isn't counted
+    objects = [None] * n
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(n):
+            objects[i] = f()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objects, warm
+    return (after - before) / n
+
+
+class MemoryTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_response_budgets(self):
+        for name, budget in RESPONSE_BUDGETS.items():
+            with self.subTest(name):
+                body = fixture(join("responses", name + ".json"))
+                size = footprint(lambda: parse_response(body))
+                self.assertLessEqual(size, budget, f"{name} takes {size:.0f} bytes per response")
+
+    def test_object_budgets(self):
+        for name, (f, ref) in OBJECT_BUDGETS.items():
+            with self.subTest(name):
+                size = footprint(f)
+                budget = footprint(ref)
+                self.assertLess(size, budget + 8, f"{name} takes {size:.0f} bytes per object, reference takes {budget:.0f}")
+
+    def test_no_instance_dict(self):
+        for module in types, responses:
+            for name in dir(module):
+                tp = getattr(module, name)
+                if isinstance(tp, type) and tp.__module__ == module.__name__ and not issubclass(tp, (BaseException, Enum)) and "__slots__" in tp.__dict__:
+                    with self.subTest(tp.__qualname__):
+                        self.assertEqual(tp.__dictoffset__, 0)
+
+    def test_dict_rejected(self):
+        class Base:
+            pass
+
+        with self.assertRaises(TypeError):
+            class Model(Base, metaclass=_dataclass_creator, names=("a",), types=(int,)):
+                pass
+
+        class Cell(StockCell):
+            pass
+
+        with self.assertRaises(TypeError):
+            _check_slots(Cell)
+
+
+if __name__ == "__main__":
+    unittest.main()
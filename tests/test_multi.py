@@ -0,0 +1,160 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from cwapi import Server
+from cwapi.multi import MultiInstanceClient
+from cwapi.requests import CreateAuthCodeRequest, GetInfoRequest, GrantTokenRequest, RequestProfileRequest
+from cwapi.responses import InvalidTokenError
+from cwapi.tokens import TokenRegistry
+
+from .fakes import attach, reply
+from .util import fixture
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def responder(tokens, userId=1001, delay=0.0):
+    # instance knowing given tokens; other tokens are invalid
+    def respond(body):
+        o = json.loads(body)
+        action = o["action"]
+        if action == "getInfo":
+            return [(delay, reply("getInfo", {"balance": 1}))]
+        if action == "createAuthCode":
+            return [(delay, reply("createAuthCode", {"userId": o["payload"]["userId"]}))]
+        if action == "grantToken":
+            return [(delay, reply("grantToken", {"userId": o["payload"]["userId"], "id": "1", "token": "granted"}))]
+        if o["token"] not in tokens:
+            return [(delay, reply(action, {"token": o["token"]}, "InvalidToken"))]
+        p = json.loads(fixture("responses/requestProfile.json"))
+        p["payload"]["userId"] = userId
+        return [(delay, json.dumps(p).encode())]
+
+    return respond
+
+
+def multi(**responders):
+    m = MultiInstanceClient(Server.CW3, {n: "password" for n in responders})
+    exchanges = {n: attach(m.client(n), r)[1] for n, r in responders.items()}
+    return m, exchanges
+
+
+class RouteTest(unittest.TestCase):
+    def test_holder(self):
+        async def main():
+            m, exchanges = multi(a=responder({"t"}), b=responder(set()))
+            m.assign("t", "a")
+            res = await m.ask(RequestProfileRequest(token="t"))
+            return res.userId, len(exchanges["a"].published), len(exchanges["b"].published)
+
+        self.assertEqual(run(main()), (1001, 1, 0))
+
+    def test_least_loaded(self):
+        async def main():
+            m, _ = multi(a=responder({"t"}, delay=0.05), b=responder({"t"}, delay=0.05))
+            m.assign("t", "a")
+            m.assign("t", "b")
+            first = asyncio.ensure_future(m.ask(RequestProfileRequest(token="t")))
+            await asyncio.sleep(0)
+            routed = m.route(RequestProfileRequest(token="t"))
+            busy = [n for n, s in m.stats().items() if s.in_flight]
+            await first
+            return routed, busy
+
+        routed, busy = run(main())
+        self.assertEqual(len(busy), 1)
+        self.assertNotEqual(routed, busy[0])
+
+    def test_busy_holder_is_skipped(self):
+        async def main():
+            m, exchanges = multi(a=responder({"t"}, delay=0.05), b=responder({"t"}, delay=0.05))
+            m.assign("t", "a")
+            m.assign("t", "b")
+            await asyncio.gather(*(m.ask(RequestProfileRequest(token="t")) for _ in range(4)))
+            return len(exchanges["a"].published), len(exchanges["b"].published)
+
+        self.assertEqual(run(main()), (2, 2))
+
+    def test_unassigned_token(self):
+        async def main():
+            tokens = TokenRegistry()
+            m = MultiInstanceClient(Server.CW3, {"a": "password", "b": "password"}, tokens=tokens)
+            exchanges = [attach(m.client(n), responder(set()))[1] for n in m.instances]
+            with self.assertRaises(LookupError):
+                await m.ask(RequestProfileRequest(token="t"))
+            return [len(e.published) for e in exchanges], tokens.is_invalid("t")
+
+        self.assertEqual(run(main()), ([0, 0], False))
+
+    def test_tokenless_request(self):
+        async def main():
+            m, _ = multi(a=responder(set()), b=responder(set()))
+            return (await m.ask(GetInfoRequest())).balance
+
+        self.assertEqual(run(main()), 1)
+
+    def test_type_check(self):
+        m = MultiInstanceClient(Server.CW3, {"a": "password"})
+        with self.assertRaises(TypeError):
+            m.route("requestProfile")
+
+
+class AuthTest(unittest.TestCase):
+    def test_grant_goes_to_auth_instance(self):
+        async def main():
+            m, exchanges = multi(a=responder(set()), b=responder(set()))
+            await m.ask(CreateAuthCodeRequest(userId=5), "b")
+            res = await m.ask(GrantTokenRequest(userId=5, authCode="1"))
+            return res.token, m.holders("granted"), len(exchanges["a"].published)
+
+        self.assertEqual(run(main()), ("granted", frozenset({"b"}), 0))
+
+    def test_pending_auth_expires(self):
+        async def main():
+            m, _ = multi(a=responder(set()), b=responder(set()))
+            with mock.patch("cwapi.multi.monotonic", return_value=1000.0):
+                for userId in range(100):
+                    await m.ask(CreateAuthCodeRequest(userId=userId), "b")
+            with mock.patch("cwapi.multi.monotonic", return_value=1000.0 + 3600):
+                await m.ask(CreateAuthCodeRequest(userId=100), "a")
+                return m._MultiInstanceClient__pending_auth
+
+        pending = run(main())
+        self.assertEqual(list(pending), [100])
+
+
+class ForgetTest(unittest.TestCase):
+    def test_invalid_token_forgets_only_failed_holder(self):
+        async def main():
+            m, exchanges = multi(a=responder(set()), b=responder({"t"}))
+            m.assign("t", "a")
+            m.assign("t", "b")
+            with self.assertRaises(InvalidTokenError):
+                await m.ask(RequestProfileRequest(token="t"), "a")
+            holders = m.holders("t")
+            res = await m.ask(RequestProfileRequest(token="t"))
+            return holders, res.userId, m.stats()["a"].tokens, m.stats()["a"].errors
+
+        self.assertEqual(run(main()), (frozenset({"b"}), 1001, 0, 1))
+
+    def test_forget(self):
+        m = MultiInstanceClient(Server.CW3, {"a": "password", "b": "password"})
+        m.assign("t", "a")
+        m.assign("t", "b")
+        m.assign("t", "b")
+        self.assertEqual(m.stats()["b"].tokens, 1)
+        m.forget("t", "a")
+        self.assertEqual(m.holders("t"), frozenset({"b"}))
+        m.forget("t")
+        self.assertEqual(m.holders("t"), frozenset())
+        self.assertEqual(m.stats()["b"].tokens, 0)
+        with self.assertRaises(LookupError):
+            m.route(RequestProfileRequest(token="t"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import json
+import random
+import unittest
+from unittest import mock
+
+from cwapi.feeds import Feed, parse_feed
+from cwapi.orderbook import OrderBook
+
+
+def offer(item, price, qty=1, seller="s1"):
+    return parse_feed(Feed.Offers, json.dumps({"sellerId": seller, "sellerName": f"name {seller}", "sellerCastle": "🦇", "item": item, "qty": qty, "price": price}).encode())
+
+
+def lot(lotId, item, price, status="Active", seller="name s1"):
+    return parse_feed(Feed.AuDigest, json.dumps([{
+        "lotId": lotId, "itemName": item, "sellerName": seller, "sellerCastle": "🌹", "price": price, "status": status,
+        "startedAt": "2021-12-05T10:00:00Z", "endAt": "2021-12-05T11:00:00Z",
+    }]).encode())[0]
+
+
+class OrderBookTest(unittest.TestCase):
+    def test_best_is_lowest_price(self):
+        b = OrderBook()
+        for p in (5, 3, 8, 3):
+            b.add_offer(offer("Stick", p, seller=f"s{p}"))
+        b.add_offer(offer("Stick", 3, seller="other"))
+        best = b.best("Stick")
+        self.assertEqual((best.price, best.sellerId), (3, "s3"))
+        self.assertIsNone(b.best("Pelt"))
+
+    def test_best_after_level_removed(self):
+        b = OrderBook()
+        low, high = offer("Stick", 1), offer("Stick", 2)
+        b.add_offer(low)
+        b.add_offer(high)
+        b.remove(low)
+        self.assertIs(b.best("Stick"), high)
+        # price level comes back
+        b.add_offer(low)
+        self.assertIs(b.best("Stick"), low)
+
+    def test_zero_quantity_removes_level(self):
+        b = OrderBook()
+        b.add_offer(offer("Stick", 1, qty=2))
+        b.add_offer(offer("Stick", 2, qty=2))
+        b.add_offer(offer("Stick", 1, qty=0))
+        self.assertEqual([p for p, _ in b.levels("Stick")], [2])
+        self.assertEqual(b.at_price("Stick", 1), [])
+        b.add_offer(offer("Stick", 2, qty=0))
+        self.assertNotIn("Stick", b)
+        self.assertEqual(len(b), 0)
+        self.assertEqual(b.by_seller("name s1"), [])
+        # sold out offer which isn't in book
+        b.add_offer(offer("Stick", 3, qty=0))
+        self.assertEqual(b.items(), [])
+
+    def test_replaced_offer(self):
+        b = OrderBook()
+        b.add_offer(offer("Stick", 1, qty=2))
+        b.add_offer(offer("Stick", 1, qty=5))
+        self.assertEqual([o.qty for o in b.at_price("Stick", 1)], [5])
+        self.assertEqual(len(b), 1)
+
+    def test_levels_and_crossing(self):
+        b = OrderBook()
+        for i, p in enumerate((4, 2, 6, 2, 9)):
+            b.add_offer(offer("Stick", p, seller=f"s{i}"))
+        self.assertEqual([(p, len(rs)) for p, rs in b.levels("Stick")], [(2, 2), (4, 1), (6, 1), (9, 1)])
+        self.assertEqual([p for p, _ in b.levels("Stick", limit=2)], [2, 4])
+        # offers crossed by bid at 6 (strictly cheaper)
+        self.assertEqual(sorted(o.price for o in b.cheaper("Stick", 6)), [2, 2, 4])
+        self.assertEqual(b.cheaper("Stick", 2), [])
+        self.assertEqual(len(b.cheaper("Stick", 100)), 5)
+        b.remove(b.at_price("Stick", 4)[0])
+        self.assertEqual(sorted(o.price for o in b.cheaper("Stick", 6)), [2, 2])
+        self.assertEqual(b.cheaper("Pelt", 6), [])
+
+    def test_lots(self):
+        b = OrderBook()
+        b.update((lot("l1", "Robe", 10), lot("l2", "Robe", 7), lot("l3", "Bow", 3, seller="name s2")))
+        self.assertEqual(b.best("Robe").lotId, "l2")
+        self.assertEqual([l.lotId for l in b.by_seller("name s2")], ["l3"])
+        # finished lot is dropped, missing lot is dropped by next digest
+        b.update(lot("l2", "Robe", 7, status="Finished"))
+        self.assertEqual(b.best("Robe").lotId, "l1")
+        b.update((lot("l1", "Robe", 10),))
+        self.assertEqual(sorted(b.items()), ["Robe"])
+
+    def test_expiry(self):
+        with mock.patch("cwapi.orderbook.monotonic", return_value=100.0):
+            b = OrderBook(offer_ttl=10)
+            b.add_offer(offer("Stick", 1))
+        with mock.patch("cwapi.orderbook.monotonic", return_value=105.0):
+            b.add_offer(offer("Stick", 2, seller="s2"))
+        with mock.patch("cwapi.orderbook.monotonic", return_value=110.0):
+            self.assertEqual(b.best("Stick").price, 2)
+        with mock.patch("cwapi.orderbook.monotonic", return_value=115.0):
+            self.assertNotIn("Stick", b)
+
+    def test_random_updates_match_sorted(self):
+        rnd = random.Random(5)
+        b = OrderBook()
+        book = {}
+        for _ in range(3000):
+            seller, price = f"s{rnd.randrange(5)}", rnd.randrange(30)
+            qty = rnd.choice((0, 1, 2))
+            b.add_offer(offer("Stick", price, qty=qty, seller=seller))
+            if qty:
+                book[seller, price] = qty
+            else:
+                book.pop((seller, price), None)
+            prices = sorted({p for _, p in book})
+            if rnd.random() < 0.3:
+                self.assertEqual([p for p, _ in b.levels("Stick")], prices)
+            if prices:
+                self.assertEqual(b.best("Stick").price, prices[0])
+            else:
+                self.assertIsNone(b.best("Stick"))
+        self.assertEqual(len(b), len(book))
+
+    def test_checks(self):
+        with self.assertRaises(TypeError):
+            OrderBook(offer_ttl="1")
+        with self.assertRaises(ValueError):
+            OrderBook(lot_ttl=0)
+        b = OrderBook()
+        with self.assertRaises(TypeError):
+            b.add_offer(lot("l1", "Robe", 1))
+        with self.assertRaises(TypeError):
+            b.update(object())
+
+
+if __name__ == "__main__":
+    unittest.main()
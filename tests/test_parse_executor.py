@@ -0,0 +1,79 @@
+import asyncio
+import json
+import multiprocessing
+import unittest
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.requests import GuildInfoRequest, RequestProfileRequest, RequestStockRequest
+from cwapi.responses import ForbiddenError, parse_response
+from cwapi.types import set_unknown_values_fallback
+
+from .fakes import attach, reply
+from .util import data, fixture
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 20))
+
+
+def responder(body):
+    action = json.loads(body)["action"]
+    if action == "requestProfile":
+        return [(0.0, reply(action, {"userId": 1, "requiredOperation": "GetUserProfile"}, "Forbidden"))]
+    return [(0.0, fixture(f"responses/{action}.json"))]
+
+
+async def ask_all(executor, requests, **kwargs):
+    c = AsyncChatWarsApiClient(Server.CW3, "instance", "password", parse_executor=executor, parse_threshold=0, **kwargs)
+    attach(c, responder)
+    return await asyncio.gather(*(c.ask(r) for r in requests), return_exceptions=True)
+
+
+class ParseExecutorTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        self.addCleanup(warnings.resetwarnings)
+
+    def check(self, executor, **kwargs):
+        with executor:
+            guild, stock, profile = run(ask_all(executor, [GuildInfoRequest(token="t"), RequestStockRequest(token="t"), RequestProfileRequest(token="t")], **kwargs))
+        self.assertEqual(data(guild), data(parse_response(fixture("responses/guildInfo.json"))))
+        self.assertEqual(data(stock), data(parse_response(fixture("responses/requestStock.json"))))
+        self.assertIs(type(profile), ForbiddenError)
+        self.assertEqual(profile.userId, 1)
+        return guild
+
+    def test_threads(self):
+        self.check(ThreadPoolExecutor(2))
+
+    def test_processes(self):
+        guild = self.check(ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")))
+        # objects restored in consuming process are ordinary checked objects
+        with self.assertRaises(TypeError):
+            guild.name = 1
+
+    def test_processes_trusted(self):
+        self.check(ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork")), trusted_parsing=True)
+
+    def test_processes_unknown_values(self):
+        body = json.loads(fixture("responses/guildInfo.json"))
+        body["payload"]["castle"] = "🐉"
+        body = json.dumps(body).encode()
+        set_unknown_values_fallback(True)
+        self.addCleanup(set_unknown_values_fallback, False)
+
+        async def main():
+            c = AsyncChatWarsApiClient(Server.CW3, "instance", "password", parse_executor=executor, parse_threshold=0)
+            attach(c, lambda _: [(0.0, body)])
+            return await c.ask(GuildInfoRequest(token="t"))
+
+        # fallback setting is passed to worker started by "spawn"
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            guild = run(main())
+        self.assertEqual(guild.castle.value, "🐉")
+
+
+if __name__ == "__main__":
+    unittest.main()
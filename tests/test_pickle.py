@@ -0,0 +1,89 @@
+import copy
+import pickle
+import unittest
+import warnings
+from glob import glob
+from os.path import basename, join
+
+from cwapi._utils import _restore
+from cwapi.feeds import Feed, parse_feed
+from cwapi.requests import AuthAdditionalOperationRequest, GetInfoRequest, RequestProfileRequest, WantToBuyRequest
+from cwapi.responses import ForbiddenError, InvalidTokenError, NoSuchUserError, parse_response
+from cwapi.types import Condition, Gear, GearSet, Operation, Quality, StockCell
+
+from .util import FIXTURES, data, fixture
+
+FEEDS = {
+    Feed.Deals: "deals.json",
+    Feed.Offers: "offers.json",
+    Feed.SexDigest: "sex_digest.json",
+    Feed.AuDigest: "au_digest.json",
+    Feed.YellowPages: "yellow_pages.json",
+}
+
+
+def objects():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for path in sorted(glob(join(FIXTURES, "responses", "*.json"))):
+            yield basename(path), parse_response(fixture(path))
+    for feed, name in FEEDS.items():
+        yield name, parse_feed(feed, fixture(name))
+    yield "requests", (GetInfoRequest(), RequestProfileRequest(token="0123"), AuthAdditionalOperationRequest(token="0123", operation=Operation.GetStock), WantToBuyRequest(token="0123", itemCode="01", quantity=1, price=2, exactPrice=True))
+    yield "errors", (ForbiddenError(action="requestStock", userId=1, requiredOperation=Operation.GetStock), InvalidTokenError(token="0123"), NoSuchUserError(userId=2))
+
+
+class Forged:
+    # pickle of tampered object
+    def __init__(self, reduced):
+        self.reduced = reduced
+
+    def __reduce__(self):
+        return self.reduced
+
+
+class PickleTest(unittest.TestCase):
+    def test_round_trip(self):
+        for name, o in objects():
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(name, protocol=protocol):
+                    self.assertEqual(data(pickle.loads(pickle.dumps(o, protocol))), data(o))
+
+    def test_copy(self):
+        for name, o in objects():
+            with self.subTest(name):
+                self.assertEqual(data(copy.copy(o)), data(o))
+                self.assertEqual(data(copy.deepcopy(o)), data(o))
+
+    def test_copy_detached(self):
+        res = parse_response(fixture("responses/requestGearInfo.json"))
+        c = copy.copy(res)
+        del c.weapon
+        self.assertIsNotNone(res.weapon)
+        d = copy.deepcopy(res)
+        d.head.atk = 100
+        self.assertEqual(res.head.atk, 0)
+
+    def test_private_helpers_not_pinned(self):
+        for name, o in objects():
+            with self.subTest(name):
+                self.assertNotIn(b"_run_validated", pickle.dumps(o))
+
+    def test_unpickling_validates(self):
+        gear = {"name": "bow", "atk": 1, "def_": 0, "condition": Condition.Normal, "quality": Quality.Common, "mana": 0}
+        pickle.loads(pickle.dumps(Forged((_restore, (Gear, gear)))))
+        for forged in (
+                (_restore, (Gear, dict(gear, atk="1"))),
+                (_restore, (Gear, dict(gear, condition="Normal"))),
+                (_restore, (StockCell, {"code": 1, "name": "thread", "quantity": 1})),
+                (_restore, (GearSet, {"weapon": "bow"})),
+        ):
+            with self.subTest(forged):
+                with self.assertRaises(TypeError):
+                    pickle.loads(pickle.dumps(Forged(forged)))
+        with self.assertRaises(TypeError):
+            pickle.loads(pickle.dumps(Forged((_restore, (Gear, dict(gear, extra=1))))))
+
+
+if __name__ == "__main__":
+    unittest.main()
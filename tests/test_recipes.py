@@ -0,0 +1,137 @@
+import random
+import unittest
+
+from cwapi.recipes import RecipeCatalog
+from cwapi.responses import parse_response
+from cwapi.types import Recipe, RecipeBook
+
+from .util import fixture
+
+
+def book(*recipes):
+    return RecipeBook([Recipe(id=i, name=n, price=p) for i, n, p in recipes])
+
+
+def ids(recipes):
+    return sorted(r.id for r in recipes)
+
+
+class RecipeCatalogTest(unittest.TestCase):
+    def test_craftbook_response(self):
+        res = parse_response(fixture("responses/viewCraftbook.json"))
+        c = RecipeCatalog()
+        c.update(res.userId, res)
+        self.assertEqual(len(c), 1)
+        self.assertIn(res.userId, c)
+        self.assertEqual(list(c), [res.userId])
+        # craft and alchemy are merged
+        expected = sorted(r.id for b in (res.craft, res.alchemy) for r in b)
+        self.assertEqual(ids(c.book(res.userId)), expected)
+        self.assertTrue(c.can_craft(res.userId, "p00"))
+        self.assertTrue(c.can_craft(res.userId, "01"))
+
+    def test_equal_recipes_stored_once(self):
+        c = RecipeCatalog()
+        c.update(1, book(("01", "Thread", 3), ("02", "Stick", 1)))
+        c.update(2, book(("01", "Thread", 3)))
+        self.assertEqual(ids(c.recipes()), ["01", "02"])
+        self.assertIs(c.book(1)["01"], c.book(2)["01"])
+        self.assertEqual(c.holders("01"), {1, 2})
+        self.assertEqual(c.holders("02"), {1})
+        self.assertEqual(c.holders("03"), set())
+
+    def test_update_replaces_book(self):
+        c = RecipeCatalog()
+        c.update(1, book(("01", "Thread", 3), ("02", "Stick", 1)))
+        c.update(1, book(("02", "Stick", 1), ("03", "Pelt", 2)))
+        self.assertEqual(ids(c.book(1)), ["02", "03"])
+        self.assertFalse(c.can_craft(1, "01"))
+        # recipe without holders is released
+        self.assertEqual(ids(c.recipes()), ["02", "03"])
+        self.assertIsNone(c.recipe("01"))
+        self.assertEqual(c.find("thread"), [])
+
+    def test_released_slot_reused(self):
+        c = RecipeCatalog()
+        c.update(1, book(("01", "Thread", 3)))
+        c.update(2, book(("02", "Stick", 1)))
+        c.forget(1)
+        c.update(3, book(("03", "Pelt", 2)))
+        self.assertEqual(ids(c.recipes()), ["02", "03"])
+        self.assertEqual(ids(c.book(3)), ["03"])
+        self.assertEqual(ids(c.book(2)), ["02"])
+        self.assertEqual([r.id for r in c.by_price()], ["02", "03"])
+        self.assertFalse(c.can_craft(3, "01"))
+
+    def test_forget(self):
+        c = RecipeCatalog()
+        c.update(1, book(("01", "Thread", 3)))
+        c.forget(1)
+        c.forget(2)
+        self.assertNotIn(1, c)
+        self.assertEqual(len(c), 0)
+        self.assertEqual(c.recipes(), [])
+        self.assertFalse(c.can_craft(1, "01"))
+        with self.assertRaises(KeyError):
+            c.book(1)
+
+    def test_same_id_different_recipes(self):
+        # e.g. price changed for some users only
+        c = RecipeCatalog()
+        c.update(1, book(("01", "Thread", 3)))
+        c.update(2, book(("01", "Thread", 4)))
+        self.assertEqual(len(c.recipes()), 2)
+        self.assertEqual(c.holders("01"), {1, 2})
+        self.assertEqual(c.book(2)["01"].price, 4)
+        self.assertEqual(c.recipe("01").price, 3)
+
+    def test_queries(self):
+        c = RecipeCatalog()
+        c.update(1, book(("01", "Thread", 3), ("02", "Stick", 1), ("03", "Wooden Stick", 5)))
+        c.update(2, book(("03", "Wooden Stick", 5)))
+        self.assertEqual(ids(c.find("STICK")), ["02", "03"])
+        self.assertEqual(c.who_can_craft("wooden"), {1, 2})
+        self.assertEqual(c.who_can_craft("stick"), {1, 2})
+        self.assertEqual(c.who_can_craft("pelt"), set())
+        # limits are inclusive
+        self.assertEqual([r.id for r in c.by_price(1, 3)], ["02", "01"])
+        self.assertEqual([r.id for r in c.by_price(2)], ["01", "03"])
+        self.assertEqual([r.id for r in c.by_price(None, 4)], ["02", "01"])
+        self.assertEqual(c.by_price(6), [])
+        self.assertEqual(c.recipe("01").name, "Thread")
+
+    def test_random_updates_match_model(self):
+        rnd = random.Random(3)
+        catalog = [("%02d" % i, f"recipe {i}", rnd.randrange(10)) for i in range(100)]
+        c = RecipeCatalog()
+        users = {}
+        for _ in range(500):
+            u = rnd.randrange(20)
+            if rnd.random() < 0.2:
+                c.forget(u)
+                users.pop(u, None)
+                continue
+            recs = rnd.sample(catalog, rnd.randrange(1, 10))
+            c.update(u, book(*recs))
+            users[u] = {i for i, _, _ in recs}
+        self.assertEqual(set(c), set(users))
+        for u, owned in users.items():
+            self.assertEqual(set(ids(c.book(u))), owned)
+        used = {i for owned in users.values() for i in owned}
+        self.assertEqual(set(ids(c.recipes())), used)
+        self.assertEqual([r.price for r in c.by_price()], sorted(r.price for r in c.recipes()))
+        for i, _, _ in catalog:
+            self.assertEqual(c.holders(i), {u for u, owned in users.items() if i in owned})
+
+    def test_checks(self):
+        c = RecipeCatalog()
+        with self.assertRaises(TypeError):
+            c.update("1", book())
+        with self.assertRaises(TypeError):
+            c.update(1, [Recipe(id="01", name="Thread", price=3)])
+        with self.assertRaises(TypeError):
+            c.find(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import unittest
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.requests import GetInfoRequest, GrantTokenRequest, RequestProfileRequest, WantToBuyRequest, _prepared_order
+from cwapi.responses import GetInfoResponse, GrantTokenResponse, InvalidTokenError, RequestProfileResponse, WantToBuyResponse
+from cwapi.tokens import _REQUIRED_OPERATIONS, TokenRegistry
+from cwapi.trade import TradePipeline
+from cwapi.types import Operation
+
+from .fakes import attach, reply
+from .util import fixture
+
+
+def info(balance):
+    return reply("getInfo", {"balance": balance})
+
+
+def wtb(quantity):
+    return reply("wantToBuy", {"userId": 1, "itemName": "Thread", "quantity": quantity})
+
+
+def profile(userId, payload_first=False):
+    o = json.loads(fixture("responses/requestProfile.json"))
+    o["payload"]["userId"] = userId
+    if payload_first:
+        # profile has nested "action" field, it must not be taken for action of reply
+        o = {"payload": o["payload"], "action": o["action"], "result": o["result"]}
+    return json.dumps(o).encode()
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def client():
+    return AsyncChatWarsApiClient(Server.CW3, "instance", "password")
+
+
+class ReplyMatchingTest(unittest.TestCase):
+    def test_actions_out_of_order(self):
+        # wantToBuy is answered before getInfo sent earlier
+        def responder(body):
+            o = json.loads(body)
+            if o["action"] == "getInfo":
+                return [(0.05, info(7))]
+            return [(0.0, wtb(o["payload"]["quantity"]))]
+
+        async def main():
+            c = client()
+            attach(c, responder)
+            return await asyncio.gather(c.ask(GetInfoRequest()), c.ask(WantToBuyRequest(token="t", itemCode="01", quantity=3, price=1, exactPrice=False)))
+
+        res_info, res_wtb = run(main())
+        self.assertIs(type(res_info), GetInfoResponse)
+        self.assertEqual(res_info.balance, 7)
+        self.assertIs(type(res_wtb), WantToBuyResponse)
+        self.assertEqual(res_wtb.quantity, 3)
+
+    def test_reply_to_cancelled_request_is_dropped(self):
+        balances = iter((1, 2))
+
+        def responder(body):
+            b = next(balances)
+            # reply to first request comes after it's timed out
+            return [(0.1 if b == 1 else 0.15, info(b))]
+
+        async def main():
+            c = client()
+            queue, _ = attach(c, responder)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(c.ask(GetInfoRequest()), 0.01)
+            res = await c.ask(GetInfoRequest())
+            return res, c.dropped_replies, [m.state for m in queue.delivered]
+
+        res, dropped, states = run(main())
+        self.assertEqual(res.balance, 2)
+        self.assertEqual(dropped, 1)
+        self.assertEqual(states, ["reject", "ack"])
+
+    def test_orphan_reply_is_not_served(self):
+        async def main():
+            c = client()
+            queue, _ = attach(c, lambda body: [(0.02, info(2))])
+            queue.put(info(1))
+            await asyncio.sleep(0.01)
+            res = await c.ask(GetInfoRequest())
+            return res, c.dropped_replies
+
+        res, dropped = run(main())
+        self.assertEqual(res.balance, 2)
+        self.assertEqual(dropped, 1)
+
+    def test_reply_without_action_goes_to_oldest_request(self):
+        bad = json.dumps({"result": "BadFormat"}).encode()
+
+        def responder(body):
+            if json.loads(body)["action"] == "getInfo":
+                return [(0.01, bad)]
+            return [(0.02, reply("requestProfile", {"userId": 1, "requiredOperation": "GetUserProfile"}, "Forbidden"))]
+
+        async def main():
+            c = client()
+            attach(c, responder)
+            return await asyncio.gather(c.ask(GetInfoRequest()), c.ask(RequestProfileRequest(token="t")), return_exceptions=True)
+
+        first, second = run(main())
+        self.assertIsInstance(first, Exception)
+        self.assertEqual(type(second).__name__, "ForbiddenError")
+
+    def test_failed_publish_frees_slot(self):
+        def responder(body):
+            if not responder.sent:
+                responder.sent = True
+                raise ConnectionError("publish failed")
+            return [(0.01, info(5))]
+
+        responder.sent = False
+
+        async def main():
+            c = client()
+            attach(c, responder)
+            with self.assertRaises(ConnectionError):
+                await c.ask(GetInfoRequest())
+            return await c.ask(GetInfoRequest())
+
+        self.assertEqual(run(main()).balance, 5)
+
+    def test_trade_orders_skip_background_replies(self):
+        def responder(body):
+            o = json.loads(body)
+            if o["action"] == "wantToBuy":
+                return [(0.0, wtb(o["payload"]["quantity"]))]
+            return [(0.2, info(1))]
+
+        async def main():
+            c = client()
+            attach(c, responder)
+            trade = TradePipeline(c)
+            background = [asyncio.ensure_future(c.ask(GetInfoRequest())) for _ in range(10)]
+            orders = await asyncio.gather(*(trade.buy("t", "01", q, 1) for q in range(1, 6)))
+            done = sum(f.done() for f in background)
+            await asyncio.gather(*background)
+            return [r.quantity for r in orders], done, trade.stats()
+
+        quantities, done, stats = run(main())
+        self.assertEqual(quantities, [1, 2, 3, 4, 5])
+        self.assertEqual(done, 0)
+        self.assertEqual(stats.count, 5)
+        self.assertLess(stats.max, 0.2)
+
+    def test_action_after_payload(self):
+        async def main():
+            c = client()
+            attach(c, lambda body: [(0.0, profile(1001, True))])
+            return await c.ask(RequestProfileRequest(token="t")), c.dropped_replies
+
+        res, dropped = run(main())
+        self.assertIs(type(res), RequestProfileResponse)
+        self.assertEqual(res.userId, 1001)
+        self.assertEqual(dropped, 0)
+
+    def test_same_action_for_different_users(self):
+        # replies come in reversed order, they are matched by userId of token holder
+        async def main():
+            tokens = TokenRegistry()
+            tokens.learn(GrantTokenRequest(userId=1, authCode="1"), GrantTokenResponse(userId=1, id="1", token="a"))
+            tokens.learn(GrantTokenRequest(userId=2, authCode="2"), GrantTokenResponse(userId=2, id="2", token="b"))
+            c = AsyncChatWarsApiClient(Server.CW3, "instance", "password", tokens=tokens)
+            attach(c, lambda body: [(0.02 if b'"a"' in body else 0.01, profile(1 if b'"a"' in body else 2))])
+            return await asyncio.gather(c.ask(RequestProfileRequest(token="a")), c.ask(RequestProfileRequest(token="b")))
+
+        self.assertEqual([r.userId for r in run(main())], [1, 2])
+
+    def test_same_action_matched_by_token(self):
+        def responder(body):
+            if b'"bad"' in body:
+                return [(0.01, reply("requestProfile", {"token": "bad"}, "InvalidToken"))]
+            return [(0.02, profile(1))]
+
+        async def main():
+            c = client()
+            attach(c, responder)
+            return await asyncio.gather(c.ask(RequestProfileRequest(token="good")), c.ask(RequestProfileRequest(token="bad")), return_exceptions=True)
+
+        good, bad = run(main())
+        self.assertEqual(good.userId, 1)
+        self.assertIs(type(bad), InvalidTokenError)
+
+    def test_unknown_users_matched_in_order(self):
+        async def main():
+            c = client()
+            attach(c, lambda body: [(0.01, profile(7))])
+            return await asyncio.gather(c.ask(RequestProfileRequest(token="a")), c.ask(RequestProfileRequest(token="b")))
+
+        self.assertEqual([r.userId for r in run(main())], [7, 7])
+
+    def test_prepared_order_operation(self):
+        self.assertIs(_REQUIRED_OPERATIONS[_prepared_order], Operation.TradeTerminal)
+
+
+if __name__ == "__main__":
+    unittest.main()
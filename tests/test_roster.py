@@ -0,0 +1,84 @@
+import json
+import unittest
+from unittest import mock
+
+from cwapi.responses import parse_response
+from cwapi.roster import GuildRoster
+from cwapi.types import Class, Quality
+
+from .util import fixture
+
+
+def response(name, userId, **profile):
+    o = json.loads(fixture(f"responses/{name}.json"))
+    o["payload"]["userId"] = userId
+    if profile:
+        o["payload"]["profile"].update(profile)
+    return parse_response(json.dumps(o).encode("utf-8"))
+
+
+class RosterTest(unittest.TestCase):
+    def roster(self):
+        r = GuildRoster()
+        r.update(response("requestProfile", 1, lvl=50, gold=100))
+        r.update(response("requestProfile", 2, lvl=60, gold=300))
+        # only gear, only basic info
+        r.update(response("requestGearInfo", 3))
+        r.update(response("requestBasicInfo", 4))
+        r.update(response("requestGearInfo", 1))
+        return r
+
+    def test_missing_data_skipped(self):
+        r = self.roster()
+        self.assertEqual(r.count("lvl"), 2)
+        self.assertEqual(r.mean("lvl"), 55.0)
+        self.assertEqual(r.min("lvl"), 50)
+        self.assertEqual(r.max("gold"), 300)
+        self.assertEqual(r.sum("gold"), 400)
+        self.assertEqual(r.histogram("lvl"), {50: 1, 60: 1})
+        self.assertEqual(r.histogram("castle"), {r.members("castle")[r.column("castle")[0]]: 2})
+        # profile includes basic info
+        self.assertEqual(r.count("atk"), 3)
+        self.assertEqual(r.sum("atk"), 140 + 140 + 120)
+        self.assertEqual(r.histogram("class_"), {Class.Ranger: 2, Class.Knight: 1})
+        self.assertEqual(r.count("gear_atk"), 2)
+        self.assertEqual(r.mean("gear_atk"), 43.0)
+        self.assertEqual(r.count("userId"), 4)
+
+    def test_received_bits(self):
+        r = self.roster()
+        self.assertEqual(list(r.column("received")), [GuildRoster.BASIC_INFO | GuildRoster.PROFILE | GuildRoster.GEAR, GuildRoster.BASIC_INFO | GuildRoster.PROFILE, GuildRoster.GEAR, GuildRoster.BASIC_INFO])
+        r.forget(1)
+        self.assertEqual(r.column("received")[0], GuildRoster.BASIC_INFO)
+        self.assertEqual(r.count("lvl"), 1)
+        self.assertEqual(r.mean("lvl"), 60.0)
+
+    def test_empty(self):
+        r = GuildRoster()
+        r.update(response("requestGearInfo", 1))
+        self.assertEqual(r.count("lvl"), 0)
+        self.assertIsNone(r.mean("lvl"))
+        self.assertIsNone(r.min("lvl"))
+        self.assertIsNone(r.max("lvl"))
+        self.assertEqual(r.sum("lvl"), 0)
+        self.assertEqual(r.histogram("lvl"), {})
+
+    def test_quality_counts(self):
+        r = self.roster()
+        self.assertEqual(r.quality_counts(), {Quality.Common: 6, Quality.Fine: 2, Quality.EpicHigh: 2})
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            GuildRoster().sum("atk_")
+
+
+class PurePythonRosterTest(RosterTest):
+    # same results without numpy
+    def setUp(self):
+        patcher = mock.patch("cwapi.roster._numpy", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.requests import RequestProfileRequest
+from cwapi.scheduler import RefreshScheduler
+
+
+class FakeClient(AsyncChatWarsApiClient):
+    def __new__(cls, delay=0.0):
+        self = super().__new__(cls, Server.CW3, "instance", "password")
+        FakeClient.delay = delay
+        FakeClient.asked = 0
+        return self
+
+    async def ask(self, req, /):
+        FakeClient.asked += 1
+        await asyncio.sleep(FakeClient.delay)
+        return req.token
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+class RefreshSchedulerTest(unittest.TestCase):
+    def test_results(self):
+        async def main():
+            s = RefreshScheduler(FakeClient())
+            s.add("a", RequestProfileRequest, 0.01)
+            s.start()
+            token, request_type, result = await s.__anext__()
+            await s.stop()
+            return token, request_type, result
+
+        self.assertEqual(run(main()), ("a", RequestProfileRequest, "a"))
+
+    def test_callback_error_stops_scheduler(self):
+        def callback(token, request_type, result):
+            raise LookupError(token)
+
+        async def main():
+            s = RefreshScheduler(FakeClient(), callback=callback)
+            s.add("a", RequestProfileRequest, 0.01)
+            await s.run()
+
+        with self.assertRaises(LookupError):
+            run(main())
+
+    def test_stop_cancels_refreshes(self):
+        async def main():
+            s = RefreshScheduler(FakeClient(delay=10), callback=lambda *a: None)
+            for i in range(4):
+                s.add(str(i), RequestProfileRequest, 0.001)
+            s.start()
+            while s.in_flight < 4:
+                await asyncio.sleep(0.01)
+            await s.stop()
+            return s.in_flight
+
+        self.assertEqual(run(main()), 0)
+
+    def test_full_results_queue_throttles(self):
+        async def main():
+            s = RefreshScheduler(FakeClient(), max_concurrency=2, results_limit=3)
+            s.add("a", RequestProfileRequest, 0.001)
+            s.start()
+            await asyncio.sleep(0.2)
+            await s.stop()
+            return FakeClient.asked
+
+        # 3 queued results and 2 requests waiting to put theirs
+        self.assertEqual(run(main()), 5)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            RefreshScheduler(FakeClient(), results_limit=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from cwapi import AsyncChatWarsApiClient, ChatWarsApiClient, Server
+from cwapi.feeds import Feed
+
+from .fakes import FakeBlockingConnection
+from .util import fixture
+
+
+def connected(heartbeat=0, keepalive=False):
+    connection = FakeBlockingConnection(heartbeat)
+    c = ChatWarsApiClient(Server.CW3, "instance", "password", keepalive=keepalive)
+    with mock.patch("pika.BlockingConnection", return_value=connection):
+        c.connect()
+    return c, connection
+
+
+class KeepaliveTest(unittest.TestCase):
+    def test_flag(self):
+        with self.assertRaises(TypeError):
+            ChatWarsApiClient(Server.CW3, "instance", "password", keepalive=10)
+        with self.assertRaises(TypeError):
+            AsyncChatWarsApiClient(Server.CW3, "instance", "password", keepalive=True)
+
+    def test_interval_follows_negotiated_heartbeat(self):
+        c, connection = connected(heartbeat=0.2, keepalive=True)
+        try:
+            time.sleep(0.55)
+        finally:
+            c.disconnect()
+        # serviced every heartbeat / 2
+        self.assertIn(connection.polls, range(4, 7))
+
+    def test_not_started_without_heartbeat(self):
+        c, connection = connected(heartbeat=0, keepalive=True)
+        time.sleep(0.1)
+        c.disconnect()
+        self.assertEqual(connection.polls, 0)
+
+
+class ListenTest(unittest.TestCase):
+    def test_mutex_free_while_waiting(self):
+        c, connection = connected()
+        mutex = c._ChatWarsApiClient__mutex
+        events = []
+        done = threading.Event()
+
+        def consume():
+            for deal in c.listen(Feed.Deals):
+                events.append(deal)
+                if len(events) == 2:
+                    break
+            done.set()
+
+        t = threading.Thread(target=consume)
+        t.start()
+        try:
+            time.sleep(0.2)
+            # ask() from other thread isn't blocked by idle listener
+            for _ in range(5):
+                self.assertTrue(mutex.acquire(timeout=0.1))
+                mutex.release()
+            connection.deliver(fixture("deals.json"))
+            connection.deliver(fixture("deals.json"))
+            self.assertTrue(done.wait(2))
+        finally:
+            connection.deliver(fixture("deals.json"))
+            t.join(2)
+        channel = connection.channels[-1]
+        self.assertEqual([d.item for d in events], ["Thread", "Thread"])
+        # first is acknowledged when second requested, second is left to broker by closing channel
+        self.assertEqual(len(channel.acked), 1)
+        self.assertFalse(channel.is_open)
+        c.disconnect()
+
+    def test_bad_event_rejected(self):
+        c, connection = connected()
+        connection.deliver(b"{}")
+        with self.assertRaises(Exception):
+            next(c.listen(Feed.Deals))
+        channel = connection.channels[-1]
+        self.assertEqual(len(channel.rejected), 1)
+        self.assertFalse(channel.is_open)
+        c.disconnect()
+
+
+if __name__ == "__main__":
+    unittest.main()
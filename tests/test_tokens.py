@@ -0,0 +1,158 @@
+import unittest
+from contextlib import nullcontext
+from unittest import mock
+
+from cwapi.requests import AuthAdditionalOperationRequest, CreateAuthCodeRequest, GetInfoRequest, GrantAdditionalOperationRequest, GrantTokenRequest, RequestProfileRequest, RequestStockRequest
+from cwapi.responses import AuthAdditionalOperationResponse, ForbiddenError, GetInfoResponse, GrantAdditionalOperationResponse, GrantTokenResponse, InvalidCodeError, InvalidTokenError, NoSuchUserError, RequestBasicInfoResponse
+from cwapi.tokens import TokenRegistry
+from cwapi.types import Class, Operation
+
+
+def forbidden(op, userId=1):
+    return ForbiddenError(action="requestProfile", userId=userId, requiredOperation=op)
+
+
+def profile_request(token="t"):
+    return RequestProfileRequest(token=token)
+
+
+def pending(tokens):
+    return tokens._TokenRegistry__pending
+
+
+class CheckTest(unittest.TestCase):
+    def test_unknown_passes(self):
+        tokens = TokenRegistry()
+        for req in (profile_request(), GetInfoRequest(), CreateAuthCodeRequest(userId=1)):
+            with self.subTest(req=type(req).__name__):
+                tokens.check(req)
+
+    def test_forbidden(self):
+        tokens = TokenRegistry()
+        tokens.learn(profile_request(), forbidden(Operation.GetUserProfile))
+        with self.assertRaises(ForbiddenError) as ctx:
+            tokens.check(profile_request())
+        self.assertIs(ctx.exception.requiredOperation, Operation.GetUserProfile)
+        # other operations and tokens aren't affected
+        tokens.check(RequestStockRequest(token="t"))
+        tokens.check(profile_request("other"))
+        self.assertIs(tokens.is_allowed("t", Operation.GetUserProfile), False)
+        self.assertIsNone(tokens.is_allowed("t", Operation.GetStock))
+
+    def test_invalid_token(self):
+        tokens = TokenRegistry()
+        tokens.learn(profile_request(), InvalidTokenError(token="t"))
+        self.assertTrue(tokens.is_invalid("t"))
+        with self.assertRaises(InvalidTokenError):
+            tokens.check(RequestStockRequest(token="t"))
+
+    def test_missing_user(self):
+        tokens = TokenRegistry()
+        tokens.learn(CreateAuthCodeRequest(userId=5), NoSuchUserError(userId=5))
+        with self.assertRaises(NoSuchUserError):
+            tokens.check(GrantTokenRequest(userId=5, authCode="1"))
+        tokens.check(CreateAuthCodeRequest(userId=6))
+
+    def test_negative_ttl(self):
+        tokens = TokenRegistry(negative_ttl=10)
+        with mock.patch("cwapi.tokens.monotonic", return_value=100.0):
+            tokens.learn(profile_request(), forbidden(Operation.GetUserProfile))
+            tokens.learn(RequestStockRequest(token="bad"), InvalidTokenError(token="bad"))
+        with mock.patch("cwapi.tokens.monotonic", return_value=109.0):
+            self.assertRaises(ForbiddenError, tokens.check, profile_request())
+            self.assertTrue(tokens.is_invalid("bad"))
+        with mock.patch("cwapi.tokens.monotonic", return_value=110.0):
+            tokens.check(profile_request())
+            self.assertFalse(tokens.is_invalid("bad"))
+
+    def test_type_checks(self):
+        tokens = TokenRegistry()
+        self.assertRaises(TypeError, tokens.check, "requestProfile")
+        self.assertRaises(TypeError, tokens.learn, profile_request(), "Ok")
+        self.assertRaises(TypeError, TokenRegistry, negative_ttl="1")
+        self.assertRaises(ValueError, TokenRegistry, negative_ttl=0)
+
+
+class LearnTest(unittest.TestCase):
+    def test_granted_by_successful_request(self):
+        tokens = TokenRegistry()
+        tokens.learn(profile_request(), forbidden(Operation.GetUserProfile))
+        tokens.learn(profile_request(), RequestBasicInfoResponse(userId=1, class_=Class.Knight, atk=1, def_=1))
+        self.assertEqual(tokens.granted("t"), frozenset({Operation.GetUserProfile}))
+        self.assertEqual(tokens.forbidden("t"), frozenset())
+        tokens.check(profile_request())
+
+    def test_grant_token(self):
+        tokens = TokenRegistry()
+        tokens.learn(CreateAuthCodeRequest(userId=5), NoSuchUserError(userId=5))
+        tokens.learn(GrantTokenRequest(userId=5, authCode="1"), GrantTokenResponse(userId=5, id="1", token="t"))
+        self.assertFalse(tokens.is_missing_user(5))
+        self.assertEqual(tokens._user_of("t"), 5)
+
+    def test_tokenless_request_is_ignored(self):
+        tokens = TokenRegistry()
+        tokens.learn(GetInfoRequest(), GetInfoResponse(balance=1))
+        self.assertEqual(tokens.granted("t"), frozenset())
+
+    def test_forget(self):
+        tokens = TokenRegistry()
+        tokens.learn(profile_request(), forbidden(Operation.GetUserProfile))
+        tokens.authorization_requests()
+        tokens.learn(AuthAdditionalOperationRequest(token="t", operation=Operation.GetUserProfile), AuthAdditionalOperationResponse(userId=1, operation=Operation.GetUserProfile, requestId="r"))
+        tokens.forget("t")
+        self.assertEqual(tokens.forbidden("t"), frozenset())
+        self.assertEqual(pending(tokens), {})
+
+
+class AuthorizationTest(unittest.TestCase):
+    def setUp(self):
+        self.tokens = TokenRegistry()
+        for token in "ab":
+            self.tokens.learn(profile_request(token), forbidden(Operation.GetUserProfile))
+        self.tokens.learn(RequestStockRequest(token="a"), forbidden(Operation.GetStock))
+
+    def auth(self, token, op, rid, at=None):
+        with nullcontext() if at is None else mock.patch("cwapi.tokens.monotonic", return_value=at):
+            self.tokens.learn(AuthAdditionalOperationRequest(token=token, operation=op), AuthAdditionalOperationResponse(userId=1, operation=op, requestId=rid))
+
+    def requests(self, *args):
+        return sorted((r.token, str(r.operation)) for r in self.tokens.authorization_requests(*args))
+
+    def test_requests(self):
+        self.assertEqual(self.requests(), [("a", "GetStock"), ("a", "GetUserProfile"), ("b", "GetUserProfile")])
+        self.assertEqual(self.requests(["b"]), [("b", "GetUserProfile")])
+
+    def test_pending_are_skipped(self):
+        self.auth("a", Operation.GetStock, "r1")
+        self.assertEqual(self.requests(), [("a", "GetUserProfile"), ("b", "GetUserProfile")])
+
+    def test_granted(self):
+        self.auth("a", Operation.GetStock, "r1")
+        self.tokens.learn(GrantAdditionalOperationRequest(token="a", requestId="r1", authCode="1"), GrantAdditionalOperationResponse(userId=1, requestId="r1"))
+        self.assertIn(Operation.GetStock, self.tokens.granted("a"))
+        self.assertEqual(self.requests(), [("a", "GetUserProfile"), ("b", "GetUserProfile")])
+        self.assertEqual(pending(self.tokens), {})
+
+    def test_rejected_grant_is_dropped(self):
+        self.auth("a", Operation.GetStock, "r1")
+        self.tokens.learn(GrantAdditionalOperationRequest(token="a", requestId="r1", authCode="1"), InvalidCodeError())
+        self.assertEqual(pending(self.tokens), {})
+        self.assertIn(("a", "GetStock"), self.requests())
+
+    def test_invalid_token_drops_pending(self):
+        self.auth("a", Operation.GetStock, "r1")
+        self.tokens.learn(RequestStockRequest(token="a"), InvalidTokenError(token="a"))
+        self.assertEqual(pending(self.tokens), {})
+
+    def test_abandoned_pending_expire(self):
+        for i in range(50):
+            self.auth("a", Operation.GetStock, f"r{i}", 1000.0)
+        self.auth("b", Operation.GetUserProfile, "last", 1000.0 + 600)
+        self.assertEqual(len(pending(self.tokens)), 51)
+        with mock.patch("cwapi.tokens.monotonic", return_value=1000.0 + 900):
+            self.assertIn(("a", "GetStock"), self.requests())
+        self.assertEqual(list(pending(self.tokens)), ["last"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import threading
+import unittest
+import warnings
+from glob import glob
+from os.path import basename, join
+
+from cwapi._utils import _run_validated, _validation_state
+from cwapi.responses import parse_response
+from cwapi.types import Condition, Gear, Quality
+
+from .util import FIXTURES, data
+
+RESPONSES = sorted(glob(join(FIXTURES, "responses", "*.json")))
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def corrupted(name, path, value):
+    o = json.loads(load(join(FIXTURES, "responses", name + ".json")))
+    target = o
+    for k in path[:-1]:
+        target = target[k]
+    target[path[-1]] = value
+    return json.dumps(o).encode("utf-8")
+
+
+class ValidationTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        self.addCleanup(warnings.resetwarnings)
+
+    def test_trusted_equals_strict(self):
+        for path in RESPONSES:
+            with self.subTest(basename(path)):
+                body = load(path)
+                self.assertEqual(data(parse_response(body, True)), data(parse_response(body, False)))
+
+    def test_strict_rejects_bad_payloads(self):
+        for name, path, value in (
+                ("requestProfile", ("payload", "profile", "lvl"), "55"),
+                ("requestProfile", ("payload", "profile", "userName"), 7),
+                ("requestProfile", ("payload", "userId"), 1.5),
+                ("requestBasicInfo", ("payload", "profile", "atk"), None),
+                ("requestGearInfo", ("payload", "gearInfo", "weapon", "atk"), "40"),
+                ("getInfo", ("payload", "balance"), "42"),
+                ("wantToBuy", ("payload", "itemName"), ["Thread"]),
+                ("guildInfo", ("payload", "repair"), 1),
+                ("viewCraftbook", ("payload", "craft", 0, "price"), "3"),
+        ):
+            with self.subTest(name=name, path=path):
+                body = corrupted(name, path, value)
+                with self.assertRaises(TypeError):
+                    parse_response(body, False)
+
+    def test_sections_are_counted(self):
+        self.assertEqual(_validation_state.sections, 0)
+        with self.assertRaises(ValueError):
+            _run_validated(True, parse_response, b"not json")
+        self.assertEqual(_validation_state.sections, 0)
+        _run_validated(True, _run_validated, False, lambda: None)
+        self.assertEqual(_validation_state.sections, 0)
+
+    def test_strict_while_other_thread_is_trusted(self):
+        entered = threading.Event()
+        leave = threading.Event()
+
+        def trusted():
+            entered.set()
+            leave.wait(5)
+
+        t = threading.Thread(target=_run_validated, args=(True, trusted))
+        t.start()
+        try:
+            entered.wait(5)
+            self.assertEqual(_validation_state.sections, 1)
+            with self.assertRaises(TypeError):
+                Gear("bow", "40", 0, Condition.Normal, Quality.Common, 0)
+        finally:
+            leave.set()
+            t.join()
+        self.assertEqual(_validation_state.sections, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
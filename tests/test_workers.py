@@ -0,0 +1,237 @@
+import asyncio
+import json
+import os
+import threading
+import unittest
+import warnings
+
+from cwapi import AsyncChatWarsApiClient, Server
+from cwapi.feeds import Feed
+from cwapi.workers import FeedWorkerPool
+
+from .fakes import FakeQueue, attach
+from .util import fixture
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 20))
+
+
+def deal(item, qty):
+    d = json.loads(fixture("deals.json"))
+    d["item"] = item
+    d["qty"] = qty
+    return json.dumps(d).encode()
+
+
+# handlers are module level, so they can be pickled with any start method
+def item_qty(deal):
+    return deal.item, deal.qty
+
+
+def unpicklable_result(deal):
+    return threading.Lock() if deal.qty == 0 else deal.qty
+
+
+class UnpicklableError(Exception):
+    def __init__(self):
+        super().__init__("lock")
+        self.lock = threading.Lock()
+
+
+def unpicklable_error(deal):
+    if deal.qty == 0:
+        raise UnpicklableError()
+    return deal.qty
+
+
+def fail_on_zero(deal):
+    if deal.qty == 0:
+        raise ValueError("zero")
+    return deal.qty
+
+
+def exit_on_zero(deal):
+    if deal.qty == 0:
+        os._exit(1)
+    return deal.qty
+
+
+def pids(handler):
+    return os.getpid()
+
+
+def pool(handler, workers=1):
+    return FeedWorkerPool(Feed.Deals, handler, workers=workers, batch_size=4, start_method="fork")
+
+
+async def consumer_with_feed(qtys):
+    c = AsyncChatWarsApiClient(Server.CW3, "instance", "password", prefetch_count=8)
+    feed = FakeQueue()
+    attach(c, feeds={c.feed_queue_name(Feed.Deals): feed})
+    messages = [feed.put(deal("Thread", qty)) for qty in qtys]
+    feed.end()
+    return c, messages
+
+
+async def take(results, n):
+    out = []
+    async for r in results:
+        out.append(r)
+        if len(out) == n:
+            break
+    return out
+
+
+class ResultsTest(unittest.TestCase):
+    def test_order_kept_per_item(self):
+        async def main():
+            async with pool(item_qty, 3) as p:
+                for i in range(30):
+                    await p.submit(deal(f"item{i % 4}", i))
+                await p.flush()
+                return await take(p.results(), 30)
+
+        results = run(main())
+        self.assertEqual(sorted(results, key=lambda r: r[1]), [(f"item{i % 4}", i) for i in range(30)])
+        for k in range(4):
+            self.assertEqual([q for i, q in results if i == f"item{k}"], list(range(k, 30, 4)))
+
+    def test_gather_runs_in_every_worker(self):
+        async def main():
+            async with pool(item_qty, 3) as p:
+                return await p.gather(pids)
+
+        self.assertEqual(len(set(run(main()))), 3)
+
+
+class ConsumeTest(unittest.TestCase):
+    def test_acked_after_handling(self):
+        async def main():
+            c, messages = await consumer_with_feed((1, 2, 3))
+            states = None
+            results = []
+            async with pool(item_qty) as p:
+                async for r in p.consume(c):
+                    if states is None:
+                        # worker has handled event, but its result isn't taken yet
+                        states = [m.state for m in messages]
+                    results.append(r[1])
+            return states, results, [m.state for m in messages]
+
+        states, results, after = run(main())
+        self.assertEqual(states, [None, None, None])
+        self.assertEqual(results, [1, 2, 3])
+        self.assertEqual(after, ["ack", "ack", "ack"])
+
+    def test_handler_error_rejects_message(self):
+        async def main():
+            c, messages = await consumer_with_feed((1, 0, 2, 0, 3))
+            async with pool(fail_on_zero) as p:
+                with warnings.catch_warnings(record=True) as w:
+                    warnings.simplefilter("always")
+                    results = [r async for r in p.consume(c)]
+            return results, [str(x.message) for x in w], [m.state for m in messages]
+
+        results, warned, states = run(main())
+        # consuming isn't stopped by failed events
+        self.assertEqual(results, [1, 2, 3])
+        self.assertEqual(len(warned), 2)
+        self.assertIn("ValueError('zero')", warned[0])
+        self.assertEqual(states, ["ack", "reject", "ack", "reject", "ack"])
+
+
+class UnpicklableTest(unittest.TestCase):
+    def test_result(self):
+        async def main():
+            async with pool(unpicklable_result) as p:
+                for qty in (1, 0, 2):
+                    await p.submit(deal("Thread", qty))
+                await p.flush()
+                results = p.results()
+                first = await results.__anext__()
+                with self.assertRaises(TypeError):
+                    await results.__anext__()
+                # worker is still alive
+                self.assertEqual(await take(p.results(), 1), [2])
+                return first
+
+        self.assertEqual(run(main()), 1)
+
+    def test_error(self):
+        async def main():
+            async with pool(unpicklable_error) as p:
+                for qty in (0, 3):
+                    await p.submit(deal("Thread", qty))
+                await p.flush()
+                with self.assertRaises(TypeError):
+                    await take(p.results(), 1)
+                return await take(p.results(), 1)
+
+        self.assertEqual(run(main()), [3])
+
+    def test_call_result(self):
+        async def main():
+            async with pool(item_qty) as p:
+                with self.assertRaises(TypeError):
+                    await p.gather(unpicklable_call)
+                return await p.gather(pids)
+
+        self.assertEqual(len(run(main())), 1)
+
+
+def unpicklable_call(handler):
+    return threading.Lock()
+
+
+class WorkerExitTest(unittest.TestCase):
+    def test_gather_fails(self):
+        async def main():
+            async with pool(exit_on_zero, 2) as p:
+                await p.submit(deal("Thread", 0))
+                with self.assertRaises(ConnectionError):
+                    await p.gather(pids)
+                with self.assertRaises(ConnectionError):
+                    await take(p.results(), 1)
+
+        run(main())
+
+    def test_consume_fails(self):
+        async def main():
+            c, messages = await consumer_with_feed((1, 2, 0, 3))
+            async with pool(exit_on_zero) as p:
+                # results of batch are lost with worker
+                with self.assertRaises(ConnectionError):
+                    async for _ in p.consume(c):
+                        pass
+            return [m.state for m in messages]
+
+        # but messages aren't, they are redelivered
+        self.assertEqual(run(main()), ["requeue"] * 4)
+
+    def test_consume_fails_handled_acked(self):
+        async def main():
+            c, messages = await consumer_with_feed((1, 2, 0, 3))
+            # one body per frame, so events handled before exit are acknowledged
+            async with FeedWorkerPool(Feed.Deals, exit_on_zero, workers=1, batch_size=1, start_method="fork") as p:
+                results = []
+                with self.assertRaises(ConnectionError):
+                    async for r in p.consume(c):
+                        results.append(r)
+            return results, [m.state for m in messages]
+
+        results, states = run(main())
+        self.assertEqual(results, [1, 2])
+        self.assertEqual(states, ["ack", "ack", "requeue", "requeue"])
+
+    def test_close_doesnt_report_exit(self):
+        async def main():
+            p = pool(item_qty, 2)
+            await p.start()
+            await p.close()
+
+        run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
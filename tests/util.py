@@ -0,0 +1,28 @@
+from enum import Enum
+from os.path import dirname, join
+
+from cwapi.types import GuildRolesSet
+
+FIXTURES = join(dirname(__file__), "fixtures")
+
+
+def fixture(name):
+    with open(join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def data(o):
+    # comparable form of model objects (they don't define __eq__), built from their pickling protocol
+    if o is None or isinstance(o, (Enum, str, bytes, int, float, type)) or callable(o):
+        return o
+    if isinstance(o, (tuple, list)):
+        return tuple(map(data, o))
+    if isinstance(o, dict):
+        return {data(k): data(v) for k, v in o.items()}
+    if isinstance(o, (set, frozenset)):
+        return frozenset(map(data, o))
+    reduced = o.__reduce_ex__(4)
+    if type(o) is GuildRolesSet:
+        # roles are kept in frozenset, their order differs between processes
+        return type(o), frozenset(reduced[1])
+    return (type(o),) + tuple(map(data, reduced[1:]))